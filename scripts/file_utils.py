@@ -0,0 +1,40 @@
+"""
+Small filesystem helpers shared by the Python doc tooling.
+"""
+import os
+import stat
+import tempfile
+
+# Read once: os.umask can only be queried by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_text_atomic(file_path, text, encoding='utf-8'):
+    """
+    Writes text to a temp file in the target's directory, then renames it over file_path, so readers
+    (e.g. a running Docusaurus dev server) never see a half-written file. An existing file's permission
+    bits are kept; a new file gets the usual umask-derived mode instead of mkstemp's 0600.
+    """
+    file_dir = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=file_dir)
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            f.write(text)
+        try:
+            mode = stat.S_IMODE(os.stat(file_path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+
+
+def read_text_or_none(file_path, encoding='utf-8'):
+    try:
+        with open(file_path, 'r', encoding=encoding) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
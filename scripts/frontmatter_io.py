@@ -0,0 +1,243 @@
+"""
+Shared front-matter reader/writer for the MDX tooling.
+
+A front-matter block is a first line of `---`, the YAML lines, and a closing `---` line. read_front_matter_file()
+reads a file only up to that closing fence; the body after it is read from disk on first access, so scans that
+only need the metadata (sidebar reconstruction, class updates that turn out to be no-ops, unchanged files in the
+sidebar generator) never load it. patch_front_matter() edits only the lines of the keys a tool manages, for
+writes that should leave the rest of the block byte for byte as it was. YAML goes through libyaml's CSafeLoader/CSafeDumper when PyYAML was built
+with it and falls back to the pure-Python SafeLoader/SafeDumper otherwise.
+"""
+import re
+from collections import OrderedDict
+
+import yaml
+
+FENCE = "---"
+_MISSING = object()
+_KEY_LINE = re.compile(r"([A-Za-z_][A-Za-z0-9_-]*)[ \t]*:(?:[ \t]|$)")  # "key: value" or "key:" at column 0
+_BLOCK_MAPPING_KEY_LINE = re.compile(r"[A-Za-z_][A-Za-z0-9_-]*[ \t]*:[ \t]*(?:#.*)?$")
+
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def represent_ordereddict(dumper, data):
+    """Ensures OrderedDict is represented as a standard YAML map, preserving order."""
+    return dumper.represent_mapping('tag:yaml.org,2002:map', data.items())
+
+
+for _dumper in {yaml.SafeDumper, YamlDumper}:
+    yaml.add_representer(OrderedDict, represent_ordereddict, Dumper=_dumper)
+
+
+def _is_fence(line):
+    return line.rstrip() == FENCE
+
+
+def load_front_matter(front_matter_text):
+    """Parses front-matter YAML. Raises yaml.YAMLError on malformed input."""
+    return yaml.load(front_matter_text, Loader=YamlLoader)
+
+
+def dump_front_matter(mapping, width=1000):
+    """Block-style YAML in insertion order, as the tools have always written it."""
+    return yaml.dump(mapping, Dumper=YamlDumper, sort_keys=False, allow_unicode=True,
+                     default_flow_style=False, width=width)
+
+
+def render_document(front_matter_text, body):
+    return f"{FENCE}\n{front_matter_text}{FENCE}\n{body}"
+
+
+def split_front_matter(text):
+    """
+    In-memory counterpart of read_front_matter_file(): returns (front_matter_text, body), or (None, text)
+    when the text does not start with a closed front-matter block.
+    """
+    lines = text.splitlines(keepends=True)
+    if not lines or not _is_fence(lines[0]):
+        return None, text
+    for index in range(1, len(lines)):
+        if _is_fence(lines[index]):
+            return "".join(lines[1:index]), "".join(lines[index + 1:])
+    return None, text
+
+
+class FrontMatterFile:
+    """
+    The front matter of one MDX/Markdown file, with its body loaded lazily.
+
+    front_matter_text is None when the file has no closed front-matter block; the body is then the whole file.
+    """
+    __slots__ = ("path", "front_matter_text", "canonical_fences", "_body_cookie", "_body")
+
+    def __init__(self, path, front_matter_text, canonical_fences, body_cookie):
+        self.path = path
+        self.front_matter_text = front_matter_text
+        self.canonical_fences = canonical_fences  # Both fences are exactly "---\n"
+        self._body_cookie = body_cookie  # f.tell() at the start of the body
+        self._body = None
+
+    @property
+    def has_front_matter(self):
+        return self.front_matter_text is not None
+
+    @property
+    def body(self):
+        if self._body is None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                f.seek(self._body_cookie)
+                self._body = f.read()
+        return self._body
+
+    def load(self):
+        """The parsed front matter (None without a block). Raises yaml.YAMLError on malformed YAML."""
+        return load_front_matter(self.front_matter_text) if self.has_front_matter else None
+
+    def without_front_matter(self):
+        """The same file viewed as having no front matter, i.e. the whole file as body."""
+        return FrontMatterFile(self.path, None, False, 0)
+
+    def read_text(self):
+        """The complete file as it is on disk."""
+        if not self.has_front_matter:
+            return self.body
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def is_rendered_by(self, front_matter_text):
+        """
+        True if render_document(front_matter_text, self.body) would reproduce the file byte for byte.
+        Answered without reading the body.
+        """
+        return self.canonical_fences and self.front_matter_text == front_matter_text
+
+
+def read_front_matter_file(path):
+    """
+    Reads a file up to the end of its front matter. Raises OSError (e.g. FileNotFoundError) if it cannot be read.
+    A file whose first line is not a fence is not read any further; one with an unclosed block is read to the end.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        first_line = f.readline()
+        if not _is_fence(first_line):
+            return FrontMatterFile(path, None, False, 0)
+        front_matter_lines = []
+        while True:
+            line = f.readline()
+            if not line:  # No closing fence: not front matter after all
+                front_matter = FrontMatterFile(path, None, False, 0)
+                front_matter._body = first_line + "".join(front_matter_lines)
+                return front_matter
+            if _is_fence(line):
+                canonical = first_line == line == FENCE + "\n"
+                return FrontMatterFile(path, "".join(front_matter_lines), canonical, f.tell())
+            front_matter_lines.append(line)
+
+
+def _scan_entries(lines):
+    """
+    Splits the lines of a block mapping into [key, start, end) line ranges; comment lines at column 0 start
+    ranges with key None, so they stay put when a neighbouring entry is rewritten. Returns None for any line
+    this simple scanner does not understand (quoted or complex keys, directives, flow mappings, ...).
+    """
+    entries = []
+    for index, line in enumerate(lines):
+        if line[:1] in (" ", "\t") or not line.strip() or (line[:1] == "-" and line[1:2] in (" ", "\n")):
+            if not entries:
+                entries.append([None, index, index])
+            elif line[:1] == "-" and entries[-1][0] is None:
+                return None
+        elif line[:1] == "#":
+            entries.append([None, index, index])
+        else:
+            match = _KEY_LINE.match(line)
+            if not match: return None
+            entries.append([match.group(1), index, index])
+        entries[-1][2] = index + 1
+    return entries
+
+
+def _emit_entry(key, value, width):
+    return dump_front_matter({key: value}, width=width).splitlines(keepends=True)
+
+
+def _patch_nested_entry(entry, original, updated, managed_keys, width):
+    """Patches the managed children of a block-mapping entry (key line plus indented lines), or returns None."""
+    if not (isinstance(original, dict) and isinstance(updated, dict) and updated
+            and _BLOCK_MAPPING_KEY_LINE.match(entry[0].rstrip("\n"))):
+        return None
+    children = entry[1:]
+    first_child = next((line for line in children if line.strip() and not line.lstrip().startswith("#")), None)
+    if first_child is None: return None
+    indent = first_child[:len(first_child) - len(first_child.lstrip(" "))]
+    if not indent or any(line.strip() and not line.startswith(indent) for line in children): return None
+    patched = _patch_mapping([line[len(indent):] if line.strip() else line for line in children], original,
+                             updated, managed_keys, (), width)
+    if patched is None: return None
+    return [entry[0]] + [indent + line if line.strip() else line for line in patched]
+
+
+def _patch_mapping(lines, original, updated, managed_keys, key_order, width):
+    entries = _scan_entries(lines)
+    if entries is None: return None
+    keys = [key for key, _, _ in entries if key is not None]
+    if len(keys) != len(original) or set(keys) != original.keys(): return None  # The scan must agree with the YAML
+    top_level, nested = set(), {}
+    for path in managed_keys:
+        key, _, child = path.partition(".")
+        if child: nested.setdefault(key, set()).add(child)
+        else: top_level.add(key)
+
+    # Anything outside the managed keys must be unchanged, or the block needs a full dump
+    for key in original.keys() | updated.keys():
+        old, new = original.get(key, _MISSING), updated.get(key, _MISSING)
+        if key in top_level or old == new: continue
+        if key not in nested: return None
+        old_children = old if isinstance(old, dict) else {} if old is _MISSING else None
+        new_children = new if isinstance(new, dict) else {} if new is _MISSING else None
+        if old_children is None or new_children is None: return None
+        for child in old_children.keys() | new_children.keys():
+            if child not in nested[key] and old_children.get(child, _MISSING) != new_children.get(child, _MISSING):
+                return None
+
+    blocks = []  # (key, lines); comments have key None
+    for key, start, end in entries:
+        entry = lines[start:end]
+        if key is not None:
+            new = updated.get(key, _MISSING)
+            if new is _MISSING: continue
+            if new != original[key]:
+                entry = ((key in nested and _patch_nested_entry(entry, original[key], new, nested[key], width))
+                         or _emit_entry(key, new, width))
+        blocks.append((key, entry))
+    for key, value in updated.items():
+        if key in original: continue
+        position = len(blocks)
+        if key in key_order:
+            preceding = set(key_order[:key_order.index(key)])
+            position = max((index + 1 for index, (block_key, _) in enumerate(blocks) if block_key in preceding), default=0)
+        blocks.insert(position, (key, _emit_entry(key, value, width)))
+    return [line for _, entry in blocks for line in entry]
+
+
+def patch_front_matter(front_matter_text, original, updated, managed_keys, key_order=(), width=1000):
+    """
+    Front-matter text for updated that rewrites only the entries of managed keys whose values changed, so every
+    other line (quoting, comments, key order) stays byte for byte. original is front_matter_text as loaded.
+    managed_keys are top-level keys or "parent.child" paths; a managed key that is added goes after the nearest
+    key before it in key_order (first if none is present; last if it is not in key_order).
+    Returns None when the structure demands a full dump_front_matter(): a value outside the managed keys
+    changed, a line is not plain block-mapping YAML, or the patched text would not load back as updated.
+    """
+    if not front_matter_text or not front_matter_text.endswith("\n") or not updated or not isinstance(original, dict):
+        return None
+    patched = _patch_mapping(front_matter_text.splitlines(keepends=True), original, updated, managed_keys, key_order, width)
+    if patched is None: return None
+    patched_text = "".join(patched)
+    if patched_text == front_matter_text: return patched_text
+    try:
+        return patched_text if load_front_matter(patched_text) == updated else None
+    except yaml.YAMLError:
+        return None
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Single-pass front-matter pipeline for the MDX docs tree.
+
+generate_sidebar_frontmatter.py (sidebar labels, levels, positions, prefixes) and update_sidebar_classes.py
+(sidebar-level-N classes, relationship slugs) each walk docs/, parse every file's YAML and rewrite it. Here
+they are registered transforms over one in-memory front-matter dict per file, so a run reads, parses, renders
+and writes each file at most once. The files end up byte for byte as running the generator and then
+update_sidebar_classes.py would leave them.
+
+A transform mirrors what its standalone script does when it rewrites a file: arrange() orders the keys, and
+width and strip_body select how the YAML is dumped and whether the body's leading blank lines are dropped.
+With --patch_front_matter only the lines of the transforms' managed keys are rewritten (see patch_front_matter()).
+"""
+import os
+import argparse
+import logging
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+
+import yaml
+
+import generate_sidebar_frontmatter as sidebar_frontmatter
+import update_sidebar_classes as sidebar_classes
+from file_utils import read_text_or_none, write_text_atomic
+from frontmatter_io import dump_front_matter, patch_front_matter, read_front_matter_file, render_document
+from generate_sidebar_frontmatter import WRITE_CHANGED, WRITE_FAILED, WRITE_UNCHANGED
+from link_index import get_default_link_index
+
+DOC_SUFFIXES = (".md", ".mdx")
+
+# apply(doc) edits doc.front_matter in place and returns True if a value changed. The transform then lays the
+# document out (arrange(front_matter, front_matter_before) -> ordered dict) if it changed something or if
+# always_lays_out, exactly when its standalone script would have rewritten the file. managed_keys and key_order
+# are what patch_front_matter() may rewrite and where it inserts new keys.
+Transform = namedtuple("Transform", ["name", "suffixes", "apply", "arrange", "width", "strip_body", "always_lays_out",
+                                     "managed_keys", "key_order"])
+
+# name -> factory(PipelineContext) returning a Transform. Transforms run in registration order.
+TRANSFORM_FACTORIES = OrderedDict()
+
+
+def register_transform(name):
+    def decorator(factory):
+        TRANSFORM_FACTORIES[name] = factory
+        return factory
+
+    return decorator
+
+
+class PipelineContext:
+    """Run-wide inputs the transform factories need."""
+
+    def __init__(self, source_html_root_abs, target_mdx_root_abs, nav_cache=None, key_prefix=None):
+        self.source_html_root_abs = source_html_root_abs
+        self.target_mdx_root_abs = target_mdx_root_abs
+        self.nav_cache = nav_cache
+        self.key_prefix = key_prefix
+        self.master_nav_item_map = None
+
+
+class FrontMatterDocument:
+    """One file's state while it passes through the pipeline."""
+    __slots__ = ("path", "source", "front_matter", "front_matter_text", "load_error", "laid_out", "width", "strip_body")
+
+    def __init__(self, path, source, front_matter, load_error):
+        self.path = path
+        self.source = source
+        self.front_matter = front_matter  # None when the file has no usable front-matter mapping
+        self.front_matter_text = source.front_matter_text if front_matter is not None else None  # Kept up to date when patching
+        self.load_error = load_error  # The block exists but is not valid YAML
+        self.laid_out = False
+        self.width = None
+        self.strip_body = False
+
+
+@register_transform("sidebar")
+def sidebar_transform(context):
+    if context.master_nav_item_map is None:
+        context.master_nav_item_map = sidebar_frontmatter.cache_all_html_sidebar_maps(
+            context.source_html_root_abs, context.nav_cache, context.key_prefix)
+
+    def apply(doc):
+        if doc.front_matter is None:  # As read_front_matter(): start from an empty mapping
+            doc.front_matter = {}
+            if doc.load_error: doc.source = doc.source.without_front_matter()
+        mdx_key = sidebar_frontmatter.normalize_mdx_path_to_key(doc.path, context.target_mdx_root_abs)
+        sidebar_frontmatter.apply_nav_item(doc.front_matter, context.master_nav_item_map.get(mdx_key), mdx_key, doc.path)
+        return True
+
+    return Transform("sidebar", (".mdx",), apply, lambda front_matter, _: sidebar_frontmatter.arrange_front_matter(front_matter),
+                     1000, False, True, sidebar_frontmatter.MANAGED_FRONT_MATTER_KEYS, sidebar_frontmatter.SIDEBAR_KEY_ORDER)
+
+
+@register_transform("classes")
+def sidebar_classes_transform(context):
+    docs_path = Path(context.target_mdx_root_abs)
+
+    def apply(doc):
+        if doc.front_matter is None: return False  # update_sidebar_classes.py skips such files
+        return sidebar_classes.apply_sidebar_classes(doc.front_matter, Path(doc.path), docs_path,
+                                                     sidebar_classes.RELATIONSHIPS_SUBDIR,
+                                                     report=lambda line: logging.info(f"{doc.path}:{line}"))
+
+    return Transform("classes", DOC_SUFFIXES, apply, sidebar_classes.arrange_frontmatter, 9999, True, False,
+                     sidebar_classes.PRIORITY_KEYS, sidebar_classes.PRIORITY_KEYS)
+
+
+def read_document(path):
+    """Raises OSError if the file cannot be read."""
+    source = read_front_matter_file(path)
+    front_matter, load_error = None, False
+    if source.has_front_matter:
+        try:
+            loaded = source.load()
+            if isinstance(loaded, dict): front_matter = loaded
+        except yaml.YAMLError as e:
+            logging.error(f"YAML err in {path}: {e}")
+            load_error = True
+    return FrontMatterDocument(path, source, front_matter, load_error)
+
+
+def patch_stage(doc, transform, front_matter_before):
+    """
+    The front-matter text once transform has laid doc out in patch mode: the previous text patched for the
+    transform's managed keys, or, when that is not possible, a dump (which also drops blank lines as the
+    standalone script would).
+    """
+    if doc.front_matter_text is not None and doc.front_matter:
+        patched = patch_front_matter(doc.front_matter_text, front_matter_before, doc.front_matter,
+                                     transform.managed_keys, transform.key_order, width=transform.width)
+        if patched is not None: return patched
+        logging.debug(f"Front matter of {doc.path} needs a full dump for {transform.name}")
+    doc.strip_body = doc.strip_body or transform.strip_body
+    return dump_front_matter(doc.front_matter, width=transform.width) if doc.front_matter else None
+
+
+def render(doc, patch=False):
+    """The document's new text, or None if it can be left as is without reading the body."""
+    if patch:
+        front_matter_text = doc.front_matter_text
+    else:
+        front_matter_text = dump_front_matter(doc.front_matter, width=doc.width) if doc.front_matter else None
+    if front_matter_text is None:
+        return doc.source.body.lstrip()
+    if not doc.strip_body and doc.source.is_rendered_by(front_matter_text):
+        return None
+    return render_document(front_matter_text, doc.source.body.lstrip() if doc.strip_body else doc.source.body)
+
+
+def process_document(path, transforms, dry_run=False, dry_run_output_dir=None, target_mdx_root_abs=None, patch=False):
+    """Runs every applicable transform over one file and writes it once if its text changed. Returns a WRITE_* status."""
+    try:
+        doc = read_document(path)
+    except OSError as e:
+        logging.error(f"Error reading {path}: {e}")
+        return WRITE_FAILED
+    for transform in transforms:
+        if not path.endswith(transform.suffixes): continue
+        front_matter_before = dict(doc.front_matter) if doc.front_matter is not None else {}
+        if not transform.apply(doc) and not transform.always_lays_out: continue
+        arranged = transform.arrange(doc.front_matter, front_matter_before)
+        doc.front_matter = arranged if arranged else None  # An emptied mapping is written without a block
+        doc.laid_out = True
+        if patch:
+            doc.front_matter_text = patch_stage(doc, transform, front_matter_before)
+        else:
+            doc.width = transform.width
+            doc.strip_body = doc.strip_body or transform.strip_body
+    if not doc.laid_out:
+        return WRITE_UNCHANGED
+
+    new_content = render(doc, patch)
+    if new_content is None or read_text_or_none(path) == new_content:
+        status = WRITE_UNCHANGED
+    else:
+        status = WRITE_CHANGED
+    if dry_run:
+        logging.info(f"[DRY RUN] Would write to {path} ({status})")
+        if dry_run_output_dir and target_mdx_root_abs:
+            if new_content is None: new_content = doc.source.read_text()  # Unchanged
+            dry_run_file_path = os.path.join(dry_run_output_dir, os.path.relpath(path, target_mdx_root_abs))
+            try:
+                os.makedirs(os.path.dirname(dry_run_file_path), exist_ok=True)
+                with open(dry_run_file_path, 'w', encoding='utf-8') as f_dry: f_dry.write(new_content)
+            except OSError as e:
+                logging.error(f"Error writing dry run output for {path}: {e}")
+                return WRITE_FAILED
+        return status
+    if status == WRITE_UNCHANGED:
+        logging.debug(f"Front matter unchanged, not rewriting {path}")
+        return status
+    try:
+        write_text_atomic(path, new_content)
+    except OSError as e:
+        logging.error(f"Error writing {path}: {e}")
+        return WRITE_FAILED
+    return status
+
+
+def iter_doc_files(scan_root):
+    for dirpath, dirnames, filenames in os.walk(scan_root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(DOC_SUFFIXES): yield os.path.join(dirpath, filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Apply the sidebar front-matter transforms (generate_sidebar_frontmatter.py, then "
+                    "update_sidebar_classes.py) to every MDX/Markdown file in one pass.")
+    parser.add_argument("--source_html_root", default=sidebar_frontmatter.DEFAULT_SOURCE_HTML_ROOT)
+    parser.add_argument("--target_mdx_root", default=sidebar_frontmatter.DEFAULT_TARGET_MDX_ROOT)
+    parser.add_argument("--single_dir", help="Process only files in this subdirectory of target_mdx_root (e.g., 'attributes').")
+    parser.add_argument("--transforms", nargs="+", choices=list(TRANSFORM_FACTORIES), default=list(TRANSFORM_FACTORIES),
+                        help="Transforms to run (always in pipeline order). Default: all.")
+    parser.add_argument("--nav_cache",
+                        help=f"NavItem cache path (default: <target_mdx_root>/{sidebar_frontmatter.DEFAULT_NAV_CACHE_FILENAME}).")
+    parser.add_argument("--no_nav_cache", action="store_true", help="Parse every nav source HTML; neither read nor write the cache.")
+    parser.add_argument("--patch_front_matter", action="store_true",
+                        help="Rewrite only the lines of the keys the transforms manage, keeping the rest of each file byte for byte "
+                             "(front matter that cannot be patched is dumped as usual).")
+    parser.add_argument("--log_file", default="frontmatter_pipeline.log")
+    parser.add_argument("--log_level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
+    parser.add_argument("--dry_run", action="store_true")
+    parser.add_argument("--dry_run_output", help="Directory to write modified files during a dry run.")
+    args = parser.parse_args()
+
+    sidebar_frontmatter.setup_logging(args.log_level, args.log_file)
+    abs_source_html_root = os.path.abspath(args.source_html_root)
+    abs_target_mdx_root = os.path.abspath(args.target_mdx_root)
+    scan_root = os.path.join(abs_target_mdx_root, args.single_dir) if args.single_dir else abs_target_mdx_root
+    if not os.path.isdir(scan_root):
+        logging.error(f"Directory to process not found: {scan_root}")
+        return
+
+    dry_run_output_abs = None
+    if args.dry_run and args.dry_run_output:
+        dry_run_output_abs = os.path.abspath(args.dry_run_output)
+        os.makedirs(dry_run_output_abs, exist_ok=True)
+        logging.info(f"DRY RUN: Outputting modified files to {dry_run_output_abs}")
+
+    nav_cache = None
+    if "sidebar" in args.transforms and not args.no_nav_cache:
+        nav_cache = sidebar_frontmatter.NavCache(os.path.abspath(args.nav_cache) if args.nav_cache else
+                                                 os.path.join(abs_target_mdx_root, sidebar_frontmatter.DEFAULT_NAV_CACHE_FILENAME))
+        nav_cache.load()
+    key_prefix = os.path.normpath(args.single_dir).replace(os.sep, '/') if args.single_dir else None
+    context = PipelineContext(abs_source_html_root, abs_target_mdx_root, nav_cache,
+                              None if key_prefix == "." else key_prefix)
+    transforms = [factory(context) for name, factory in TRANSFORM_FACTORIES.items() if name in args.transforms]
+    if nav_cache is not None and (args.nav_cache or not args.dry_run): nav_cache.save()
+    logging.info(f"Transforms: {', '.join(t.name for t in transforms)}; processing files under {scan_root}")
+
+    write_counts = {WRITE_CHANGED: 0, WRITE_UNCHANGED: 0, WRITE_FAILED: 0}
+    for path in iter_doc_files(scan_root):
+        try:
+            write_counts[process_document(path, transforms, args.dry_run, dry_run_output_abs, abs_target_mdx_root,
+                                          args.patch_front_matter)] += 1
+        except Exception as e:
+            logging.error(f"Unhandled error processing {path}: {e}", exc_info=True)
+            write_counts[WRITE_FAILED] += 1
+
+    verb = "would change" if args.dry_run else "changed"
+    logging.info(f"Processing complete. Files {verb}: {write_counts[WRITE_CHANGED]}, "
+                 f"unchanged: {write_counts[WRITE_UNCHANGED]}, failed: {write_counts[WRITE_FAILED]}")
+    if context.master_nav_item_map is not None:
+        sidebar_frontmatter.check_nav_links(context.master_nav_item_map,
+                                            get_default_link_index().add_docs_under(abs_target_mdx_root, [".mdx", ".md"]),
+                                            abs_source_html_root)
+
+
+if __name__ == "__main__":
+    main()
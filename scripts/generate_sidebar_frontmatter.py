@@ -2,20 +2,46 @@
 import os
 import re
 import yaml # PyYAML
-from bs4 import BeautifulSoup
 import argparse
 import logging
 import shutil
+import sys
+import time
+import hashlib
+import json
+from collections import namedtuple
+
+import html_document_store
+import link_index
+import nav_tree
+from file_utils import read_text_or_none, write_text_atomic
+from frontmatter_io import dump_front_matter, patch_front_matter, read_front_matter_file, render_document
+from fs_watch import PollingWatcher
+from html_document_store import get_default_store
+from link_index import get_default_link_index
+from nav_tree import build_nav_tree
 
 # --- Configuration Constants ---
+# write_front_matter() outcomes, tallied in the run summary
+WRITE_CHANGED = "changed"
+WRITE_UNCHANGED = "unchanged"
+WRITE_FAILED = "failed"
+
 DEFAULT_SOURCE_HTML_ROOT = "ISBDM/docs/"
 DEFAULT_TARGET_MDX_ROOT = "docs/"
+DEFAULT_NAV_CACHE_FILENAME = ".sidebar_nav_cache.json"  # Kept in target_mdx_root unless --nav_cache says otherwise
+NAV_CACHE_VERSION = "2"  # Bump to invalidate every persisted NavItem list
 SES_HTML_SOURCE_DIR_FROM_ROOT = "ves"
 SES_HTML_INDEX_FILENAME = "ISBDMSES.html"
 SES_TARGET_MDX_SECTION_KEY = "ses" # MDX section for SES items
 
 # CSS class for styling locally top-level items (e.g., level 1 within an HTML nav block)
 CLASS_LOCAL_LEVEL_1_ITEM = "menu-item-html-level-1" # For making them bolder
+# The keys this script writes, in the order it writes them ahead of any other front matter
+SIDEBAR_KEY_ORDER = ["sidebar_label", "sidebar_level", "sidebar_position", "sidebar_class_name", "sidebar_category", "customProps"]
+# What --patch_front_matter may rewrite in place; everything else in the block is left byte for byte
+MANAGED_FRONT_MATTER_KEYS = ["sidebar_label", "sidebar_level", "sidebar_position", "sidebar_class_name", "sidebar_category",
+                             "customProps.sidebar_prefix"]
 
 # Relationship section configuration
 RELATIONSHIPS_SOURCE_DIR_FROM_ROOT = "relationships"
@@ -70,31 +96,9 @@ def normalize_mdx_path_to_key(mdx_file_path, base_dir):
     return os.path.normpath(path_no_ext).replace(os.sep, '/')
 
 def normalize_html_href_to_key(href, source_html_section_key, source_html_root_abs):
-    if not href: return None
-
-    # Special handling for relationship files linked from their own category HTMLs
-    # e.g. href="1005.html" from "relationships/agents.html" -> key "relationships/1005"
-    # source_html_section_key here will be "relationships"
-    is_relationship_sub_file = source_html_section_key == RELATIONSHIPS_TARGET_MDX_DIR_KEY and \
-                               not href.endswith("index.html") and \
-                               not any(cat_file + ".html" == href for cat_file in RELATIONSHIP_CATEGORY_FILES)
-
-
-    path_part = ""
-    if href.startswith(source_html_root_abs):
-        path_part = href[len(source_html_root_abs):].lstrip("/")
-    elif href.startswith("/ISBDM/docs/"):
-         path_part = href[len("/ISBDM/docs/"):].lstrip("/")
-    elif href.startswith("/"):
-        logging.warning(f"Found absolute href '{href}' not matching known root in section '{source_html_section_key}'.")
-        path_part = href.lstrip("/")
-    else: # Relative path like "1022.html" or "sub/file.html"
-        # For relationship sub-files, section_key is 'relationships', href is '1005.html'
-        path_part = os.path.join(source_html_section_key, href)
-
-    path_no_ext, _ = os.path.splitext(path_part)
-    normalized = os.path.normpath(path_no_ext).replace(os.sep, '/')
-    return normalized
+    # Site-absolute hrefs map directly; relative ones (e.g. "1005.html" from relationships/agents.html) are
+    # resolved against the section directory. Memoized in the shared link index.
+    return get_default_link_index().doc_key(href, source_html_section_key, source_html_root_abs)
 
 # --- Core Parsing and Hierarchy Logic (for Prefixes within each HTML block) ---
 def parse_html_nav_block(html_file_path,
@@ -103,27 +107,21 @@ def parse_html_nav_block(html_file_path,
                          relationship_category_name=None): # e.g. "agents"
     nav_items = []
     try:
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f.read(), 'html.parser')
+        nav_blocks = get_default_store().get(html_file_path).nav_blocks
     except FileNotFoundError:
         logging.error(f"HTML file not found: {html_file_path}")
         return nav_items
 
-    nav_container_candidates = soup.select('div.col-md-5 nav.navISBDMSection, div.col-md-6 nav.navISBDMSection, div.col-md-12 nav.navISBDMSection, nav.navISBDMSection')
-
     item_position_counter = 0
-    for nav_container in nav_container_candidates:
-        link_divs = nav_container.find_all('div', class_='d-flex', recursive=False)
-        for div_idx, div in enumerate(link_divs):
-            link_tag = div.find('a', href=True)
-            if link_tag:
+    for nav_rows in nav_blocks:
+        for nav_row in nav_rows:
+            if nav_row.href is not None:
                 item_position_counter += 1
-                href = link_tag.get('href', '').strip()
-                label = normalize_text(link_tag.get_text())
+                href = nav_row.href
+                label = normalize_text(nav_row.label)
 
-                indent_icons = div.find_all('i', class_='bi-arrow-return-right')
                 # Relative level: 1 for no icons, 2 for one icon, etc.
-                relative_html_level = 1 + len(indent_icons)
+                relative_html_level = 1 + nav_row.indent_depth
 
                 normalized_key = normalize_html_href_to_key(href, source_html_section_key_for_norm, source_html_root_abs)
                 if not normalized_key:
@@ -140,17 +138,12 @@ def parse_html_nav_block(html_file_path,
 
     # Determine is_last_sibling_in_block and ancestor_is_last_flags_in_block for this list
     if nav_items:
-        # is_last_sibling_in_block
-        for i, current_item in enumerate(nav_items):
-            current_item.is_last_sibling_in_block = True
-            for j in range(i + 1, len(nav_items)):
-                next_item = nav_items[j]
-                if next_item.relative_html_level == current_item.relative_html_level:
-                    current_item.is_last_sibling_in_block = False; break
-                if next_item.relative_html_level < current_item.relative_html_level:
-                    break
-
-        # ancestor_is_last_flags_in_block & has_children_in_block
+        # is_last_sibling_in_block & has_children_in_block, from the block's parent/children tree
+        for node in build_nav_item_tree(nav_items).nodes:
+            node.item.is_last_sibling_in_block = node.is_last_sibling
+            node.item.has_children_in_block = node.has_children
+
+        # ancestor_is_last_flags_in_block (level-slot stack, one pass)
         parent_is_last_at_level_stack = []
         for i, item in enumerate(nav_items):
             while len(parent_is_last_at_level_stack) >= item.relative_html_level:
@@ -160,12 +153,14 @@ def parse_html_nav_block(html_file_path,
                  parent_is_last_at_level_stack.append(item.is_last_sibling_in_block)
             elif parent_is_last_at_level_stack : # Should have item.relative_html_level elements if stack is full
                  parent_is_last_at_level_stack[item.relative_html_level -1] = item.is_last_sibling_in_block
-
-            if i + 1 < len(nav_items) and nav_items[i+1].relative_html_level > item.relative_html_level:
-                item.has_children_in_block = True
     return nav_items
 
 
+def build_nav_item_tree(nav_items):
+    """Parent/children tree (see nav_tree.py) of one HTML nav block's NavItems, by relative level."""
+    return build_nav_tree(nav_items, lambda item: item.relative_html_level)
+
+
 def generate_sidebar_prefix(nav_item: NavItem): # Operates on relative levels
     if nav_item.relative_html_level < 2: return None # Prefixes start for items indented at least once
     prefix_parts = []
@@ -177,11 +172,11 @@ def generate_sidebar_prefix(nav_item: NavItem): # Operates on relative levels
     return "".join(prefix_parts)
 
 
-def cache_all_html_sidebar_maps(source_html_root_abs):
-    # Key: normalized_key (e.g., "attributes/1022"), Value: NavItem object
-    # This provides a flat lookup for any NavItem based on its final MDX-like key.
-    master_nav_item_map = {}
+# One nav source HTML file, in merge order. kind picks the merge rule in cache_all_html_sidebar_maps().
+NavSource = namedtuple("NavSource", ["html_file_path", "section_key", "relationship_category", "kind"])
 
+
+def iter_nav_sources(source_html_root_abs):
     for source_dir_name in os.listdir(source_html_root_abs):
         current_source_dir_abs = os.path.join(source_html_root_abs, source_dir_name)
         if os.path.isdir(current_source_dir_abs):
@@ -192,102 +187,340 @@ def cache_all_html_sidebar_maps(source_html_root_abs):
                 for rel_cat_file_base in RELATIONSHIP_CATEGORY_FILES:
                     html_file_to_parse = os.path.join(current_source_dir_abs, f"{rel_cat_file_base}.html")
                     if os.path.exists(html_file_to_parse):
-                        logging.info(f"Parsing relationships HTML: {html_file_to_parse} for category '{rel_cat_file_base}'")
                         # The section key for normalization is "relationships" for all these
                         # The relationship_category_name is the file base itself.
-                        nav_items = parse_html_nav_block(html_file_to_parse,
-                                                         RELATIONSHIPS_TARGET_MDX_DIR_KEY,
-                                                         source_html_root_abs,
-                                                         relationship_category_name=rel_cat_file_base if rel_cat_file_base not in ["index", "general"] else None)
-                        for item in nav_items:
-                            if item.normalized_key in master_nav_item_map:
-                                logging.warning(f"Duplicate normalized key '{item.normalized_key}' found. Overwriting with item from {html_file_to_parse}")
-                            master_nav_item_map[item.normalized_key] = item
+                        yield NavSource(html_file_to_parse, RELATIONSHIPS_TARGET_MDX_DIR_KEY,
+                                        rel_cat_file_base if rel_cat_file_base not in ["index", "general"] else None,
+                                        "relationships")
                     else:
                         logging.debug(f"Relationships HTML {html_file_to_parse} not found.")
             elif source_dir_name == SES_HTML_SOURCE_DIR_FROM_ROOT: # "ves" directory, containing SES source
                 ses_html_abs_path = os.path.join(current_source_dir_abs, SES_HTML_INDEX_FILENAME) # .../ves/ISBDMSES.html
                 if os.path.exists(ses_html_abs_path):
-                    logging.info(f"Parsing SES HTML: {ses_html_abs_path}")
                     # Items parsed from ISBDMSES.html belong to the "ses" MDX section for key normalization
                     # and will have relationship_category=None (unless explicitly set if needed)
-                    nav_items = parse_html_nav_block(ses_html_abs_path,
-                                                     SES_TARGET_MDX_SECTION_KEY, # Normalize hrefs to "ses/..."
-                                                     source_html_root_abs)
-                    for item in nav_items:
-                        master_nav_item_map[item.normalized_key] = item
+                    yield NavSource(ses_html_abs_path, SES_TARGET_MDX_SECTION_KEY, None, "ses")
 
                 # Also parse actual "ves" items from "ves/index.html" if it exists
                 # and isn't ISBDMSES.html
                 ves_index_html_abs_path = os.path.join(current_source_dir_abs, "index.html")
                 if os.path.exists(ves_index_html_abs_path) and SES_HTML_INDEX_FILENAME != "index.html":
-                    logging.info(f"Parsing VES HTML: {ves_index_html_abs_path}")
-                    nav_items_ves = parse_html_nav_block(ves_index_html_abs_path,
-                                                         source_dir_name, # Normalize hrefs to "ves/..."
-                                                         source_html_root_abs)
-                    for item in nav_items_ves:
-                         # Avoid overwriting if SES items were keyed under "ves/..." by mistake in normalize_html_href_to_key
-                        if not item.normalized_key.startswith(SES_TARGET_MDX_SECTION_KEY + "/"):
-                            if item.normalized_key in master_nav_item_map:
-                                logging.warning(f"Duplicate normalized key '{item.normalized_key}' from ves/index.html. Check parsing.")
-                            master_nav_item_map[item.normalized_key] = item
+                    yield NavSource(ves_index_html_abs_path, source_dir_name, None, "ves")
             else: # General section (attributes, intro, fullex, etc.)
                 # Assume index.html is the primary source for the section's sidebar items
                 html_file_to_parse = os.path.join(current_source_dir_abs, "index.html")
                 if os.path.exists(html_file_to_parse):
-                    logging.info(f"Parsing general HTML: {html_file_to_parse} for section '{source_dir_name}'")
-                    nav_items = parse_html_nav_block(html_file_to_parse,
-                                                     source_dir_name, # Normalize hrefs to "section_name/..."
-                                                     source_html_root_abs)
-                    for item in nav_items:
-                        if item.normalized_key in master_nav_item_map:
-                             logging.warning(f"Duplicate normalized key '{item.normalized_key}' found. Overwriting with item from {html_file_to_parse}")
-                        master_nav_item_map[item.normalized_key] = item
+                    yield NavSource(html_file_to_parse, source_dir_name, None, "general")
                 else:
                     logging.debug(f"No index.html in {current_source_dir_abs} to parse for NavItems.")
 
+
+def _parse_nav_source(source, source_html_root_abs):
+    if source.kind == "relationships":
+        logging.info(f"Parsing relationships HTML: {source.html_file_path} for category '{os.path.splitext(os.path.basename(source.html_file_path))[0]}'")
+    elif source.kind == "ses":
+        logging.info(f"Parsing SES HTML: {source.html_file_path}")
+    elif source.kind == "ves":
+        logging.info(f"Parsing VES HTML: {source.html_file_path}")
+    else:
+        logging.info(f"Parsing general HTML: {source.html_file_path} for section '{source.section_key}'")
+    return parse_html_nav_block(source.html_file_path, source.section_key, source_html_root_abs,
+                                relationship_category_name=source.relationship_category)
+
+
+def key_is_under(key, key_prefix):
+    return key_prefix is None or key == key_prefix or key.startswith(key_prefix + "/")
+
+
+class NavCache:
+    """
+    The NavItems of each nav source HTML file, persisted as compact JSON and keyed by the file's content hash,
+    so a run only parses the sources that changed since the last one. Entries are dropped as a whole when the
+    code that derives NavItems (this script or the modules it parses with) changes. Each entry also keeps the
+    file's mtime and size, so a run limited to one key prefix can pass over unchanged sources that contribute
+    nothing under it without reading them.
+    """
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.fingerprint = nav_cache_fingerprint()
+        self.entries = {}
+        self.reset_counts()
+        self._dirty = False
+
+    def reset_counts(self):
+        """Zeroes the per-build counters; the same NavCache serves every rebuild in --watch and the server."""
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (ValueError, OSError) as e:
+            logging.warning(f"Ignoring unreadable nav cache {self.cache_path}: {e}")
+            return
+        if isinstance(data, dict) and data.get("fingerprint") == self.fingerprint:
+            self.entries = data.get("sources", {})
+        else:
+            logging.info(f"Nav cache {self.cache_path} was written by different code; rebuilding it.")
+
+    def save(self):
+        if not self._dirty: return
+        data = {"fingerprint": self.fingerprint, "sources": dict(sorted(self.entries.items()))}
+        write_text_atomic(self.cache_path, json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._dirty = False
+
+    def _entry_for(self, source, rel_path):
+        entry = self.entries.get(rel_path)
+        if not entry or entry["section_key"] != source.section_key or \
+                entry["relationship_category"] != source.relationship_category:
+            return None
+        return entry
+
+    def lookup(self, source, rel_path, source_sha256, source_stat):
+        """The cached item rows for source, or None if it is not cached or its content/parameters changed."""
+        entry = self._entry_for(source, rel_path)
+        if entry is None or entry["sha256"] != source_sha256: return None
+        if (entry["mtime_ns"], entry["size"]) != (source_stat.st_mtime_ns, source_stat.st_size):
+            entry["mtime_ns"], entry["size"] = source_stat.st_mtime_ns, source_stat.st_size  # Touched, not changed
+            self._dirty = True
+        return entry["items"]
+
+    def contributes_nothing_under(self, source, rel_path, source_stat, key_prefix):
+        """True if source is cached, has the same mtime and size as then, and had no keys under key_prefix."""
+        entry = self._entry_for(source, rel_path)
+        if entry is None or (entry["mtime_ns"], entry["size"]) != (source_stat.st_mtime_ns, source_stat.st_size):
+            return False
+        return not any(key_is_under(row[1], key_prefix) for row in entry["items"])
+
+    def record(self, source, rel_path, source_sha256, source_stat, nav_items):
+        self.entries[rel_path] = {
+            "sha256": source_sha256, "mtime_ns": source_stat.st_mtime_ns, "size": source_stat.st_size,
+            "section_key": source.section_key, "relationship_category": source.relationship_category,
+            "items": [[item.original_href, item.normalized_key, item.label, item.relative_html_level,
+                       item.position_in_html_block, item.is_last_sibling_in_block,
+                       item.ancestor_is_last_flags_in_block, item.has_children_in_block] for item in nav_items]}
+        self._dirty = True
+
+    @staticmethod
+    def to_nav_items(rows, source):
+        nav_items = []
+        for href, key, label, level, position, is_last_sibling, ancestor_flags, has_children in rows:
+            item = NavItem(original_href=href, normalized_key=key, label=label, relative_html_level=level,
+                           position_in_html_block=position, source_html_file_path=source.html_file_path,
+                           relationship_category=source.relationship_category)
+            item.is_last_sibling_in_block = is_last_sibling
+            item.ancestor_is_last_flags_in_block = ancestor_flags
+            item.has_children_in_block = has_children
+            nav_items.append(item)
+        return nav_items
+
+    def prune(self, rel_paths_seen):
+        """Drops the entries of nav sources that no longer exist."""
+        for rel_path in set(self.entries) - set(rel_paths_seen):
+            del self.entries[rel_path]
+            self._dirty = True
+
+    def summary(self):
+        skipped = f", {self.skipped} skipped as outside the selected directory" if self.skipped else ""
+        return f"Nav cache: {self.hits} source(s) reused, {self.misses} parsed{skipped}"
+
+
+class SectionDependencyGraph:
+    """
+    Which nav source HTML file feeds which MDX docs: "ses" comes from ves/ISBDMSES.html, "relationships" is merged
+    from its category files, every other section comes from its index.html. Built from the NavCache rows, so the
+    graph of the previous run is available before any HTML is parsed.
+
+    Only nav sources matter: a content page (e.g. attributes/1022.html) feeds no sidebar front matter.
+    """
+
+    def __init__(self):
+        self.keys_by_source = {}  # Source path relative to the HTML root -> doc keys its nav lists
+
+    @classmethod
+    def from_nav_cache(cls, nav_cache):
+        graph = cls()
+        for rel_path, entry in nav_cache.entries.items():
+            graph.keys_by_source[rel_path] = {row[1] for row in entry["items"]}
+        return graph
+
+    @property
+    def is_empty(self):
+        return not self.keys_by_source
+
+    def affected_keys(self, changed_rel_paths, previous=None):
+        """
+        Doc keys whose front matter may change when the given HTML files change: every key their nav lists
+        now and, per the previous run's graph, every key it listed before (removed entries must be cleaned).
+        """
+        affected = set()
+        for rel_path in changed_rel_paths:
+            affected.update(self.keys_by_source.get(rel_path, ()))
+            if previous is not None: affected.update(previous.keys_by_source.get(rel_path, ()))
+        return affected
+
+
+def nav_cache_fingerprint():
+    """Hash of the code that turns nav HTML into NavItems, plus NAV_CACHE_VERSION."""
+    digest = hashlib.sha256(NAV_CACHE_VERSION.encode())
+    for module in (sys.modules[__name__], html_document_store, link_index, nav_tree):
+        with open(module.__file__, 'rb') as f: digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def load_nav_items(source, source_html_root_abs, nav_cache=None, key_prefix=None):
+    """
+    NavItems of one source (from nav_cache when its content is unchanged), limited to keys under key_prefix.
+    With key_prefix, an unchanged cached source that has no items under it is not read at all.
+    """
+    if nav_cache is None:
+        nav_items = _parse_nav_source(source, source_html_root_abs)
+        return [item for item in nav_items if key_is_under(item.normalized_key, key_prefix)]
+    rel_path = os.path.relpath(source.html_file_path, source_html_root_abs).replace(os.sep, '/')
+    source_stat = os.stat(source.html_file_path)
+    if key_prefix is not None and nav_cache.contributes_nothing_under(source, rel_path, source_stat, key_prefix):
+        nav_cache.skipped += 1
+        logging.debug(f"Nav cache: {rel_path} has no items under '{key_prefix}', not reading it")
+        return []
+    with open(source.html_file_path, 'rb') as f:
+        source_sha256 = hashlib.sha256(f.read()).hexdigest()
+    rows = nav_cache.lookup(source, rel_path, source_sha256, source_stat)
+    if rows is None:
+        nav_cache.misses += 1
+        nav_items = _parse_nav_source(source, source_html_root_abs)
+        nav_cache.record(source, rel_path, source_sha256, source_stat, nav_items)
+        return [item for item in nav_items if key_is_under(item.normalized_key, key_prefix)]
+    nav_cache.hits += 1
+    logging.debug(f"Nav cache hit: {rel_path}")
+    return NavCache.to_nav_items([row for row in rows if key_is_under(row[1], key_prefix)], source)
+
+
+def cache_all_html_sidebar_maps(source_html_root_abs, nav_cache=None, key_prefix=None):
+    # Key: normalized_key (e.g., "attributes/1022"), Value: NavItem object
+    # This provides a flat lookup for any NavItem based on its final MDX-like key.
+    # key_prefix (e.g. "attributes") keeps only the items of that MDX directory, as --single_dir needs.
+    master_nav_item_map = {}
+
+    if nav_cache is not None: nav_cache.reset_counts()
+    nav_sources = list(iter_nav_sources(source_html_root_abs))
+    for source in nav_sources:
+        nav_items = load_nav_items(source, source_html_root_abs, nav_cache, key_prefix)
+        if source.kind == "ses":
+            for item in nav_items:
+                master_nav_item_map[item.normalized_key] = item
+        elif source.kind == "ves":
+            for item in nav_items:
+                 # Avoid overwriting if SES items were keyed under "ves/..." by mistake in normalize_html_href_to_key
+                if not item.normalized_key.startswith(SES_TARGET_MDX_SECTION_KEY + "/"):
+                    if item.normalized_key in master_nav_item_map:
+                        logging.warning(f"Duplicate normalized key '{item.normalized_key}' from ves/index.html. Check parsing.")
+                    master_nav_item_map[item.normalized_key] = item
+        else:
+            for item in nav_items:
+                if item.normalized_key in master_nav_item_map:
+                    logging.warning(f"Duplicate normalized key '{item.normalized_key}' found. Overwriting with item from {source.html_file_path}")
+                master_nav_item_map[item.normalized_key] = item
+
+    if nav_cache is not None:
+        nav_cache.prune(os.path.relpath(source.html_file_path, source_html_root_abs).replace(os.sep, '/')
+                        for source in nav_sources)
+        logging.info(nav_cache.summary())
     logging.info(f"Cached {len(master_nav_item_map)} NavItems in total.")
     return master_nav_item_map
 
 
+def affected_mdx_files(changed_html_paths, abs_source_html_root, abs_target_mdx_root, graph, previous_graph, scan_root):
+    """
+    MDX files under scan_root whose front matter depends on one of the changed HTML files (paths relative to the
+    working directory or absolute; anything that is not HTML under the source root is ignored). Returns None
+    when there is no previous graph to compare with, i.e. when every file has to be processed.
+    """
+    if previous_graph is None or previous_graph.is_empty: return None
+    changed_rel_paths = []
+    for path in changed_html_paths:
+        abs_path = os.path.abspath(path)
+        if abs_path.lower().endswith(".html") and abs_path.startswith(abs_source_html_root + os.sep):
+            changed_rel_paths.append(os.path.relpath(abs_path, abs_source_html_root).replace(os.sep, '/'))
+    changed_sources = sorted(p for p in changed_rel_paths if p in graph.keys_by_source or p in previous_graph.keys_by_source)
+    mdx_files = []
+    for key in sorted(graph.affected_keys(changed_rel_paths, previous_graph)):
+        mdx_file_path = os.path.join(abs_target_mdx_root, *key.split('/')) + ".mdx"
+        if mdx_file_path.startswith(scan_root + os.sep) and os.path.isfile(mdx_file_path): mdx_files.append(mdx_file_path)
+    logging.info(f"{len(changed_rel_paths)} changed HTML file(s), {len(changed_sources)} of them nav source(s)"
+                 f"{': ' + ', '.join(changed_sources) if changed_sources else ''}; {len(mdx_files)} MDX file(s) affected")
+    return mdx_files
+
+
+def check_nav_links(master_nav_item_map, link_index, source_html_root_abs):
+    """Reports sidebar nav entries whose target has no MDX document in link_index."""
+    link_index.unresolved.clear()
+    for key, item in sorted(master_nav_item_map.items()):
+        link_index.check(os.path.relpath(item.source_html_file_path, source_html_root_abs).replace(os.sep, '/'), [key])
+    link_index.report_unresolved(logging.getLogger())
+
+
 # --- Front Matter Read/Write (same as previous good version) ---
 def read_front_matter(mdx_file_path):
+    """Returns (front matter dict, FrontMatterFile). The file's body is only read if it is needed for a write."""
+    try: source = read_front_matter_file(mdx_file_path)
+    except FileNotFoundError: return {}, None
+    if not source.has_front_matter: return {}, source
     try:
-        with open(mdx_file_path, 'r', encoding='utf-8') as f: content = f.read()
-    except FileNotFoundError: return {}, ""
-    fm_match = re.match(r'^---\s*?\n(.*?\n)---\s*?\n?(.*)', content, re.DOTALL)
-    if fm_match:
-        fm_str, body_content = fm_match.group(1), fm_match.group(2) if fm_match.group(2) is not None else ""
-        try:
-            fm_dict = yaml.safe_load(fm_str); return (fm_dict if isinstance(fm_dict, dict) else {}), body_content
-        except yaml.YAMLError as e: logging.error(f"YAML err in {mdx_file_path}: {e}"); return {}, content
-    return {}, content
+        fm_dict = source.load(); return (fm_dict if isinstance(fm_dict, dict) else {}), source
+    except yaml.YAMLError as e: logging.error(f"YAML err in {mdx_file_path}: {e}"); return {}, source.without_front_matter()
 
-def write_front_matter(mdx_file_path, front_matter_dict, body_content, dry_run=False, dry_run_output_dir=None, target_mdx_root_abs=None):
+def arrange_front_matter(front_matter_dict):
+    """The key order this script writes: sidebar_label, the other sidebar keys, then everything else. Consumes the input."""
     # Clean up empty customProps before dumping
     if "customProps" in front_matter_dict and not front_matter_dict["customProps"]:
         del front_matter_dict["customProps"]
 
-    # Ensure our specific keys are ordered after sidebar_label if possible, or create new FM
+    # Our keys first (sidebar_label leading), then the rest
     ordered_fm = {}
-    if "sidebar_label" in front_matter_dict: # Ensure label is first of our keys
-        ordered_fm["sidebar_label"] = front_matter_dict.pop("sidebar_label")
-
-    # Add our specific keys if they exist in the input dict
-    for key in ["sidebar_level", "sidebar_position", "sidebar_class_name", "sidebar_category", "customProps"]:
+    for key in SIDEBAR_KEY_ORDER:
         if key in front_matter_dict:
             ordered_fm[key] = front_matter_dict.pop(key)
 
     # Add back any other keys that were in original or added by other means
     for key, value in front_matter_dict.items():
         ordered_fm[key] = value
-
-    final_fm_to_write = ordered_fm
-
-    final_content = body_content.lstrip() if not final_fm_to_write else f"---\n{yaml.dump(final_fm_to_write, sort_keys=False, allow_unicode=True, default_flow_style=False, width=1000)}---\n{body_content}"
+    return ordered_fm
+
+
+def write_front_matter(mdx_file_path, front_matter_dict, source, dry_run=False, dry_run_output_dir=None, target_mdx_root_abs=None,
+                       patch_from=None):
+    """
+    Writes the arranged front matter. With patch_from (the front matter as read from source), only the managed
+    keys' lines are rewritten when the block allows it; otherwise the whole block is dumped.
+    """
+    final_fm_to_write = arrange_front_matter(front_matter_dict)
+
+    fm_text = None
+    if patch_from is not None and source is not None:
+        fm_text = patch_front_matter(source.front_matter_text, patch_from, final_fm_to_write, MANAGED_FRONT_MATTER_KEYS,
+                                     SIDEBAR_KEY_ORDER, width=1000)
+        if fm_text is None and source.has_front_matter: logging.debug(f"Front matter of {mdx_file_path} needs a full dump")
+    if fm_text is None and final_fm_to_write: fm_text = dump_front_matter(final_fm_to_write, width=1000)
+
+    # Leave byte-identical files untouched so their mtimes (and the Docusaurus/webpack cache) survive the run.
+    # Most files are unchanged, and for those the front matter alone settles it without reading the body.
+    if source is not None and fm_text is not None and source.is_rendered_by(fm_text):
+        status = WRITE_UNCHANGED
+        if not dry_run:
+            logging.debug(f"Front matter unchanged, not rewriting {mdx_file_path}")
+            return status
+        final_content = render_document(fm_text, source.body)
+    else:
+        body_content = source.body if source is not None else ""
+        final_content = body_content.lstrip() if fm_text is None else render_document(fm_text, body_content)
+        status = WRITE_UNCHANGED if read_text_or_none(mdx_file_path) == final_content else WRITE_CHANGED
 
     if dry_run:
-        logging.info(f"[DRY RUN] Would write to {mdx_file_path} (FM keys: {list(final_fm_to_write.keys())})")
+        logging.info(f"[DRY RUN] Would write to {mdx_file_path} (FM keys: {list(final_fm_to_write.keys())}, {status})")
         if dry_run_output_dir and target_mdx_root_abs:
             try:
                 # Construct relative path from target_mdx_root_abs, not its parent
@@ -297,22 +530,37 @@ def write_front_matter(mdx_file_path, front_matter_dict, body_content, dry_run=F
                 with open(dry_run_file_path, 'w', encoding='utf-8') as f_dry: f_dry.write(final_content)
             except Exception as e:
                 logging.error(f"Error writing dry run output for {mdx_file_path}: {e}")
-        return
+                return WRITE_FAILED
+        return status
+    if status == WRITE_UNCHANGED:
+        logging.debug(f"Front matter unchanged, not rewriting {mdx_file_path}")
+        return status
     try:
-        with open(mdx_file_path, 'w', encoding='utf-8') as f: f.write(final_content)
-    except Exception as e: logging.error(f"Error writing FM to {mdx_file_path}: {e}")
+        write_text_atomic(mdx_file_path, final_content)
+    except Exception as e:
+        logging.error(f"Error writing FM to {mdx_file_path}: {e}")
+        return WRITE_FAILED
+    return status
 
 
-def process_single_mdx_file(mdx_file_path_abs, target_mdx_root_abs, master_nav_item_map, dry_run, dry_run_output_dir):
+def process_single_mdx_file(mdx_file_path_abs, target_mdx_root_abs, master_nav_item_map, dry_run, dry_run_output_dir, patch=False):
     logging.info(f"Processing MDX: {mdx_file_path_abs}")
 
     # Get normalized key for this MDX file to look up in master_nav_item_map
     mdx_key = normalize_mdx_path_to_key(mdx_file_path_abs, target_mdx_root_abs)
     nav_item = master_nav_item_map.get(mdx_key)
 
-    existing_fm, body_content = read_front_matter(mdx_file_path_abs)
+    existing_fm, source = read_front_matter(mdx_file_path_abs)
     updated_fm = dict(existing_fm) # Operate on a copy
+    apply_nav_item(updated_fm, nav_item, mdx_key, mdx_file_path_abs)
+    return write_front_matter(mdx_file_path_abs, updated_fm, source, dry_run, dry_run_output_dir, target_mdx_root_abs,
+                              existing_fm if patch else None)
+
 
+def apply_nav_item(updated_fm, nav_item, mdx_key, mdx_file_path_abs):
+    """Sets (or, without a NavItem, removes) the sidebar keys of one file's front matter dict in place."""
+    if isinstance(updated_fm.get("customProps"), dict):  # Copied, so the caller's dict keeps the values as read
+        updated_fm["customProps"] = dict(updated_fm["customProps"])
     if not nav_item:
         logging.debug(f"No NavItem found for MDX key '{mdx_key}' ({mdx_file_path_abs}). Cleaning potentially stale sidebar FM.")
         for key_to_remove in ["sidebar_label", "sidebar_level", "sidebar_position", "sidebar_class_name", "sidebar_category"]:
@@ -359,8 +607,63 @@ def process_single_mdx_file(mdx_file_path_abs, target_mdx_root_abs, master_nav_i
         elif "customProps" in updated_fm and isinstance(updated_fm.get("customProps"), dict) and "sidebar_prefix" in updated_fm["customProps"]:
             del updated_fm["customProps"]["sidebar_prefix"]
 
-    write_front_matter(mdx_file_path_abs, updated_fm, body_content, dry_run, dry_run_output_dir, target_mdx_root_abs)
-    return True
+# --- Watch Mode ---
+def nav_item_signature(nav_item):
+    """Everything process_single_mdx_file() derives from a NavItem; equal signatures produce equal front matter."""
+    return (nav_item.label, nav_item.relative_html_level, nav_item.position_in_html_block,
+            nav_item.relationship_category, generate_sidebar_prefix(nav_item))
+
+
+def changed_nav_keys(old_map, new_map):
+    """Keys that were added, removed, or whose NavItem would now produce different front matter."""
+    changed = set(old_map.keys() ^ new_map.keys())
+    for key in old_map.keys() & new_map.keys():
+        if nav_item_signature(old_map[key]) != nav_item_signature(new_map[key]):
+            changed.add(key)
+    return changed
+
+
+def watch_and_update(abs_source_html_root, abs_target_mdx_root, master_nav_item_map, scan_root, nav_cache=None,
+                     key_prefix=None, patch=False):
+    """
+    Keeps the NavItem map in memory and, until interrupted, updates front matter as files change:
+    a changed HTML nav source rebuilds the map (the document store re-parses only the modified pages) and
+    reprocesses only the MDX files whose NavItem changed; an MDX file that was rewritten externally (e.g. by
+    the HTML -> MDX converter) is reprocessed on its own. Files this mode writes are not reported back to it.
+    """
+    watcher = PollingWatcher([abs_source_html_root, abs_target_mdx_root], [".html", ".mdx"])
+    logging.info(f"Watching '{abs_source_html_root}' and '{abs_target_mdx_root}' for changes (Ctrl+C to stop)")
+    try:
+        for changes in watcher.batches():
+            started = time.perf_counter()
+            mdx_to_process = {path for path in changes.changed
+                              if path.endswith(".mdx") and path.startswith(scan_root + os.sep)}
+            if any(path.endswith(".html") for path in changes.changed + changes.removed):
+                new_map = cache_all_html_sidebar_maps(abs_source_html_root, nav_cache, key_prefix)
+                if nav_cache is not None: nav_cache.save()
+                for key in changed_nav_keys(master_nav_item_map, new_map):
+                    mdx_file_path = os.path.join(abs_target_mdx_root, *key.split('/')) + ".mdx"
+                    if mdx_file_path.startswith(scan_root + os.sep) and os.path.isfile(mdx_file_path):
+                        mdx_to_process.add(mdx_file_path)
+                master_nav_item_map = new_map
+
+            write_counts = {WRITE_CHANGED: 0, WRITE_UNCHANGED: 0, WRITE_FAILED: 0}
+            written = []
+            for mdx_file_path in sorted(mdx_to_process):
+                try:
+                    status = process_single_mdx_file(mdx_file_path, abs_target_mdx_root, master_nav_item_map, False, None,
+                                                     patch)
+                except Exception as e:
+                    logging.error(f"Unhandled error processing {mdx_file_path}: {e}", exc_info=True)
+                    status = WRITE_FAILED
+                write_counts[status] += 1
+                if status == WRITE_CHANGED: written.append(mdx_file_path)
+            watcher.acknowledge(written)
+            logging.info(f"Watch: MDX files changed: {write_counts[WRITE_CHANGED]}, unchanged: {write_counts[WRITE_UNCHANGED]}, "
+                         f"failed: {write_counts[WRITE_FAILED]} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        logging.info("Watch mode stopped.")
+
 
 # --- Main Execution ---
 def main():
@@ -372,7 +675,23 @@ def main():
     parser.add_argument("--log_level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
     parser.add_argument("--dry_run", action="store_true")
     parser.add_argument("--dry_run_output", help="Directory to write modified files during a dry run.")
+    parser.add_argument("--nav_cache",
+                        help=f"NavItem cache path (default: <target_mdx_root>/{DEFAULT_NAV_CACHE_FILENAME}).")
+    parser.add_argument("--no_nav_cache", action="store_true", help="Parse every nav source HTML; neither read nor write the cache.")
+    parser.add_argument("--changed_html", nargs="*", metavar="HTML_FILE",
+                        help="Only update the MDX files whose sidebar front matter depends on these HTML files "
+                             "(e.g. the output of git diff --name-only). Needs the nav cache of a previous run; "
+                             "without one every file is processed.")
+    parser.add_argument("--patch_front_matter", action="store_true",
+                        help="Rewrite only the lines of the sidebar keys that changed, keeping the rest of each front-matter "
+                             "block (formatting, quoting, key order) byte for byte. Blocks that cannot be patched are dumped as usual.")
+    parser.add_argument("--watch", action="store_true",
+                        help="After the initial run, keep the HTML nav cache in memory and update front matter as HTML or MDX files change.")
     args = parser.parse_args()
+    if args.watch and args.dry_run:
+        parser.error("--watch cannot be combined with --dry_run")
+    if args.changed_html is not None and args.no_nav_cache:
+        parser.error("--changed_html needs the nav cache to know what the changed files fed before")
 
     setup_logging(args.log_level, args.log_file)
 
@@ -389,12 +708,25 @@ def main():
     logging.info(f"Source HTML Root: {abs_source_html_root}")
     logging.info(f"Target MDX Root: {abs_target_mdx_root}")
 
-    master_nav_item_map = cache_all_html_sidebar_maps(abs_source_html_root)
+    nav_cache = None
+    if not args.no_nav_cache:
+        nav_cache = NavCache(os.path.abspath(args.nav_cache) if args.nav_cache
+                             else os.path.join(abs_target_mdx_root, DEFAULT_NAV_CACHE_FILENAME))
+        nav_cache.load()
+    previous_graph = SectionDependencyGraph.from_nav_cache(nav_cache) if nav_cache is not None else None
+    # With --single_dir only that directory's NavItems are needed, so the other sections are never materialized
+    key_prefix = None
+    if args.single_dir:
+        key_prefix = os.path.normpath(args.single_dir).replace(os.sep, '/')
+        if key_prefix == ".": key_prefix = None
+    master_nav_item_map = cache_all_html_sidebar_maps(abs_source_html_root, nav_cache, key_prefix)
+    # A dry run leaves target_mdx_root untouched, so it only writes a cache placed elsewhere with --nav_cache
+    if nav_cache is not None and (args.nav_cache or not args.dry_run): nav_cache.save()
     if not master_nav_item_map:
         logging.error("No NavItems could be cached from HTML sources. Exiting.")
         return
 
-    num_processed, num_skipped = 0, 0
+    write_counts = {WRITE_CHANGED: 0, WRITE_UNCHANGED: 0, WRITE_FAILED: 0}
 
     paths_to_scan_for_mdx = []
     if args.single_dir:
@@ -405,29 +737,41 @@ def main():
         paths_to_scan_for_mdx.append(single_dir_path)
         logging.info(f"Processing single target directory: {args.single_dir}")
     else:
-        paths_to_scan_for_mdx.append(abs_target_mdx_root) # For root files
-        for entry in os.listdir(abs_target_mdx_root):
-            item_path = os.path.join(abs_target_mdx_root, entry)
-            if os.path.isdir(item_path): # And all top-level subdirs
-                paths_to_scan_for_mdx.append(item_path)
-        logging.info(f"Processing all MDX files under {abs_target_mdx_root} (and its top-level subdirs)")
-
-    for path_to_walk in paths_to_scan_for_mdx:
-        for dirpath, _, filenames in os.walk(path_to_walk):
-            for filename in filenames:
-                if filename.endswith(".mdx"):
-                    mdx_file_path = os.path.join(dirpath, filename)
-                    if args.dry_run and dry_run_output_abs is None:
-                        logging.info(f"[DRY RUN] Would process: {mdx_file_path}")
-                        num_processed +=1; continue
-                    try:
-                        if process_single_mdx_file(mdx_file_path, abs_target_mdx_root, master_nav_item_map, args.dry_run, dry_run_output_abs):
-                            num_processed += 1
-                    except Exception as e:
-                        logging.error(f"Unhandled error processing {mdx_file_path}: {e}", exc_info=True)
-                        num_skipped += 1
-
-    logging.info(f"Processing complete. MDX files processed/attempted: {num_processed}. Errors/Skipped: {num_skipped}")
+        # os.walk covers root files and every subdir; listing the top-level subdirs again visited them twice
+        paths_to_scan_for_mdx.append(abs_target_mdx_root)
+        logging.info(f"Processing all MDX files under {abs_target_mdx_root} (and its subdirs)")
+
+    mdx_files_to_process = None
+    if args.changed_html is not None:
+        mdx_files_to_process = affected_mdx_files(args.changed_html, abs_source_html_root, abs_target_mdx_root,
+                                                  SectionDependencyGraph.from_nav_cache(nav_cache), previous_graph,
+                                                  os.path.normpath(paths_to_scan_for_mdx[0]))
+        if mdx_files_to_process is None: logging.info("No nav cache from a previous run; processing every MDX file.")
+    if mdx_files_to_process is None:
+        mdx_files_to_process = [os.path.join(dirpath, filename)
+                                for path_to_walk in paths_to_scan_for_mdx
+                                for dirpath, _, filenames in os.walk(path_to_walk)
+                                for filename in filenames if filename.endswith(".mdx")]
+
+    for mdx_file_path in mdx_files_to_process:
+        if args.dry_run and dry_run_output_abs is None:
+            logging.info(f"[DRY RUN] Would process: {mdx_file_path}")
+            continue
+        try:
+            write_counts[process_single_mdx_file(mdx_file_path, abs_target_mdx_root, master_nav_item_map, args.dry_run,
+                                                 dry_run_output_abs, args.patch_front_matter)] += 1
+        except Exception as e:
+            logging.error(f"Unhandled error processing {mdx_file_path}: {e}", exc_info=True)
+            write_counts[WRITE_FAILED] += 1
+
+    verb = "would change" if args.dry_run else "changed"
+    logging.info(f"Processing complete. MDX files {verb}: {write_counts[WRITE_CHANGED]}, "
+                 f"unchanged: {write_counts[WRITE_UNCHANGED]}, failed: {write_counts[WRITE_FAILED]}")
+    check_nav_links(master_nav_item_map, get_default_link_index().add_docs_under(abs_target_mdx_root, [".mdx", ".md"]),
+                    abs_source_html_root)
+    if args.watch:
+        watch_and_update(abs_source_html_root, abs_target_mdx_root, master_nav_item_map,
+                         os.path.normpath(paths_to_scan_for_mdx[0]), nav_cache, key_prefix, args.patch_front_matter)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,285 @@
+"""
+Shared, lazily populated store of parsed ISBDM HTML pages.
+
+The sidebar generator, the HTML -> MDX converter and the conversion verifier all read the same
+pages under ISBDM/docs/. Each page is read and parsed at most once per process and is re-read
+only when its mtime changes. Besides the full BeautifulSoup tree, a document exposes a compact
+extracted form of its sidebar nav (`nav_blocks`) so callers that only need the nav never walk
+the tree themselves.
+
+Callers that only need the nav never get a full tree built either: parse_nav_blocks() cuts the
+nav.navISBDMSection regions out of the raw HTML and reads their rows straight off the tokenizer,
+without constructing any BeautifulSoup objects.
+"""
+import os
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+DEFAULT_PARSER = 'html.parser'
+
+NAV_CSS_CLASS = 'navISBDMSection'
+_NAV_TAG_RE = re.compile(r'<(/?)nav\b[^>]*>', re.IGNORECASE)
+_CLASS_ATTR_RE = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+# The raw class attribute is still one string while tokenizing, so match the class as a whole word
+NAV_STRAINER = SoupStrainer('nav', class_=re.compile(r'(?:^|\s)' + NAV_CSS_CLASS + r'(?:\s|$)'))
+
+# One row (div.d-flex) of an ISBDM sidebar nav block.
+# href is None for rows without a link; indent_depth counts the bi-arrow-return-right icons.
+NavRow = namedtuple("NavRow", ["href", "label", "indent_depth"])
+
+
+def extract_nav_blocks(soup):
+    """Returns one list of NavRow per nav.navISBDMSection, in document order."""
+    nav_blocks = []
+    for nav_container in soup.find_all('nav', class_='navISBDMSection'):
+        rows = []
+        for div in nav_container.find_all('div', class_='d-flex', recursive=False):
+            link_tag = div.find('a', href=True)
+            indent_depth = len(div.find_all('i', class_='bi-arrow-return-right'))
+            if link_tag:
+                rows.append(NavRow(link_tag.get('href', '').strip(), link_tag.get_text(), indent_depth))
+            else:
+                rows.append(NavRow(None, div.get_text(), indent_depth))
+        nav_blocks.append(rows)
+    return nav_blocks
+
+
+def iter_nav_fragments(html):
+    """Yields the source text of each top-level nav.navISBDMSection element (nested navs stay inside their parent)."""
+    search_from = 0
+    while True:
+        open_tag = _NAV_TAG_RE.search(html, search_from)
+        if open_tag is None: return
+        search_from = open_tag.end()
+        if open_tag.group(1): continue
+        class_attr = _CLASS_ATTR_RE.search(open_tag.group(0))
+        classes = next(value for value in class_attr.groups() if value is not None).split() if class_attr else ()
+        if NAV_CSS_CLASS not in classes: continue
+        depth, end = 1, len(html)  # An unclosed nav runs to the end of the document
+        while depth:
+            nav_tag = _NAV_TAG_RE.search(html, search_from)
+            if nav_tag is None: break
+            search_from = nav_tag.end()
+            depth += -1 if nav_tag.group(1) else 1
+            if not depth: end = search_from
+        yield html[open_tag.start():end]
+        search_from = end
+
+
+class _NavRowParser(HTMLParser):
+    """
+    Streams NavRows out of nav fragments without building a tree. Mirrors how BeautifulSoup's html.parser
+    builder nests elements (void elements never open, an end tag closes up to its matching open tag) and
+    how it normalizes whitespace-only strings, so the rows equal extract_nav_blocks() on a full parse.
+    """
+    VOID_ELEMENTS = frozenset(['area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame',
+                               'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta',
+                               'nextid', 'param', 'source', 'spacer', 'track', 'wbr'])
+    ASCII_SPACES = frozenset('\x20\x0a\x09\x0c\x0d')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.nav_blocks = []
+        self._open_tags = []
+        self._nav_depths = []  # Depth of each open nav.navISBDMSection
+        self._pending_text = []
+        self._row = None  # [depth, nav_block, href, link_depth, link_text, row_text, indent_depth]
+
+    @staticmethod
+    def _classes(attrs):
+        for name, value in attrs:
+            if name == 'class': return value.split() if value else ()
+        return ()
+
+    def _flush_text(self):
+        if not self._pending_text: return
+        text = "".join(self._pending_text)
+        self._pending_text = []
+        if all(c in self.ASCII_SPACES for c in text):
+            text = "\n" if "\n" in text else " "
+        row = self._row
+        if row is not None:
+            row[5].append(text)
+            if row[3] is not None and row[3] >= 0: row[4].append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        depth = len(self._open_tags)
+        row = self._row
+        if tag == 'nav' and NAV_CSS_CLASS in self._classes(attrs):
+            self._nav_depths.append(depth)
+            self.nav_blocks.append([])
+        elif row is None:
+            if (tag == 'div' and self._nav_depths and depth == self._nav_depths[-1] + 1
+                    and 'd-flex' in self._classes(attrs)):
+                self._row = [depth, self.nav_blocks[-1], None, None, [], [], 0]
+        elif tag == 'a' and row[3] is None:
+            href = dict(attrs).get('href')
+            if href is not None:
+                row[2], row[3] = href.strip(), depth
+        elif tag == 'i' and 'bi-arrow-return-right' in self._classes(attrs):
+            row[6] += 1
+        if tag not in self.VOID_ELEMENTS: self._open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID_ELEMENTS: self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag not in self._open_tags: return
+        while self._open_tags:
+            closed = self._open_tags.pop()
+            depth = len(self._open_tags)
+            row = self._row
+            if row is not None:
+                if row[3] == depth: row[3] = -1  # Link closed; later text is row text only
+                if row[0] == depth:
+                    label = "".join(row[4]) if row[2] is not None else "".join(row[5])
+                    row[1].append(NavRow(row[2], label, row[6]))
+                    self._row = None
+            if self._nav_depths and self._nav_depths[-1] == depth: self._nav_depths.pop()
+            if closed == tag: break
+
+    def handle_data(self, data):
+        self._pending_text.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        while self._open_tags: self.handle_endtag(self._open_tags[-1])
+
+
+def parse_nav_blocks(html):
+    """Same result as extract_nav_blocks(BeautifulSoup(html, 'html.parser')), but only the nav regions are tokenized."""
+    parser = _NavRowParser()
+    for fragment in iter_nav_fragments(html):
+        parser.feed(fragment)
+    parser.close()
+    return parser.nav_blocks
+
+
+_compiled_selectors = {}
+
+
+def compile_selector(selector):
+    """Compiles a CSS selector once per process."""
+    compiled = _compiled_selectors.get(selector)
+    if compiled is None:
+        compiled = _compiled_selectors[selector] = soupsieve.compile(selector)
+    return compiled
+
+
+class HtmlDocument:
+    """One HTML file as of a given mtime. Every representation is computed on first access."""
+
+    def __init__(self, path, mtime_ns, parser=DEFAULT_PARSER):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.parser = parser
+        self._data = None
+        self._soup = None
+        self._nav_blocks = None
+        self._selected_text = {}
+
+    @property
+    def data(self):
+        if self._data is None:
+            with open(self.path, 'rb') as f:
+                self._data = f.read()
+        return self._data
+
+    @property
+    def html(self):
+        return self.data.decode('utf-8')
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, self.parser)
+        return self._soup
+
+    @property
+    def nav_blocks(self):
+        """
+        With html.parser, always from the nav-only parse: it matches extract_nav_blocks() on the full tree
+        and is cheaper than walking that tree even when it exists. Other parsers use their own tree.
+        """
+        if self._nav_blocks is None:
+            if self.parser == 'html.parser':
+                self._nav_blocks = parse_nav_blocks(self.html)
+            elif self._soup is not None:
+                self._nav_blocks = extract_nav_blocks(self._soup)
+            else:
+                self._nav_blocks = extract_nav_blocks(BeautifulSoup(self.html, self.parser, parse_only=NAV_STRAINER))
+        return self._nav_blocks
+
+    def release_tree(self):
+        """Drops the parsed tree and raw bytes but keeps the extracted nav and selector text."""
+        if self._soup is not None and self._nav_blocks is None:
+            self.nav_blocks  # Extract now, while the tree it may be read from still exists
+        self._soup = None
+        self._data = None
+
+    def select_text(self, selector):
+        """Text of the first element matching a CSS selector, or None if nothing matches. Memoized per selector."""
+        if selector not in self._selected_text:
+            element = compile_selector(selector).select_one(self.soup)
+            self._selected_text[selector] = element.get_text() if element else None
+        return self._selected_text[selector]
+
+
+class HtmlDocumentStore:
+    """Caches HtmlDocument objects keyed by absolute path; a changed mtime yields a fresh document."""
+
+    def __init__(self, parser=DEFAULT_PARSER):
+        self.parser = parser
+        self._documents = {}
+
+    def get(self, path):
+        """Raises FileNotFoundError if the file does not exist."""
+        abs_path = os.path.abspath(path)
+        mtime_ns = os.stat(abs_path).st_mtime_ns
+        document = self._documents.get(abs_path)
+        if document is None or document.mtime_ns != mtime_ns:
+            document = HtmlDocument(abs_path, mtime_ns, self.parser)
+            self._documents[abs_path] = document
+        return document
+
+    def discard(self, path):
+        self._documents.pop(os.path.abspath(path), None)
+
+    def clear(self):
+        self._documents.clear()
+
+    def __len__(self):
+        return len(self._documents)
+
+
+def available_parsers():
+    """BeautifulSoup tree builders usable here: html.parser always, lxml when it is installed."""
+    parsers = [DEFAULT_PARSER]
+    try:
+        import lxml  # noqa: F401
+        parsers.append('lxml')
+    except ImportError:
+        pass
+    return parsers
+
+
+_stores = {}
+
+
+def get_default_store(parser=DEFAULT_PARSER):
+    """The process-wide store for a parser, shared by every tool imported into the same run."""
+    store = _stores.get(parser)
+    if store is None:
+        store = _stores[parser] = HtmlDocumentStore(parser)
+    return store
@@ -0,0 +1,198 @@
+"""
+Href rewriting and known-document bookkeeping shared by the converter and the sidebar tools.
+
+Every href the tools rewrite goes through one LinkIndex, which memoizes each rewrite (the corpus repeats the
+same few thousand hrefs tens of thousands of times) and can collect the doc ids a page links to. Checking
+those against the doc ids that exist in the corpus (add_docs_under()) finds broken links while converting,
+instead of in a separate link-check pass over the built site.
+
+A doc id is the target's path under the docs root without extension, '/'-separated: "attributes/1022".
+Markdown/MDX docs are also known by the ids Docusaurus routes them by (see mdx_doc_ids()).
+"""
+import logging
+import os
+import re
+from contextlib import contextmanager
+
+import yaml
+
+from frontmatter_io import read_front_matter_file
+
+HTML_DOCS_PREFIX = "/ISBDM/docs/"  # Site-absolute prefix of the source pages
+MDX_DOCS_PREFIX = "/docs/"  # Same pages in the Docusaurus site
+MDX_SUFFIXES = (".md", ".mdx")
+_HEADING_ID = re.compile(r"^#{1,6}[ \t].*\{#([A-Za-z0-9_-]+)\}[ \t]*$", re.MULTILINE)  # "## Application {#abApp}"
+
+
+def doc_id_for_path(path, root):
+    """The doc id of a file below root, e.g. <root>/attributes/1022.html -> "attributes/1022"."""
+    path_no_ext, _ = os.path.splitext(os.path.relpath(path, root))
+    return os.path.normpath(path_no_ext).replace(os.sep, '/')
+
+
+def mdx_doc_ids(path, root):
+    """
+    Every id a Markdown/MDX doc below root answers to: its path, its front-matter slug and id (e.g.
+    relationships/nomens/1260.mdx has slug /relationships/1260), the directory for an index page, and the
+    pages merged into a section's index: a partial (_i001.mdx stands for intro/i001) and the heading ids of
+    the index itself ("## Application {#abApp}" in about/index.mdx stands for about/abApp).
+    """
+    doc_id = doc_id_for_path(path, root)
+    directory, _, name = doc_id.rpartition('/')
+    doc_ids = {doc_id}
+    if name == "index" and directory: doc_ids.add(directory)
+    if name.startswith("_"): doc_ids.add(f"{directory}/{name[1:]}".lstrip("/"))
+    try:
+        source = read_front_matter_file(path)
+        front_matter = source.load()
+        body = source.body if name == "index" else ""
+    except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+        logging.warning(f"Could not read the front matter of {path}: {e}")
+        return doc_ids
+    if isinstance(front_matter, dict):
+        slug = front_matter.get("slug")
+        if slug is not None:
+            slug = str(slug).strip("/") if str(slug).startswith("/") else f"{directory}/{slug}".strip("/")
+            doc_ids.add(os.path.normpath(slug).replace(os.sep, '/'))
+        if front_matter.get("id") is not None: doc_ids.add(f"{directory}/{front_matter['id']}".lstrip("/"))
+    doc_ids.update(f"{directory}/{anchor}".lstrip("/") for anchor in _HEADING_ID.findall(body))
+    return doc_ids
+
+
+class LinkIndex:
+    """Memoized href rewriting plus the set of doc ids known to exist, for unresolved-link reporting."""
+
+    def __init__(self):
+        self.doc_ids = set()
+        self.unresolved = {}  # Doc id -> referrers, in first-seen order
+        self._inline_hrefs = {}
+        self._rdf_urls = {}
+        self._doc_ids_by_href = {}
+        self._keys = {}
+        self._collected = None
+
+    # --- Known documents ---
+    def add_docs_under(self, root, suffixes):
+        """
+        Registers every file below root whose name ends with one of suffixes (case-insensitive), Markdown/MDX
+        docs under all their mdx_doc_ids().
+        """
+        suffixes = tuple(suffix.lower() for suffix in suffixes)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if not filename.lower().endswith(suffixes): continue
+                path = os.path.join(dirpath, filename)
+                if filename.lower().endswith(MDX_SUFFIXES):
+                    self.doc_ids.update(mdx_doc_ids(path, root))
+                else:
+                    self.doc_ids.add(doc_id_for_path(path, root))
+        return self
+
+    # --- Rewriting ---
+    def doc_id(self, href):
+        """The doc id a site-absolute docs href points to, or None for external and in-page links."""
+        doc_id = self._doc_ids_by_href.get(href, False)
+        if doc_id is False:
+            doc_id = None
+            if href.startswith(HTML_DOCS_PREFIX):
+                path = href[len(HTML_DOCS_PREFIX):].split('#', 1)[0].split('?', 1)[0]
+                if not path or path.endswith('/'): path += "index"
+                doc_id = os.path.splitext(path)[0]
+            self._doc_ids_by_href[href] = doc_id
+        return doc_id
+
+    def _collect(self, href):
+        if self._collected is not None:
+            doc_id = self.doc_id(href)
+            if doc_id is not None: self._collected.append(doc_id)
+
+    def inline_href(self, href):
+        """Target of an <InLink>: /ISBDM/docs/attributes/1022.html -> docs/attributes/1022."""
+        self._collect(href)
+        rewritten = self._inline_hrefs.get(href)
+        if rewritten is None:
+            rewritten = href.replace(HTML_DOCS_PREFIX, MDX_DOCS_PREFIX, 1).replace('.html', '')
+            if rewritten.startswith(MDX_DOCS_PREFIX): rewritten = rewritten[1:]
+            self._inline_hrefs[href] = rewritten
+        return rewritten
+
+    def rdf_url(self, href, base_url_prefix):
+        """URL of an element sub/super type in the RDF front matter: /ISBDM/docs/x/1.html -> /docs/x/1."""
+        self._collect(href)
+        key = (href, base_url_prefix)
+        url = self._rdf_urls.get(key)
+        if url is None:
+            url = href
+            if href.startswith(HTML_DOCS_PREFIX):
+                url = href.replace(HTML_DOCS_PREFIX, MDX_DOCS_PREFIX, 1).replace(".html", "")
+            elif base_url_prefix and href.startswith(base_url_prefix):
+                url = href.replace(base_url_prefix, "/docs", 1).replace(".html", "")
+            elif ".html" in href:
+                url = href.replace(".html", "")
+            self._rdf_urls[key] = url
+        return url
+
+    def doc_key(self, href, section_key, source_html_root_abs):
+        """
+        Doc id for a sidebar nav href. Site-absolute hrefs map directly; relative ones are taken relative to
+        the section directory they were found in.
+        """
+        if not href: return None
+        key = (href, section_key, source_html_root_abs)
+        doc_key = self._keys.get(key)
+        if doc_key is None:
+            if href.startswith(source_html_root_abs):
+                path_part = href[len(source_html_root_abs):].lstrip("/")
+            elif href.startswith(HTML_DOCS_PREFIX):
+                path_part = href[len(HTML_DOCS_PREFIX):].lstrip("/")
+            elif href.startswith("/"):
+                logging.warning(f"Found absolute href '{href}' not matching known root in section '{section_key}'.")
+                path_part = href.lstrip("/")
+            else:  # Relative path like "1022.html" or "sub/file.html"
+                path_part = os.path.join(section_key, href)
+            path_no_ext, _ = os.path.splitext(path_part)
+            doc_key = self._keys[key] = os.path.normpath(path_no_ext).replace(os.sep, '/')
+        return doc_key
+
+    @contextmanager
+    def collecting_links(self):
+        """Collects the doc ids of the docs links rewritten inside the block into the yielded list."""
+        links = []
+        previous, self._collected = self._collected, links
+        try:
+            yield links
+        finally:
+            self._collected = previous
+
+    # --- Unresolved links ---
+    def check(self, referrer, doc_ids):
+        """Records referrer against each doc id that is not a known document. Returns how many were unresolved."""
+        missing = 0
+        for doc_id in doc_ids:
+            if doc_id in self.doc_ids: continue
+            referrers = self.unresolved.setdefault(doc_id, [])
+            if referrer not in referrers: referrers.append(referrer)
+            missing += 1
+        return missing
+
+    def report_unresolved(self, logger, max_referrers=5):
+        """Logs one warning per unresolved target (with where it is linked from) and a one-line summary."""
+        for doc_id, referrers in sorted(self.unresolved.items()):
+            shown = ", ".join(referrers[:max_referrers])
+            more = f" and {len(referrers) - max_referrers} more" if len(referrers) > max_referrers else ""
+            logger.warning(f"Unresolved link target '{doc_id}', linked from {shown}{more}")
+        if self.unresolved:
+            referrer_count = len({r for referrers in self.unresolved.values() for r in referrers})
+            logger.warning(f"{len(self.unresolved)} unresolved link target(s) in {referrer_count} file(s).")
+        else:
+            logger.info("All links resolve to known documents.")
+
+
+_default_index = None
+
+
+def get_default_link_index():
+    """The process-wide index, so rewrites are memoized across every page converted in this process."""
+    global _default_index
+    if _default_index is None: _default_index = LinkIndex()
+    return _default_index
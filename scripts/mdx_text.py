@@ -0,0 +1,353 @@
+"""
+Rendered text of the MDX the converter writes, in a single pass.
+
+render_mdx_text() walks the body once and keeps only the text a reader sees on the built page, so the result can
+be compared token for token with BeautifulSoup's get_text() of the HTML div the page was converted from. It knows
+the converter's vocabulary rather than all of MDX:
+- JSX/HTML tags are dropped; block-level ones leave a line break so that words on either side stay apart.
+- Components contribute the text their React implementation renders: <Mandatory /> and <Unique /> their symbol,
+  <SeeAlso> its "See also: " lead-in, <Figure /> its caption, and <ElementReference /> the Attribute:Value table
+  it builds from the RDF front matter. The serialization tabs are hidden and left out. ExampleTable and
+  VocabularyTable render data this module does not read and contribute nothing.
+- Markdown heading, list and blockquote markers, table pipes and delimiter rows, thematic breaks, emphasis runs,
+  link destinations and images are dropped; code keeps its text, backslash escapes and entities are resolved.
+- {expressions} render nothing (MDX evaluates them; the converter only writes attribute expressions), and neither
+  do import/export (ESM) blocks.
+"""
+import html
+import re
+
+from frontmatter_io import load_front_matter, split_front_matter
+
+# Mirrors customFields.elementDefaults in docusaurus.config.ts, which ElementReference uses to build URIs
+ELEMENT_DEFAULTS = {"uri": "https://www.iflastandards.info/ISBDM/elements", "classPrefix": "C", "propertyPrefix": "P"}
+
+BLOCK_ELEMENTS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "dd", "details", "div", "dl", "dt", "figcaption", "figure",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "summary", "table", "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+    "ElementReference", "ExampleTable", "Figure", "SeeAlso", "VocabularyTable",
+})
+SYMBOL_COMPONENTS = {"Mandatory": "✽", "Unique": "1"}  # Default of each component's symbol prop
+LEAD_IN_COMPONENTS = {"SeeAlso": "See also: "}  # Text rendered ahead of the children
+
+_SPECIAL = re.compile(r"[\n<{&*_~\\`\[\]!|]")
+_ENTITY = re.compile(r"&(?:#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|[A-Za-z][A-Za-z0-9]{1,31});")
+_AUTOLINK = re.compile(r"<([A-Za-z][A-Za-z0-9+.-]{1,31}:[^\s<>]*)>")
+_TAG_NAME = re.compile(r"<(/?)([A-Za-z][A-Za-z0-9._-]*)?(?=[\s/>])")
+_ATTRIBUTE = re.compile(r"([A-Za-z_][\w-]*)\s*=\s*(?:\"([^\"]*)\"|'([^']*)')")
+_BLOCK_MARKER = re.compile(r"(?:>[ \t]?|[-*+](?:[ \t]+|$)|[0-9]{1,9}[.)](?:[ \t]+|$)|#{1,6}(?:[ \t]+|$))")
+_CODE_FENCE = re.compile(r"(`{3,}|~{3,})")
+_TABLE_DELIMITER_ROW = re.compile(r"\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+_THEMATIC_BREAK = re.compile(r"\s*([-*_])[ \t]*(?:\1[ \t]*){2,}$")
+_ESCAPABLE = frozenset("!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~")
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+def _labels(items):
+    return [_text(item.get("label")) if isinstance(item, dict) else _text(item) for item in items or []]
+
+
+def render_element_reference(front_matter):
+    """
+    Text of the visible Attribute:Value tab of <ElementReference frontMatter={frontMatter} />, including the
+    defaults its adaptFrontMatter() fills in.
+    """
+    if not isinstance(front_matter, dict): return ""
+    rdf = front_matter.get("RDF")
+    rdf = dict(rdf) if isinstance(rdf, dict) else {}
+    if not (rdf.get("definition") and "deprecated" not in front_matter):
+        rdf["deprecated"] = front_matter.get("deprecated") or False
+        rdf["deprecatedInVersion"] = front_matter.get("deprecatedInVersion") or ""
+        rdf["willBeRemovedInVersion"] = front_matter.get("willBeRemovedInVersion") or ""
+        if not rdf.get("uri") and front_matter.get("id"):
+            prefix_key = "classPrefix" if "class" in _text(rdf.get("type")).lower() else "propertyPrefix"
+            rdf["uri"] = f"{ELEMENT_DEFAULTS['uri']}/{ELEMENT_DEFAULTS[prefix_key]}{front_matter['id']}"
+        rdf["status"] = rdf.get("status") or "Published"
+
+    lines = []
+    if rdf.get("deprecated"):
+        version = rdf.get("deprecatedInVersion")
+        removal = rdf.get("willBeRemovedInVersion")
+        lines.append(f"DEPRECATED{f' in version {version}' if version else ''}"
+                     f"{f'. Will be removed in version {removal}' if removal else ''}.")
+    rows = [("Definition", _text(rdf.get("definition"))), ("Scope note", _text(rdf.get("scopeNote"))),
+            ("Domain", _text(rdf.get("domain"))), ("Range", _text(rdf.get("range")))]
+    for label, key in (("Element sub-type", "elementSubType"), ("Element super-type", "elementSuperType")):
+        if rdf.get(key): rows.append((label, "\n".join(_labels(rdf[key]))))
+    rows.append(("URI", _text(rdf.get("uri"))))
+    if rdf.get("type"): rows.append(("Type", _text(rdf["type"])))
+    if rdf.get("status"): rows.append(("Status", _text(rdf["status"])))
+    if rdf.get("equivalentProperty"): rows.append(("Equivalent Property", ", ".join(_labels(rdf["equivalentProperty"]))))
+    if rdf.get("inverseOf"): rows.append(("Inverse Of", ", ".join(_labels(rdf["inverseOf"]))))
+    if rdf.get("deprecated"):
+        rows.append(("Deprecated", "Yes"))
+        if rdf.get("deprecatedInVersion"): rows.append(("Deprecated In Version", _text(rdf["deprecatedInVersion"])))
+        if rdf.get("willBeRemovedInVersion"):
+            rows.append(("Will Be Removed In Version", _text(rdf["willBeRemovedInVersion"])))
+    lines.extend(f"{label}\n{value}" for label, value in rows)
+    return "\n".join(lines)
+
+
+class MdxTextScanner:
+    """
+    One scan over an MDX body. Plain text between special characters is copied in slices; each special character
+    is handled where it stands, and line starts are classified once as the scan reaches them.
+    """
+
+    def __init__(self, body, front_matter_text=None):
+        self.text = body
+        self.front_matter_text = front_matter_text
+        self.out = []
+        self.brackets = []  # (output index, is_image) of each open "[" / "!["
+        self.fence = None  # Opening run of the fenced code block being copied
+        self.table_line = False  # Current line is a table row
+        self.in_table = False  # After a table delimiter row, until a blank line
+        self.block_start = True  # The previous line was blank (or there was none)
+        self.esm = False  # Inside an import/export block, which ends at a blank line
+
+    def render(self):
+        text, out = self.text, self.out
+        handlers = {"\n": self._newline, "<": self._tag, "{": self._skip_braces, "&": self._entity,
+                    "*": self._emphasis, "_": self._emphasis, "~": self._emphasis, "\\": self._escape,
+                    "`": self._code_span, "[": self._open_bracket, "!": self._image, "]": self._close_bracket,
+                    "|": self._pipe}
+        position = self._start_line(0)
+        while position < len(text):
+            match = _SPECIAL.search(text, position)
+            if not match:
+                out.append(text[position:])
+                break
+            if match.start() > position: out.append(text[position:match.start()])
+            position = handlers[text[match.start()]](match.start())
+        return "".join(out)
+
+    # --- Lines ---
+    def _start_line(self, position):
+        text = self.text
+        end = text.find("\n", position)
+        if end == -1: end = len(text)
+        line = text[position:end]
+        stripped = line.strip()
+        if self.fence:
+            if stripped.startswith(self.fence) and not stripped.lstrip(self.fence[0]):
+                self.fence = None
+            else:
+                self.out.append(line)
+            return end
+        if self.esm and stripped: return end
+        self.esm = False
+        if not stripped:
+            self.in_table = False
+            self.brackets.clear()
+            self.block_start = True
+            return end
+        if self.block_start and line.startswith(("import ", "export ")):
+            self.esm = True
+            return end
+        self.block_start = False
+        fence = _CODE_FENCE.match(stripped)
+        if fence:
+            self.fence = fence.group(1)
+            return end
+        if _TABLE_DELIMITER_ROW.match(line):
+            self.in_table = "|" in line or self.in_table
+            if self.in_table: return end
+        if _THEMATIC_BREAK.match(line): return end
+
+        position += len(line) - len(line.lstrip())
+        marker = _BLOCK_MARKER.match(text, position)
+        while marker and marker.end() > position:
+            position = marker.end()
+            marker = _BLOCK_MARKER.match(text, position)
+        self.table_line = text.startswith("|", position)
+        return position
+
+    def _newline(self, position):
+        self.out.append("\n")
+        self.table_line = False
+        return self._start_line(position + 1)
+
+    def _pipe(self, position):
+        self.out.append(" " if self.table_line or self.in_table else "|")
+        return position + 1
+
+    # --- JSX ---
+    def _skip_braces(self, position):
+        """Index after the "}" matching the "{" at position (quotes and template strings respected), or len(text)."""
+        text, depth = self.text, 0
+        while position < len(text):
+            char = text[position]
+            if char in "\"'`":
+                close = text.find(char, position + 1)
+                position = len(text) if close == -1 else close + 1
+                continue
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if not depth: return position + 1
+            position += 1
+        return position
+
+    def _tag_end(self, position):
+        """Index of the ">" closing a tag whose attributes start at position, or -1."""
+        text = self.text
+        while position < len(text):
+            char = text[position]
+            if char == ">": return position
+            if char in "\"'":
+                close = text.find(char, position + 1)
+                if close == -1: return -1
+                position = close + 1
+            elif char == "{":
+                position = self._skip_braces(position)
+            else:
+                position += 1
+        return -1
+
+    def _tag(self, position):
+        text, out = self.text, self.out
+        if text.startswith("<!--", position):
+            close = text.find("-->", position + 4)
+            return len(text) if close == -1 else close + 3
+        autolink = _AUTOLINK.match(text, position)
+        if autolink:
+            out.append(autolink.group(1))
+            return autolink.end()
+        name_match = _TAG_NAME.match(text, position)
+        end = self._tag_end(name_match.end()) if name_match else -1
+        if end == -1 or (not name_match.group(2) and text[name_match.end()] != ">"):
+            out.append("<")
+            return position + 1
+
+        closing, name = bool(name_match.group(1)), name_match.group(2) or ""
+        if name in BLOCK_ELEMENTS: out.append("\n")
+        if not closing:
+            if name in SYMBOL_COMPONENTS:
+                out.append(self._attributes(name_match.end(), end).get("symbol", SYMBOL_COMPONENTS[name]))
+            elif name in LEAD_IN_COMPONENTS:
+                out.append(LEAD_IN_COMPONENTS[name])
+            elif name == "Figure":
+                attributes = self._attributes(name_match.end(), end)
+                out.append(attributes.get("caption", ""))
+                if attributes.get("expandLink"): out.append("\n" + attributes.get("expandText", "[Expand image]"))
+            elif name == "ElementReference":
+                out.append(self._element_reference())
+        return end + 1
+
+    def _attributes(self, start, end):
+        """String-valued attributes of a tag; expression values are not evaluated."""
+        return {match.group(1): html.unescape(match.group(2) if match.group(2) is not None else match.group(3))
+                for match in _ATTRIBUTE.finditer(self.text, start, end)}
+
+    def _element_reference(self):
+        try:
+            front_matter = load_front_matter(self.front_matter_text) if self.front_matter_text else None
+        except Exception:
+            front_matter = None  # Broken front matter renders an empty reference, as the page build would fail
+        return render_element_reference(front_matter)
+
+    # --- Markdown inlines ---
+    def _entity(self, position):
+        entity = _ENTITY.match(self.text, position)
+        if not entity:
+            self.out.append("&")
+            return position + 1
+        self.out.append(html.unescape(entity.group()))
+        return entity.end()
+
+    def _emphasis(self, position):
+        """Emphasis/strikethrough delimiter runs render nothing; a run between spaces or inside a word is text."""
+        text = self.text
+        char, end = text[position], position
+        while end < len(text) and text[end] == char: end += 1
+        before = text[position - 1] if position else " "
+        after = text[end] if end < len(text) else " "
+        literal = (before.isspace() and after.isspace()) or (char == "~" and end - position == 1) \
+            or (char == "_" and before.isalnum() and after.isalnum())
+        if literal: self.out.append(text[position:end])
+        return end
+
+    def _escape(self, position):
+        following = self.text[position + 1:position + 2]
+        if following in _ESCAPABLE and following:
+            self.out.append(following)
+            return position + 2
+        self.out.append("\\")
+        return position + 1
+
+    def _code_span(self, position):
+        text = self.text
+        end = position
+        while end < len(text) and text[end] == "`": end += 1
+        run = text[position:end]
+        close = text.find(run, end)
+        while close != -1 and text.startswith("`", close + len(run)):
+            close = text.find(run, close + len(run) + 1)
+        if close == -1:
+            self.out.append(run)
+            return end
+        code = text[end:close].replace("\n", " ")
+        self.out.append(code[1:-1] if len(code) > 2 and code[0] == code[-1] == " " else code)
+        return close + len(run)
+
+    def _open_bracket(self, position):
+        self.brackets.append((len(self.out), False))
+        self.out.append("[")
+        return position + 1
+
+    def _image(self, position):
+        if not self.text.startswith("[", position + 1):
+            self.out.append("!")
+            return position + 1
+        self.brackets.append((len(self.out), True))
+        self.out.append("![")
+        return position + 2
+
+    def _close_bracket(self, position):
+        destination_end = self._destination_end(position + 1) if self.brackets else -1
+        if destination_end == -1:
+            if self.brackets: self.brackets.pop()
+            self.out.append("]")
+            return position + 1
+        start, is_image = self.brackets.pop()
+        if is_image:
+            del self.out[start:]  # get_text() has no alt text either
+        else:
+            self.out[start] = ""
+        return destination_end
+
+    def _destination_end(self, position):
+        """Index after the "(destination)" of an inline link starting at position, or -1 if there is none."""
+        text = self.text
+        if not text.startswith("(", position): return -1
+        depth = 0
+        while position < len(text):
+            char = text[position]
+            if char == "\\":
+                position += 2
+                continue
+            if char == "\n" and text.startswith("\n", position + 1): return -1
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+                if not depth: return position + 1
+            position += 1
+        return -1
+
+
+def render_mdx_text(source):
+    """Rendered text of an MDX document (front matter included in source, if any)."""
+    front_matter_text, body = split_front_matter(source)
+    return MdxTextScanner(body, front_matter_text).render()
+
+
+def read_mdx_text(path):
+    """Rendered text of an MDX file. Raises OSError if it cannot be read."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return render_mdx_text(f.read())
@@ -0,0 +1,162 @@
+"""
+Explicit parent/children tree for an ISBDM sidebar nav block.
+
+Nav blocks arrive as a flat, ordered list of items, each with an indent level. build_nav_tree()
+turns that list into a tree in a single stack-based pass: an item's parent is the nearest
+preceding item with a lower level. Sibling and child relationships are then O(1) lookups on
+the nodes instead of forward scans over the rest of the list.
+
+Run this module directly for a micro-benchmark against the previous forward-scan computation:
+    python scripts/nav_tree.py --sizes 1000 5000 10000
+"""
+import argparse
+import random
+import time
+
+
+class NavTreeNode:
+    __slots__ = ("item", "level", "position", "parent", "children", "index_in_parent", "_siblings")
+
+    def __init__(self, item, level, position):
+        self.item = item
+        self.level = level
+        self.position = position  # 0-based index in the flat nav list
+        self.parent = None
+        self.children = []
+        self.index_in_parent = 0
+        self._siblings = None
+
+    @property
+    def next_sibling(self):
+        if self.index_in_parent + 1 < len(self._siblings):
+            return self._siblings[self.index_in_parent + 1]
+        return None
+
+    @property
+    def is_last_sibling(self):
+        """
+        True unless a later sibling sits at the same level. A sibling at a lower level (possible when the
+        HTML skips indent levels) closes the run, matching how the HTML nav renders.
+        """
+        next_sibling = self.next_sibling
+        return next_sibling is None or next_sibling.level < self.level
+
+    @property
+    def has_children(self):
+        return bool(self.children)
+
+    def ancestors(self):
+        """Ancestors from the root down to the parent."""
+        chain = []
+        node = self.parent
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        chain.reverse()
+        return chain
+
+    def __repr__(self):
+        return f"NavTreeNode(level={self.level}, pos={self.position}, children={len(self.children)}, item={self.item!r})"
+
+
+class NavTree:
+    def __init__(self, roots, nodes):
+        self.roots = roots
+        self.nodes = nodes  # Every node, in flat nav order
+
+    def walk(self):
+        """Depth-first, pre-order; for a tree built from a nav list this is the original list order."""
+        stack = list(reversed(self.roots))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+def build_nav_tree(items, level_of):
+    """Builds a NavTree from flat, ordered nav items in one pass. level_of(item) returns its indent level."""
+    roots = []
+    nodes = []
+    open_nodes = []  # The current path from a root to the most recent node
+    for position, item in enumerate(items):
+        node = NavTreeNode(item, level_of(item), position)
+        while open_nodes and open_nodes[-1].level >= node.level:
+            open_nodes.pop()
+        siblings = open_nodes[-1].children if open_nodes else roots
+        node.parent = open_nodes[-1] if open_nodes else None
+        node.index_in_parent = len(siblings)
+        node._siblings = siblings
+        siblings.append(node)
+        open_nodes.append(node)
+        nodes.append(node)
+    return NavTree(roots, nodes)
+
+
+# --- Micro-benchmark ---
+def _forward_scan_is_last(levels):
+    """The previous quadratic computation, kept only as the benchmark reference."""
+    flags = []
+    for i, level in enumerate(levels):
+        is_last = True
+        for j in range(i + 1, len(levels)):
+            if levels[j] == level:
+                is_last = False; break
+            if levels[j] < level:
+                break
+        flags.append(is_last)
+    return flags
+
+
+def synthetic_levels(size, shape, max_level=4, seed=0):
+    """'flat': all level 1. 'nested': random walk between 1 and max_level. 'chain': one long descending run per root."""
+    if shape == "flat":
+        return [1] * size
+    if shape == "chain":
+        return [1 + (i % max(size // 2, 1)) for i in range(size)]
+    rng = random.Random(seed)
+    levels, level = [], 1
+    for _ in range(size):
+        levels.append(level)
+        level = max(1, min(max_level, level + rng.choice((-1, 0, 0, 1))))
+    return levels
+
+
+def run_benchmark(sizes, shapes, repeat=3):
+    rows = []
+    for shape in shapes:
+        for size in sizes:
+            levels = synthetic_levels(size, shape)
+            timings = {}
+            for name, fn in (("forward_scan", _forward_scan_is_last),
+                             ("nav_tree", lambda lv: [n.is_last_sibling for n in build_nav_tree(lv, int).nodes])):
+                best = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    result = fn(levels)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[name] = (best, result)
+            if timings["forward_scan"][1] != timings["nav_tree"][1]:
+                raise AssertionError(f"is_last_sibling mismatch for shape={shape} size={size}")
+            rows.append((shape, size, timings["forward_scan"][0], timings["nav_tree"][0]))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark: forward-scan vs. tree-based is_last_sibling computation.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2500, 5000, 10000])
+    parser.add_argument("--shapes", nargs="+", default=["flat", "nested", "chain"], choices=["flat", "nested", "chain"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'shape':<8} {'items':>7} {'forward scan (ms)':>18} {'nav tree (ms)':>14} {'speedup':>8}")
+    for shape, size, scan_s, tree_s in run_benchmark(args.sizes, args.shapes, args.repeat):
+        speedup = scan_s / tree_s if tree_s else float('inf')
+        print(f"{shape:<8} {size:>7} {scan_s * 1000:>18.2f} {tree_s * 1000:>14.2f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
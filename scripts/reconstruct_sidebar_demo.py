@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 import os
-import re
+import json
 
 import yaml
 import argparse
 import logging
 from collections import defaultdict
+from itertools import groupby
+
+from file_utils import write_text_atomic
+from frontmatter_io import read_front_matter_file
+from nav_tree import build_nav_tree
 
 # --- Configuration ---
 DEFAULT_TARGET_MDX_ROOT = "docs/"  # Where the MDX files with frontmatter are
@@ -26,16 +31,13 @@ def setup_logging_illustrative(log_level_str="INFO", log_file="reconstruct_sideb
 
 def read_front_matter_for_reconstruction(mdx_file_path):
     try:
-        with open(mdx_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        source = read_front_matter_file(mdx_file_path)
     except FileNotFoundError:
         return None
 
-    fm_match = re.match(r'^---\s*?\n(.*?\n)---\s*?\n?(.*)', content, re.DOTALL)
-    if fm_match:
-        fm_str = fm_match.group(1)
+    if source.has_front_matter:
         try:
-            fm = yaml.safe_load(fm_str)
+            fm = source.load()
             if isinstance(fm, dict):
                 # Add path for reference
                 fm['_mdx_path'] = mdx_file_path
@@ -96,14 +98,133 @@ def build_tree(items_with_fm):
         class_name = item.get('sidebar_class_name', '')
 
         indent = "  " * (level - 1) if level > 0 else ""
+        output_lines.append(format_sidebar_line(indent, level, item.get('sidebar_position'), label, class_name, prefix_str, path))
+
+    return output_lines
 
-        # Try to display the visual prefix if present
-        display_label = f"{prefix_str}{label}" if prefix_str else label
 
-        line = f"{indent}- {display_label} (L:{level}, P:{item.get('sidebar_position')}, Class: '{class_name}', Path: {os.path.basename(path)})"
-        output_lines.append(line)
+def format_sidebar_line(indent, level, position, label, class_name, prefix_str, path):
+    # Try to display the visual prefix if present
+    display_label = f"{prefix_str}{label}" if prefix_str else label
+    return f"{indent}- {display_label} (L:{level}, P:{position}, Class: '{class_name}', Path: {os.path.basename(path)})"
 
-    return output_lines
+
+# --- Streaming reconstruction ---
+class SidebarRecord:
+    """
+    The sidebar-relevant front matter of one MDX file; everything else in the front matter is dropped.
+    doc_id is the Docusaurus doc id (directory relative to the docs root plus the front matter id or file stem).
+    """
+    __slots__ = ("path", "sidebar_level", "sidebar_position", "sidebar_label", "sidebar_class_name", "sidebar_prefix",
+                 "doc_id")
+
+    def __init__(self, path, sidebar_level, sidebar_position, sidebar_label, sidebar_class_name, sidebar_prefix,
+                 doc_id=None):
+        self.path = path
+        self.sidebar_level = sidebar_level
+        self.sidebar_position = sidebar_position
+        self.sidebar_label = sidebar_label
+        self.sidebar_class_name = sidebar_class_name
+        self.sidebar_prefix = sidebar_prefix
+        self.doc_id = doc_id
+
+    def __iter__(self):
+        """Unpacks as (path, sidebar_level, sidebar_position, sidebar_label, sidebar_class_name, sidebar_prefix)."""
+        return iter((self.path, self.sidebar_level, self.sidebar_position, self.sidebar_label,
+                     self.sidebar_class_name, self.sidebar_prefix))
+
+    def __repr__(self):
+        return f"SidebarRecord{tuple(self)!r}"
+
+
+def iter_sidebar_records(mdx_root):
+    """
+    Yields a SidebarRecord for every MDX file under mdx_root that has sidebar_level, sidebar_position and
+    sidebar_label, one directory at a time and in sorted order. Only one file's front matter is held at a time.
+    """
+    for dirpath, dirnames, filenames in os.walk(mdx_root):
+        dirnames.sort()
+        rel_dir = os.path.relpath(dirpath, mdx_root).replace(os.sep, '/')
+        for filename in sorted(filenames):
+            if not filename.endswith(".mdx"):
+                continue
+            fm = read_front_matter_for_reconstruction(os.path.join(dirpath, filename))
+            if not fm or 'sidebar_level' not in fm or 'sidebar_position' not in fm or 'sidebar_label' not in fm:
+                continue
+            custom_props = fm.get('customProps')
+            doc_name = str(fm.get('id', os.path.splitext(filename)[0]))
+            yield SidebarRecord(fm['_mdx_path'], fm['sidebar_level'], fm['sidebar_position'], fm['sidebar_label'],
+                                fm.get('sidebar_class_name', ''),
+                                custom_props.get('sidebar_prefix', '') if isinstance(custom_props, dict) else '',
+                                doc_name if rel_dir == '.' else f"{rel_dir}/{doc_name}")
+
+
+def iter_reconstructed_lines(records):
+    """
+    Builds the tree incrementally: records are consumed one directory at a time, each directory's items are put
+    in nav order (sidebar_position) and nested under the nearest preceding item with a lower sidebar_level.
+    Lines for a directory are yielded as soon as its last record has been read, so memory is bounded by the
+    largest directory rather than the whole doc tree.
+    """
+    for dirpath, dir_records in groupby(records, key=lambda record: os.path.dirname(record.path)):
+        dir_records = sorted(dir_records, key=lambda record: (record.sidebar_position, record.path))
+        yield f"[{dirpath}]"
+        for node in build_nav_tree(dir_records, level_of=lambda record: record.sidebar_level).walk():
+            record = node.item
+            indent = "  " * len(node.ancestors())
+            yield format_sidebar_line(indent, record.sidebar_level, record.sidebar_position, record.sidebar_label,
+                                      record.sidebar_class_name, record.sidebar_prefix, record.path)
+
+
+# --- sidebars.ts generation ---
+def _sidebar_item(node):
+    """A Docusaurus sidebar item for one tree node: a doc, or a category linked to its doc if it has children."""
+    record = node.item
+    item = {'type': 'category' if node.has_children else 'doc'}
+    if node.has_children:
+        item['label'] = record.sidebar_label
+        item['link'] = {'type': 'doc', 'id': record.doc_id}
+    else:
+        item['id'] = record.doc_id
+        item['label'] = record.sidebar_label
+    if record.sidebar_class_name:
+        item['className'] = record.sidebar_class_name
+    if record.sidebar_prefix:
+        item['customProps'] = {'sidebar_prefix': record.sidebar_prefix}
+    if node.has_children:
+        item['items'] = [_sidebar_item(child) for child in node.children]
+    return item
+
+
+def build_sidebar_items(records):
+    """
+    Rebuilds the parent/child hierarchy of each directory in one pass and returns {dirName: [sidebar items]},
+    where dirName is the doc id prefix Docusaurus' autogenerated items would use. Records must arrive grouped
+    by directory, as iter_sidebar_records() yields them.
+    """
+    items_by_dir = {}
+    for _, dir_records in groupby(records, key=lambda record: os.path.dirname(record.path)):
+        dir_records = sorted(dir_records, key=lambda record: (record.sidebar_position, record.path))
+        dir_name = dir_records[0].doc_id.rpartition('/')[0]
+        tree = build_nav_tree(dir_records, level_of=lambda record: record.sidebar_level)
+        items_by_dir[dir_name] = [_sidebar_item(root) for root in tree.roots]
+    return items_by_dir
+
+
+def render_sidebars_ts(items_by_dir):
+    """
+    A TypeScript module exporting the items per directory. In sidebars.ts,
+    `items: [{ type: 'autogenerated', dirName: 'statements' }]` becomes `items: generatedSidebarItems['statements']`.
+    """
+    items_json = json.dumps(items_by_dir, indent=2, ensure_ascii=False)
+    return (
+        "// Generated by scripts/reconstruct_sidebar_demo.py --emit_sidebars_ts from MDX front matter.\n"
+        "// Do not edit by hand; re-run the script after regenerating sidebar front matter.\n"
+        "import type {SidebarsConfig} from '@docusaurus/plugin-content-docs';\n\n"
+        "type SidebarItems = Extract<SidebarsConfig[string], unknown[]>;\n\n"
+        f"export const generatedSidebarItems: Record<string, SidebarItems> = {items_json};\n\n"
+        "export default generatedSidebarItems;\n"
+    )
 
 
 def main_reconstruct():
@@ -112,6 +233,13 @@ def main_reconstruct():
     parser.add_argument("mdx_root", default=DEFAULT_TARGET_MDX_ROOT, nargs='?', help="Root directory of MDX files.")
     parser.add_argument("--log_level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
                         help="Logging level.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream the hierarchy directory by directory instead of loading all front matter first. "
+                             "Items are nested per directory by sidebar_position rather than sorted globally.")
+
+    parser.add_argument("--emit_sidebars_ts", metavar="PATH",
+                        help="Write the reconstructed hierarchy as a TypeScript module of Docusaurus sidebar items "
+                             "(one array per directory) instead of printing it.")
 
     args = parser.parse_args()
     setup_logging_illustrative(args.log_level)
@@ -119,6 +247,25 @@ def main_reconstruct():
     abs_mdx_root = os.path.abspath(args.mdx_root)
     logging.info(f"Scanning MDX files in: {abs_mdx_root}")
 
+    if args.emit_sidebars_ts:
+        items_by_dir = build_sidebar_items(iter_sidebar_records(abs_mdx_root))
+        if not items_by_dir:
+            logging.info("No MDX files with sidebar front matter found.")
+            return
+        write_text_atomic(args.emit_sidebars_ts, render_sidebars_ts(items_by_dir))
+        logging.info(f"Wrote sidebar items for {len(items_by_dir)} directories to {args.emit_sidebars_ts}")
+        return
+
+    if args.stream:
+        print("\nReconstructed Sidebar Hierarchy (Illustrative, streamed):", flush=True)
+        line_count = 0
+        for line in iter_reconstructed_lines(iter_sidebar_records(abs_mdx_root)):
+            print(line, flush=True)
+            line_count += 1
+        if not line_count:
+            print("Could not reconstruct a tree (no valid items found).")
+        return
+
     all_items_fm = []
     for dirpath, _, filenames in os.walk(abs_mdx_root):
         for filename in filenames:
@@ -150,24 +297,5 @@ def main_reconstruct():
     print(f"likely requiring more sophisticated tree building, especially if 'sidebar_parent_key' is not used.")
 
 
-def main():
-    pass
-
-
 if __name__ == "__main__":
-    # Decide which script to run, or make them separate files.
-    # For this example, let's assume the user calls one or the other.
-    # This main entry point is for the first script (frontmatter generation)
-    # To run the illustrative reconstruction, you'd call main_reconstruct()
-
-    # If you save the second script as, e.g., reconstruct_sidebar_demo.py,
-    # you would run that one separately.
-    # For now, I'm keeping the main() for the first script.
-    main()
-    # To test the reconstruction:
-    # 1. Run the main script to generate frontmatter.
-    # 2. Then, you could call main_reconstruct() or run it as a separate script
-    #    pointing to the MDX files.
-    # Example:
-    # if __name__ == "__main__" and some_condition_to_run_reconstructor:
-    # main_reconstruct()
\ No newline at end of file
+    main_reconstruct()
@@ -0,0 +1,186 @@
+"""
+Linear-space diff for long token sequences.
+
+difflib.ndiff is quadratic and SequenceMatcher's junk heuristics make it miss matches in long inputs. Here the
+sequences are first split at anchors, i.e. elements that occur exactly once on each side, whose longest in-order
+chain (as in patience diff) is matched; short inputs skip this step. Each stretch between anchors is then
+diffed with Myers' O(ND) algorithm in its linear-space form: the forward and reverse searches meet at a middle
+snake, the stretch is split there, and both halves are diffed the same way. Memory stays linear in the input.
+Time grows with the number of differences within a stretch, not with the product of the lengths.
+
+Elements only need to be hashable and comparable with ==.
+"""
+from bisect import bisect_left
+
+# Stretches shorter than this (len(a) + len(b)) go straight to Myers, which is exact; anchors only pay off
+# on long ones, where coincidentally unique elements are rare and D would make Myers slow.
+ANCHOR_MIN_LENGTH = 512
+
+
+def is_subsequence(a, b):
+    """True if every element of a occurs in b in the same order (b may have more). Linear, greedy."""
+    remaining = iter(b)
+    return all(element in remaining for element in a)
+
+
+def _common_prefix(a, alo, ahi, b, blo, bhi):
+    size = 0
+    while alo + size < ahi and blo + size < bhi and a[alo + size] == b[blo + size]: size += 1
+    return size
+
+
+def _common_suffix(a, alo, ahi, b, blo, bhi):
+    size = 0
+    while alo < ahi - size and blo < bhi - size and a[ahi - size - 1] == b[bhi - size - 1]: size += 1
+    return size
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """(i, j) pairs of elements occurring exactly once in both ranges, longest chain increasing in i and j."""
+    index_a = {}
+    for i in range(alo, ahi):
+        index_a[a[i]] = -1 if a[i] in index_a else i
+    index_b = {}
+    for j in range(blo, bhi):
+        if index_a.get(b[j], -1) != -1:
+            index_b[b[j]] = -1 if b[j] in index_b else j
+    pairs = sorted((index_a[element], j) for element, j in index_b.items() if j != -1)
+    if not pairs: return []
+
+    # Longest increasing subsequence of the j's (patience sorting), with back links to rebuild it
+    tails, tail_positions, previous = [], [], [None] * len(pairs)
+    for position, (_, j) in enumerate(pairs):
+        pile = bisect_left(tails, j)
+        if pile == len(tails):
+            tails.append(j)
+            tail_positions.append(position)
+        else:
+            tails[pile] = j
+            tail_positions[pile] = position
+        previous[position] = tail_positions[pile - 1] if pile else None
+    anchors = []
+    position = tail_positions[-1]
+    while position is not None:
+        anchors.append(pairs[position])
+        position = previous[position]
+    anchors.reverse()
+    return anchors
+
+
+def _middle_snake(a, alo, ahi, b, blo, bhi):
+    """
+    The point where the forward and reverse Myers searches over a[alo:ahi] and b[blo:bhi] meet, as absolute
+    (i, j), or None if the ranges have no element in common.
+    """
+    n, m = ahi - alo, bhi - blo
+    max_d = (n + m + 1) // 2
+    v_offset = max_d
+    v_length = 2 * max_d + 2
+    forward = [-1] * v_length
+    reverse = [-1] * v_length
+    forward[v_offset + 1] = 0
+    reverse[v_offset + 1] = 0
+    delta = n - m
+    front = delta % 2 != 0  # With an odd delta the paths meet during a forward step
+    k1_start = k1_end = k2_start = k2_end = 0  # Trims diagonals that ran off the edit graph
+    for d in range(max_d):
+        for k1 in range(-d + k1_start, d + 1 - k1_end, 2):
+            k1_offset = v_offset + k1
+            if k1 == -d or (k1 != d and forward[k1_offset - 1] < forward[k1_offset + 1]):
+                x1 = forward[k1_offset + 1]
+            else:
+                x1 = forward[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[alo + x1] == b[blo + y1]:
+                x1 += 1
+                y1 += 1
+            forward[k1_offset] = x1
+            if x1 > n:
+                k1_end += 2
+            elif y1 > m:
+                k1_start += 2
+            elif front:
+                k2_offset = v_offset + delta - k1
+                if 0 <= k2_offset < v_length and reverse[k2_offset] != -1 and x1 >= n - reverse[k2_offset]:
+                    return alo + x1, blo + y1
+        for k2 in range(-d + k2_start, d + 1 - k2_end, 2):
+            k2_offset = v_offset + k2
+            if k2 == -d or (k2 != d and reverse[k2_offset - 1] < reverse[k2_offset + 1]):
+                x2 = reverse[k2_offset + 1]
+            else:
+                x2 = reverse[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[ahi - x2 - 1] == b[bhi - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            reverse[k2_offset] = x2
+            if x2 > n:
+                k2_end += 2
+            elif y2 > m:
+                k2_start += 2
+            elif not front:
+                k1_offset = v_offset + delta - k2
+                if 0 <= k1_offset < v_length and forward[k1_offset] != -1:
+                    x1 = forward[k1_offset]
+                    if x1 >= n - x2:
+                        return alo + x1, blo + x1 - (k1_offset - v_offset)
+    return None
+
+
+def matching_blocks(a, b):
+    """
+    (i, j, size) triples with a[i:i+size] == b[j:j+size], increasing in i and j and together forming a longest
+    common subsequence (near-longest where anchors cut across a cheaper alignment). Like
+    difflib.SequenceMatcher.get_matching_blocks(), the last triple is (len(a), len(b), 0).
+    """
+    matches = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        prefix = _common_prefix(a, alo, ahi, b, blo, bhi)
+        if prefix:
+            matches.append((alo, blo, prefix))
+            alo, blo = alo + prefix, blo + prefix
+        suffix = _common_suffix(a, alo, ahi, b, blo, bhi)
+        if suffix:
+            matches.append((ahi - suffix, bhi - suffix, suffix))
+            ahi, bhi = ahi - suffix, bhi - suffix
+        if alo == ahi or blo == bhi: continue
+
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi) if (ahi - alo) + (bhi - blo) >= ANCHOR_MIN_LENGTH else []
+        if anchors:
+            matches.extend((i, j, 1) for i, j in anchors)
+            bounds = [(alo - 1, blo - 1)] + anchors + [(ahi, bhi)]
+            stack.extend((i0 + 1, i1, j0 + 1, j1) for (i0, j0), (i1, j1) in zip(bounds, bounds[1:]))
+            continue
+        split = _middle_snake(a, alo, ahi, b, blo, bhi)
+        if split is None or split in ((alo, blo), (ahi, bhi)): continue  # Nothing in common (or no progress)
+        x, y = split
+        stack.append((x, ahi, y, bhi))
+        stack.append((alo, x, blo, y))
+
+    matches.sort()
+    merged = []
+    for i, j, size in matches:
+        if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+            merged[-1] = (merged[-1][0], merged[-1][1], merged[-1][2] + size)
+        else:
+            merged.append((i, j, size))
+    merged.append((len(a), len(b), 0))
+    return merged
+
+
+def diff_opcodes(a, b):
+    """(tag, i1, i2, j1, j2) steps turning a into b, tags as in difflib: 'equal', 'delete', 'insert', 'replace'."""
+    opcodes = []
+    i = j = 0
+    for block_i, block_j, size in matching_blocks(a, b):
+        if i < block_i and j < block_j:
+            opcodes.append(("replace", i, block_i, j, block_j))
+        elif i < block_i:
+            opcodes.append(("delete", i, block_i, j, block_j))
+        elif j < block_j:
+            opcodes.append(("insert", i, block_i, j, block_j))
+        i, j = block_i + size, block_j + size
+        if size: opcodes.append(("equal", block_i, i, block_j, j))
+    return opcodes
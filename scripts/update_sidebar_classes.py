@@ -1,9 +1,11 @@
 import os
-import re
+import argparse
 from pathlib import Path
 import yaml
 from collections import OrderedDict
 
+from frontmatter_io import dump_front_matter, patch_front_matter, read_front_matter_file, render_document
+
 # --- Configuration ---
 DOCS_PATH = Path("docs")
 RELATIONSHIPS_SUBDIR = "relationships"
@@ -17,62 +19,43 @@ LEVEL_TO_CLASS_PREFIX_MAP = {
 PRIORITY_KEYS = ['slug', 'sidebar_class_name']
 
 
-# --- PyYAML Representer for OrderedDict ---
-def represent_ordereddict(dumper, data):
-    """Ensures OrderedDict is represented as a standard YAML map, preserving order."""
-    return dumper.represent_mapping('tag:yaml.org,2002:map', data.items())
-
-
-yaml.add_representer(OrderedDict, represent_ordereddict, Dumper=yaml.SafeDumper)
-
-
 # --- Helper Functions ---
 def read_frontmatter_and_content(filepath):
+    """
+    Returns (frontmatter_dict, FrontMatterFile), or (None, None) if the file has no usable frontmatter.
+    Only the frontmatter is read here; the content is read from the FrontMatterFile if an update is needed.
+    """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            text = f.read()
+        source = read_front_matter_file(filepath)
     except Exception as e:
         print(f"Error reading file {filepath}: {e}")
-        return None, None, None
-
-    match = re.match(r'^---\s*\n(.*?)\n---\s*\n?(.*)', text, re.DOTALL | re.MULTILINE)
-    if not match:
-        match_only_fm = re.match(r'^---\s*\n(.*?)\n---\s*$', text, re.DOTALL | re.MULTILINE)
-        if match_only_fm:
-            frontmatter_str = match_only_fm.group(1)
-            content_str = ""
-        else:
-            print(f"Warning: No valid frontmatter block found in {filepath}. Skipping.")
-            return None, None, None
-    else:
-        frontmatter_str = match.group(1)
-        content_str = match.group(2)
+        return None, None
+
+    if not source.has_front_matter:
+        print(f"Warning: No valid frontmatter block found in {filepath}. Skipping.")
+        return None, None
 
     try:
-        # SafeLoader loads into standard dicts, not OrderedDicts by default
-        frontmatter_dict = yaml.load(frontmatter_str, Loader=yaml.SafeLoader)
+        # The safe loaders load into standard dicts, not OrderedDicts
+        frontmatter_dict = source.load()
         if not isinstance(frontmatter_dict, dict):
             print(
-                f"Warning: Frontmatter in {filepath} is not a valid YAML mapping. Content: {frontmatter_str[:100]}... Skipping.")
-            return None, None, None
-        return frontmatter_dict, content_str, text
+                f"Warning: Frontmatter in {filepath} is not a valid YAML mapping. Content: {source.front_matter_text[:100]}... Skipping.")
+            return None, None
+        return frontmatter_dict, source
     except yaml.YAMLError as e:
         print(f"Error parsing YAML frontmatter in {filepath}: {e}")
-        return None, None, None
+        return None, None
     except Exception as e:
         print(f"Unexpected error processing frontmatter in {filepath}: {e}")
-        return None, None, None
-
+        return None, None
 
-def update_markdown_file(filepath, base_docs_path, relationships_subdir_name):
-    print(f"Processing: {filepath}")
-    # frontmatter_dict will be a standard dict from SafeLoader
-    original_frontmatter_dict, content_str, original_text = read_frontmatter_and_content(filepath)
-
-    if original_frontmatter_dict is None:
-        return False
 
-    modified_frontmatter = dict(original_frontmatter_dict)
+def apply_sidebar_classes(modified_frontmatter, filepath, base_docs_path, relationships_subdir_name, report=print):
+    """
+    Adds the sidebar-level-N class and, under the relationships directory, the slug to a frontmatter dict in place.
+    Returns True if a value changed. report receives a line per change.
+    """
     any_logical_change_made = False
 
     # 1. Logic for sidebar_class_name
@@ -94,12 +77,12 @@ def update_markdown_file(filepath, base_docs_path, relationships_subdir_name):
                 if new_class_name not in existing_classes:
                     existing_classes.add(new_class_name)
                     modified_frontmatter['sidebar_class_name'] = " ".join(sorted(list(existing_classes)))
-                    print(f"  Updated 'sidebar_class_name' to: \"{modified_frontmatter['sidebar_class_name']}\"")
+                    report(f"  Updated 'sidebar_class_name' to: \"{modified_frontmatter['sidebar_class_name']}\"")
                     any_logical_change_made = True
                 # else:
                 #     print(f"  Info: Class '{new_class_name}' already in 'sidebar_class_name'.")
         except (ValueError, TypeError):
-            print(
+            report(
                 f"  Warning: 'sidebar_level' in {filepath} is not a valid integer: '{modified_frontmatter['sidebar_level']}'.")
 
     # 2. Logic for slug
@@ -114,15 +97,15 @@ def update_markdown_file(filepath, base_docs_path, relationships_subdir_name):
         expected_slug = f"/{relationships_subdir_name}/{filename_stem}"
         if modified_frontmatter.get('slug') != expected_slug:
             modified_frontmatter['slug'] = expected_slug
-            print(f"  Updated 'slug' to: \"{expected_slug}\"")
+            report(f"  Updated 'slug' to: \"{expected_slug}\"")
             any_logical_change_made = True
         # else:
         #     print(f"  Info: 'slug' is already correct: \"{expected_slug}\".")
+    return any_logical_change_made
 
-    if not any_logical_change_made:
-        # print(f"  Info: No logical changes to frontmatter values for {filepath}.")
-        return False
 
+def arrange_frontmatter(modified_frontmatter, original_frontmatter_dict):
+    """PRIORITY_KEYS first, then the original key order, then keys that are new."""
     final_ordered_frontmatter = OrderedDict()
     temp_modified_copy = modified_frontmatter.copy()
 
@@ -138,26 +121,47 @@ def update_markdown_file(filepath, base_docs_path, relationships_subdir_name):
 
     for key, value in temp_modified_copy.items():  # Add any new keys not in original & not priority
         final_ordered_frontmatter[key] = value
+    return final_ordered_frontmatter
 
-    try:
-        new_frontmatter_str = yaml.dump(
-            final_ordered_frontmatter,
-            Dumper=yaml.SafeDumper,
-            sort_keys=False,
-            allow_unicode=True,
-            default_flow_style=False,
-            width=9999
-        )
-        if not new_frontmatter_str.endswith('\n'):
-            new_frontmatter_str += '\n'
-    except yaml.YAMLError as e:  # Catching general YAMLError which includes RepresenterError
-        print(f"  Error formatting YAML for {filepath}: {e}")
-        print(f"  Problematic data (first few items): {list(final_ordered_frontmatter.items())[:5]}")
+
+def update_markdown_file(filepath, base_docs_path, relationships_subdir_name, patch=False):
+    print(f"Processing: {filepath}")
+    # frontmatter_dict will be a standard dict from the safe loader
+    original_frontmatter_dict, source = read_frontmatter_and_content(filepath)
+
+    if original_frontmatter_dict is None:
         return False
 
-    new_file_content = f"---\n{new_frontmatter_str}---\n{content_str}"
+    modified_frontmatter = dict(original_frontmatter_dict)
+    any_logical_change_made = apply_sidebar_classes(modified_frontmatter, filepath, base_docs_path,
+                                                    relationships_subdir_name)
 
-    if new_file_content == original_text:
+    if not any_logical_change_made:
+        # print(f"  Info: No logical changes to frontmatter values for {filepath}.")
+        return False
+
+    final_ordered_frontmatter = arrange_frontmatter(modified_frontmatter, original_frontmatter_dict)
+
+    # A patched block keeps every line but the changed keys', and the content as it was
+    patched_frontmatter_str = patch_front_matter(source.front_matter_text, original_frontmatter_dict,
+                                                 final_ordered_frontmatter, PRIORITY_KEYS, PRIORITY_KEYS,
+                                                 width=9999) if patch else None
+    if patched_frontmatter_str is not None:
+        new_file_content = render_document(patched_frontmatter_str, source.body)
+    else:
+        try:
+            new_frontmatter_str = dump_front_matter(final_ordered_frontmatter, width=9999)
+            if not new_frontmatter_str.endswith('\n'):
+                new_frontmatter_str += '\n'
+        except yaml.YAMLError as e:  # Catching general YAMLError which includes RepresenterError
+            print(f"  Error formatting YAML for {filepath}: {e}")
+            print(f"  Problematic data (first few items): {list(final_ordered_frontmatter.items())[:5]}")
+            return False
+
+        # Blank lines between the closing fence and the content are not preserved
+        new_file_content = render_document(new_frontmatter_str, source.body.lstrip())
+
+    if new_file_content == source.read_text():
         # print(f"  Info: No textual change to file {filepath} after YAML processing.")
         return False
 
@@ -173,6 +177,12 @@ def update_markdown_file(filepath, base_docs_path, relationships_subdir_name):
 
 # --- Main Execution ---
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Add sidebar-level-N classes and relationship slugs to docs front matter.")
+    arg_parser.add_argument("--patch_front_matter", action="store_true",
+                            help="Rewrite only the slug and sidebar_class_name lines, keeping the rest of each file byte for byte "
+                                 "(front matter that cannot be patched is dumped as usual).")
+    args = arg_parser.parse_args()
+
     try:
         yaml.safe_load
     except (AttributeError, NameError):
@@ -194,7 +204,7 @@ if __name__ == "__main__":
     for ext in ["*.md", "*.mdx"]:
         for doc_file in DOCS_PATH.rglob(ext):
             processed_files_count += 1
-            if update_markdown_file(doc_file, DOCS_PATH, RELATIONSHIPS_SUBDIR):
+            if update_markdown_file(doc_file, DOCS_PATH, RELATIONSHIPS_SUBDIR, args.patch_front_matter):
                 updated_files_count += 1
 
     print(f"\n--- Summary ---")
@@ -0,0 +1,420 @@
+"""
+Throughput benchmarks for the conversion tooling over the ISBDM corpus and the element fixture.
+
+Each benchmark times one hot path end to end: the HTML to MDX converter per page template (parse included),
+building the sidebar nav map with and without a warm nav cache, the per-section sidebar structures of
+html_to_mdx_v10.py (cache_all_html_sidebar_structures), reading, dumping and patching front matter,
+the front-matter pipeline, and conversion verification. A benchmark's setup is not timed; its run is repeated
+and the best time is reported as items per second.
+
+--save_baseline stores the results as JSON; a later run with --baseline compares against them and exits 1
+when a benchmark's throughput dropped by more than --threshold. Baselines are only comparable on the same
+machine and Python, so they are meant to be saved locally (e.g. before a change) rather than committed.
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+from collections import OrderedDict
+
+import scripts_path  # noqa: F401
+import frontmatter_pipeline as pipeline
+import generate_sidebar_frontmatter as sidebar_frontmatter
+from file_utils import write_text_atomic
+from frontmatter_io import dump_front_matter, patch_front_matter, read_front_matter_file, render_document
+from html_document_store import DEFAULT_PARSER, available_parsers, get_default_store
+from mdx_text import read_mdx_text
+
+from compare_parser_backends import convert_corpus, find_html_files
+import html_to_mdx_v10 as sidebar_v10
+import verify_mdx_conversion as verifier
+
+DEFAULT_SOURCE_DIR = "ISBDM/docs"
+DEFAULT_MDX_DIR = "docs"
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2  # Fail when throughput drops by more than this fraction of the baseline
+BASELINE_VERSION = 1
+
+FIXTURE_HTML = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1025.html")
+FIXTURE_CONVERSIONS = 20  # The fixture is a single page; convert it this many times per run
+
+# Converter benchmarks: template -> (source subdirectories, file name pattern)
+TEMPLATE_GROUPS = OrderedDict([
+    ("element", (("attributes", "statements", "notes", "relationships"), re.compile(r"\d+\.html$"))),
+    ("fullex", (("fullex",), re.compile(r"fx\d+\.html$"))),
+    ("ves", (("ves",), re.compile(r".*\.html$"))),
+    ("glossary", (("glossary",), re.compile(r".*\.html$"))),
+])
+
+# name -> (description, setup(BenchmarkContext) returning run(), which returns the number of items it processed).
+# Benchmarks run in registration order.
+BENCHMARKS = OrderedDict()
+
+
+def register_benchmark(name, description):
+    def decorator(setup):
+        BENCHMARKS[name] = (description, setup)
+        return setup
+
+    return decorator
+
+
+class BenchmarkContext:
+    """Run-wide inputs the benchmark setups need."""
+
+    def __init__(self, source_dir, mdx_dir, work_dir, parser=DEFAULT_PARSER, limit=None):
+        self.source_dir = source_dir
+        self.mdx_dir = mdx_dir
+        self.work_dir = work_dir  # Scratch directory, removed after the run
+        self.parser = parser
+        self.limit = limit  # Cap on the files each benchmark processes (None for all)
+
+    def limited(self, paths):
+        return paths[:self.limit] if self.limit else paths
+
+    def template_pages(self, template):
+        directories, pattern = TEMPLATE_GROUPS[template]
+        pages = []
+        for directory in directories:
+            pages.extend(path for path in find_html_files(os.path.join(self.source_dir, directory))
+                         if pattern.match(os.path.basename(path)))
+        return self.limited(sorted(pages))
+
+    def doc_files(self):
+        return self.limited(list(pipeline.iter_doc_files(self.mdx_dir)))
+
+    def scratch_dir(self, name):
+        path = os.path.join(self.work_dir, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+
+# --- Converter ---
+def _register_convert_benchmark(template):
+    def setup(context):
+        pages = context.template_pages(template)
+        # convert_corpus parses with a store of its own, so every run includes parsing
+        return lambda: len(convert_corpus(pages, context.source_dir, context.parser)[0])
+
+    register_benchmark(f"convert_{template}", f"convert_html_to_mdx over the {template} pages (parse included)")(setup)
+
+
+for _template in TEMPLATE_GROUPS: _register_convert_benchmark(_template)
+
+
+@register_benchmark("convert_fixture", f"convert_html_to_mdx over the element fixture, {FIXTURE_CONVERSIONS} times")
+def convert_fixture(context):
+    fixture_dir = os.path.dirname(FIXTURE_HTML)
+
+    def run():
+        for _ in range(FIXTURE_CONVERSIONS): convert_corpus([FIXTURE_HTML], fixture_dir, context.parser)
+        return FIXTURE_CONVERSIONS
+
+    return run
+
+
+# --- Sidebar nav map ---
+@register_benchmark("sidebar_nav_parse", "cache_all_html_sidebar_maps parsing every nav source (items: nav sources)")
+def sidebar_nav_parse(context):
+    sources = len(list(sidebar_frontmatter.iter_nav_sources(context.source_dir)))
+
+    def run():
+        get_default_store().clear()  # Otherwise later runs reuse the parsed nav blocks
+        sidebar_frontmatter.cache_all_html_sidebar_maps(context.source_dir)
+        return sources
+
+    return run
+
+
+@register_benchmark("sidebar_nav_cache", "cache_all_html_sidebar_maps from a warm nav cache (items: nav sources)")
+def sidebar_nav_cache(context):
+    sources = len(list(sidebar_frontmatter.iter_nav_sources(context.source_dir)))
+    nav_cache = sidebar_frontmatter.NavCache(os.path.join(context.scratch_dir("nav_cache"),
+                                                          sidebar_frontmatter.DEFAULT_NAV_CACHE_FILENAME))
+    sidebar_frontmatter.cache_all_html_sidebar_maps(context.source_dir, nav_cache)
+    nav_cache.save()
+
+    def run():
+        get_default_store().clear()
+        warm_cache = sidebar_frontmatter.NavCache(nav_cache.cache_path)
+        warm_cache.load()
+        sidebar_frontmatter.cache_all_html_sidebar_maps(context.source_dir, warm_cache)
+        return sources
+
+    return run
+
+
+@register_benchmark("sidebar_structures_v10",
+                    "html_to_mdx_v10 cache_all_html_sidebar_structures parsing every section (items: sections)")
+def sidebar_structures_v10(context):
+    def run():
+        get_default_store().clear()
+        sidebar_v10.cache_all_html_sidebar_structures(context.source_dir)
+        return len(sidebar_v10.SECTION_CONFIG)
+
+    return run
+
+
+# --- Front matter ---
+@register_benchmark("frontmatter_read", "read_front_matter_file and YAML load of every MDX file")
+def frontmatter_read(context):
+    paths = context.doc_files()
+
+    def run():
+        for path in paths: read_front_matter_file(path).load()
+        return len(paths)
+
+    return run
+
+
+def _loaded_documents(paths):
+    """(path, FrontMatterFile, front matter dict) of the files that have a front-matter mapping, bodies read."""
+    documents = []
+    for path in paths:
+        source = read_front_matter_file(path)
+        front_matter = source.load()
+        if isinstance(front_matter, dict):
+            source.body  # Read now so the timed runs only render and write
+            documents.append((path, source, front_matter))
+    return documents
+
+
+@register_benchmark("frontmatter_dump", "dump_front_matter and an atomic write of every MDX file")
+def frontmatter_dump(context):
+    documents = _loaded_documents(context.doc_files())
+    output_dir = context.scratch_dir("frontmatter_dump")
+
+    def run():
+        for path, source, front_matter in documents:
+            output_path = os.path.join(output_dir, os.path.relpath(path, context.mdx_dir))
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            write_text_atomic(output_path, render_document(dump_front_matter(front_matter), source.body))
+        return len(documents)
+
+    return run
+
+
+@register_benchmark("frontmatter_patch", "patch_front_matter of sidebar_position and an atomic write of every MDX file")
+def frontmatter_patch(context):
+    documents = []
+    for path, source, front_matter in _loaded_documents(context.doc_files()):
+        updated = dict(front_matter)
+        position = updated.get("sidebar_position")
+        updated["sidebar_position"] = position + 1 if isinstance(position, int) else 1
+        documents.append((path, source, front_matter, updated))
+    output_dir = context.scratch_dir("frontmatter_patch")
+
+    def run():
+        for path, source, front_matter, updated in documents:
+            front_matter_text = patch_front_matter(source.front_matter_text, front_matter, updated,
+                                                   sidebar_frontmatter.MANAGED_FRONT_MATTER_KEYS,
+                                                   sidebar_frontmatter.SIDEBAR_KEY_ORDER)
+            if front_matter_text is None: front_matter_text = dump_front_matter(updated)
+            output_path = os.path.join(output_dir, os.path.relpath(path, context.mdx_dir))
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            write_text_atomic(output_path, render_document(front_matter_text, source.body))
+        return len(documents)
+
+    return run
+
+
+@register_benchmark("frontmatter_pipeline", "process_document with every transform over a copy of the MDX tree")
+def frontmatter_pipeline(context):
+    target_mdx_root = os.path.join(context.work_dir, "frontmatter_pipeline")
+    shutil.copytree(context.mdx_dir, target_mdx_root, dirs_exist_ok=True)
+    pipeline_context = pipeline.PipelineContext(context.source_dir, target_mdx_root)
+    transforms = [factory(pipeline_context) for factory in pipeline.TRANSFORM_FACTORIES.values()]
+    paths = [os.path.join(target_mdx_root, os.path.relpath(path, context.mdx_dir)) for path in context.doc_files()]
+    for path in paths: pipeline.process_document(path, transforms)  # Later runs see settled files, as in practice
+
+    def run():
+        for path in paths: pipeline.process_document(path, transforms)
+        return len(paths)
+
+    return run
+
+
+# --- Verification ---
+@register_benchmark("verify", "verify_file over freshly converted element and fullex pages (parse included)")
+def verify(context):
+    pages = context.limited(context.template_pages("element") + context.template_pages("fullex"))
+    mdx_root = context.scratch_dir("verify")
+    results, _ = convert_corpus(pages, context.source_dir, context.parser)
+    tasks = []
+    for html_file_path in pages:
+        mdx_file_path = os.path.join(mdx_root, os.path.splitext(os.path.relpath(html_file_path, context.source_dir))[0] + ".mdx")
+        os.makedirs(os.path.dirname(mdx_file_path), exist_ok=True)
+        write_text_atomic(mdx_file_path, results[html_file_path][0])
+        tasks.append((html_file_path, mdx_file_path, "selector", verifier.DEFAULT_SELECTOR, False))
+
+    def run():
+        for task in tasks:
+            get_default_store().discard(task[0])  # Every run parses each page again
+            verifier.verify_file(task)
+        return len(tasks)
+
+    return run
+
+
+@register_benchmark("mdx_text", "read_mdx_text (rendered text of an MDX file) over every MDX file")
+def mdx_text(context):
+    paths = context.doc_files()
+
+    def run():
+        for path in paths: read_mdx_text(path)
+        return len(paths)
+
+    return run
+
+
+# --- Running and comparing ---
+def run_benchmark(name, context, repeat):
+    """{"items", "seconds" (best run), "per_second"} for one benchmark."""
+    description, setup = BENCHMARKS[name]
+    run = setup(context)
+    best, items = None, 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        items = run()
+        seconds = time.perf_counter() - started
+        if best is None or seconds < best: best = seconds
+    return {"items": items, "seconds": round(best, 6), "per_second": round(items / best, 3) if best else 0.0}
+
+
+def environment_info(args):
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+            "parser": args.parser, "limit": args.limit, "repeat": args.repeat}
+
+
+def load_baseline(path):
+    """The saved baseline, or None if there is none. Raises ValueError if the file is not a baseline."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    if not isinstance(data, dict) or data.get("version") != BASELINE_VERSION or not isinstance(data.get("results"), dict):
+        raise ValueError(f"{path} is not a version {BASELINE_VERSION} benchmark baseline")
+    return data
+
+
+def save_baseline(path, results, environment):
+    data = {"version": BASELINE_VERSION, "saved": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment,
+            "results": results}
+    write_text_atomic(path, json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def compare_to_baseline(results, baseline_results, threshold):
+    """{name: (baseline per_second, change as a fraction, regressed)} for the benchmarks the baseline has."""
+    comparisons = {}
+    for name, result in results.items():
+        baseline = baseline_results.get(name)
+        if not baseline or not baseline.get("per_second"): continue
+        change = result["per_second"] / baseline["per_second"] - 1
+        comparisons[name] = (baseline["per_second"], change, change < -threshold)
+    return comparisons
+
+
+def print_results(results, comparisons):
+    name_width = max(len(name) for name in results)
+    print(f"\n{'benchmark':<{name_width}}  {'items':>6}  {'best s':>8}  {'items/s':>10}  {'baseline':>10}  {'change':>7}")
+    for name, result in results.items():
+        line = f"{name:<{name_width}}  {result['items']:>6}  {result['seconds']:>8.3f}  {result['per_second']:>10.1f}"
+        if name in comparisons:
+            baseline_per_second, change, regressed = comparisons[name]
+            line += f"  {baseline_per_second:>10.1f}  {change:>+7.1%}" + ("  REGRESSED" if regressed else "")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the converter, the sidebar nav map, the front-matter read/write paths and "
+                    "verification over the ISBDM corpus; optionally save or check a throughput baseline.")
+    parser.add_argument("source_dir", nargs="?", default=DEFAULT_SOURCE_DIR, help="Directory of ISBDM HTML pages.")
+    parser.add_argument("--mdx_dir", default=DEFAULT_MDX_DIR, help="MDX tree for the front-matter benchmarks (read only).")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="Benchmarks to run, in registration order (default: all).")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit.")
+    parser.add_argument("--parser", default=DEFAULT_PARSER, choices=available_parsers(),
+                        help="BeautifulSoup tree builder for the converter benchmarks.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per benchmark; the best counts.")
+    parser.add_argument("--limit", type=int, default=None, help="Process at most this many files per benchmark.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH,
+                        help="Baseline JSON to compare against (and to write with --save_baseline).")
+    parser.add_argument("--save_baseline", action="store_true", help="Store these results as the baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed throughput drop against the baseline, as a fraction (default: 0.2).")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (description, _) in BENCHMARKS.items(): print(f"{name}: {description}")
+        return
+    abs_source_dir = os.path.abspath(args.source_dir)
+    abs_mdx_dir = os.path.abspath(args.mdx_dir)
+    for directory in (abs_source_dir, abs_mdx_dir):
+        if not os.path.isdir(directory):
+            print(f"Error: directory not found: {directory}")
+            sys.exit(2)
+    if args.repeat < 1 or not 0 <= args.threshold < 1:
+        print("Error: --repeat must be at least 1 and --threshold between 0 and 1.")
+        sys.exit(2)
+    try:
+        baseline = None if args.save_baseline else load_baseline(args.baseline)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+
+    logging.basicConfig(level=logging.ERROR, format='%(levelname)s: %(message)s')  # The tools log per file
+    environment = environment_info(args)
+    results = OrderedDict()
+    work_dir = tempfile.mkdtemp(prefix="isbdm_benchmark_")
+    try:
+        context = BenchmarkContext(abs_source_dir, abs_mdx_dir, work_dir, args.parser, args.limit)
+        for name in BENCHMARKS:
+            if name not in args.benchmarks: continue
+            results[name] = run_benchmark(name, context, args.repeat)
+            print(f"{name}: {results[name]['items']} items, {results[name]['per_second']:.1f}/s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    comparisons = {}
+    if baseline is not None:
+        settings = ("parser", "limit")
+        saved_settings = {key: baseline["environment"].get(key) for key in settings}
+        if any(saved_settings[key] != environment[key] for key in settings):
+            print(f"Warning: baseline {args.baseline} was saved with different settings "
+                  f"({', '.join(f'{key}={value}' for key, value in saved_settings.items())}); not comparing.")
+            baseline = None
+        else:
+            if baseline["environment"].get("python") != environment["python"]:
+                print(f"Warning: baseline was saved with Python {baseline['environment'].get('python')}.")
+            comparisons = compare_to_baseline(results, baseline["results"], args.threshold)
+    print_results(results, comparisons)
+
+    if args.json_path:
+        write_text_atomic(args.json_path, json.dumps({"environment": environment, "results": results,
+                                                      "comparisons": comparisons}, indent=2) + "\n")
+    if args.save_baseline:
+        save_baseline(args.baseline, results, environment)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+    if baseline is None:
+        print(f"\nNo comparable baseline at {args.baseline}; run with --save_baseline to store one.")
+        return
+    regressed = [name for name, (_, _, is_regressed) in comparisons.items() if is_regressed]
+    if regressed:
+        print(f"\nThroughput regressed by more than {args.threshold:.0%}: {', '.join(regressed)}")
+        sys.exit(1)
+    print(f"\nNo benchmark regressed by more than {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
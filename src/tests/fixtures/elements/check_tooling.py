@@ -0,0 +1,376 @@
+"""
+Regression checks for the shared tooling modules in scripts/.
+
+Each check builds small fixtures (in memory, or in a temporary directory), runs one module's contract over them
+and raises CheckFailed saying what differed. Run the script before committing a change to those modules; it
+exits 1 if any check failed:
+
+    python src/tests/fixtures/elements/check_tooling.py [--checks NAME ...]
+"""
+import os
+import sys
+import random
+import logging
+import argparse
+import tempfile
+import traceback
+from collections import OrderedDict
+
+import scripts_path  # noqa: F401
+import generate_sidebar_frontmatter as sidebar_frontmatter
+from file_utils import write_text_atomic
+from frontmatter_io import load_front_matter, patch_front_matter
+from html_document_store import get_default_store
+from link_index import LinkIndex
+from mdx_text import render_mdx_text
+from sequence_diff import ANCHOR_MIN_LENGTH, diff_opcodes, is_subsequence, matching_blocks
+
+# name -> (description, check(work_dir)). Checks run in registration order, each with a scratch directory of its own.
+CHECKS = OrderedDict()
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def register_check(name, description):
+    def decorator(check):
+        CHECKS[name] = (description, check)
+        return check
+
+    return decorator
+
+
+def expect(condition, message):
+    if not condition: raise CheckFailed(message)
+
+
+def expect_equal(actual, expected, what):
+    if actual != expected: raise CheckFailed(f"{what}: expected {expected!r}, got {actual!r}")
+
+
+# --- Sidebar dependency graph ---
+def _graph_from_keys(work_dir, keys_by_source):
+    """A SectionDependencyGraph built, as the generator builds it, from nav cache entries listing these keys."""
+    nav_cache = sidebar_frontmatter.NavCache(os.path.join(work_dir, sidebar_frontmatter.DEFAULT_NAV_CACHE_FILENAME))
+    for rel_path, keys in keys_by_source.items():
+        nav_cache.entries[rel_path] = {"items": [[f"{key}.html", key, key, 1, position, False, [], False]
+                                                 for position, key in enumerate(keys, 1)]}
+    return sidebar_frontmatter.SectionDependencyGraph.from_nav_cache(nav_cache)
+
+
+@register_check("section_graph", "SectionDependencyGraph.affected_keys over current and previous nav sources")
+def check_section_graph(work_dir):
+    previous = _graph_from_keys(work_dir, {
+        "attributes/index.html": ["attributes/1022", "attributes/1023", "attributes/1024"],
+        "relationships/agents.html": ["relationships/1001"],
+        "ves/ISBDMSES.html": ["ves/1240"],
+    })
+    current = _graph_from_keys(work_dir, {
+        "attributes/index.html": ["attributes/1022", "attributes/1024", "attributes/1025"],  # 1023 dropped, 1025 added
+        "relationships/agents.html": ["relationships/1001"],
+        "ves/ISBDMSES.html": ["ves/1240", "ves/1241"],
+        "notes/index.html": ["notes/1200"],  # New source
+    })
+    expect(_graph_from_keys(work_dir, {}).is_empty and not current.is_empty, "is_empty")
+    expect_equal(current.affected_keys(["attributes/index.html"]),
+                 {"attributes/1022", "attributes/1024", "attributes/1025"}, "keys of a changed source")
+    expect_equal(current.affected_keys(["attributes/index.html"], previous),
+                 {"attributes/1022", "attributes/1023", "attributes/1024", "attributes/1025"},
+                 "keys of a changed source, including those it no longer lists")
+    expect_equal(current.affected_keys(["relationships/agents.html", "ves/ISBDMSES.html"], previous),
+                 {"relationships/1001", "ves/1240", "ves/1241"}, "keys of several changed sources")
+    expect_equal(current.affected_keys(["notes/index.html"], previous), {"notes/1200"}, "keys of a new source")
+    expect_equal(current.affected_keys(["attributes/1022.html", "fullex/fx001.html"], previous), set(),
+                 "keys of content pages, which feed no sidebar front matter")
+    expect_equal(current.affected_keys([], previous), set(), "keys when nothing changed")
+
+
+# --- Nav cache ---
+def _write_nav_page(html_root, rel_path, hrefs):
+    """A nav source page whose navISBDMSection lists hrefs (site-absolute, as in the corpus)."""
+    rows = "".join(f'<div class="d-flex align-items-center"><a class="linkMenuEntry" href="{href}">E{index}</a></div>'
+                   for index, href in enumerate(hrefs, 1))
+    path = os.path.join(html_root, *rel_path.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_text_atomic(path,
+                      f'<html><body><nav class="d-flex flex-column navISBDMSection">{rows}</nav></body></html>\n')
+
+
+def _nav_map(html_root, nav_cache_path=None, key_prefix=None):
+    """(sorted nav map keys, the NavCache used or None), parsing afresh rather than from the document store."""
+    get_default_store().clear()
+    nav_cache = None
+    if nav_cache_path:
+        nav_cache = sidebar_frontmatter.NavCache(nav_cache_path)
+        nav_cache.load()
+    keys = sorted(sidebar_frontmatter.cache_all_html_sidebar_maps(html_root, nav_cache, key_prefix))
+    if nav_cache is not None:
+        nav_cache.save()
+    return keys, nav_cache
+
+
+@register_check("nav_cache", "NavCache reuses unchanged sources and skips those outside a key prefix unread")
+def check_nav_cache(work_dir):
+    html_root = os.path.join(work_dir, "html")
+    _write_nav_page(html_root, "attributes/index.html",
+                    ["/ISBDM/docs/attributes/1022.html", "/ISBDM/docs/attributes/1023.html"])
+    _write_nav_page(html_root, "notes/index.html", ["/ISBDM/docs/notes/1200.html"])
+    _write_nav_page(html_root, "ves/index.html", ["/ISBDM/docs/ves/1240.html"])
+    _write_nav_page(html_root, "ves/ISBDMSES.html", ["/ISBDM/docs/ves/ISBDMSES1117.html"])  # "ses" source, ves/ keys
+    nav_cache_path = os.path.join(work_dir, sidebar_frontmatter.DEFAULT_NAV_CACHE_FILENAME)
+
+    keys, nav_cache = _nav_map(html_root, nav_cache_path)
+    expect_equal(keys, ["attributes/1022", "attributes/1023", "notes/1200", "ves/1240", "ves/ISBDMSES1117"],
+                 "nav map keys")
+    expect_equal((nav_cache.hits, nav_cache.misses), (0, 4), "first run (hits, misses)")
+    keys, nav_cache = _nav_map(html_root, nav_cache_path)
+    expect_equal(keys, _nav_map(html_root)[0], "nav map keys from the cache")
+    expect_equal((nav_cache.hits, nav_cache.misses, nav_cache.skipped), (4, 0, 0), "warm run (hits, misses, skipped)")
+
+    keys, nav_cache = _nav_map(html_root, nav_cache_path, "ves")
+    expect_equal(keys, ["ves/1240", "ves/ISBDMSES1117"], "nav map keys under ves")
+    expect_equal((nav_cache.hits, nav_cache.skipped), (2, 2), "ves run (hits, skipped)")
+
+    # A changed source is read again even if its cached keys were all outside the prefix
+    _write_nav_page(html_root, "attributes/index.html",
+                    ["/ISBDM/docs/attributes/1022.html", "/ISBDM/docs/ves/1241.html"])
+    keys, nav_cache = _nav_map(html_root, nav_cache_path, "ves")
+    expect_equal(keys, _nav_map(html_root, None, "ves")[0], "nav map keys under ves after a change")
+    expect("ves/1241" in keys, "a key a changed source newly lists under the prefix")
+    expect_equal((nav_cache.misses, nav_cache.skipped), (1, 1), "ves run after a change (misses, skipped)")
+
+    # A touched but identical source is hashed once, then skipped again
+    notes_index = os.path.join(html_root, "notes", "index.html")
+    stat = os.stat(notes_index)
+    os.utime(notes_index, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    _, nav_cache = _nav_map(html_root, nav_cache_path, "ves")
+    expect_equal((nav_cache.hits, nav_cache.misses, nav_cache.skipped), (4, 0, 0),
+                 "ves run after a touch (hits, misses, skipped)")
+    _, nav_cache = _nav_map(html_root, nav_cache_path, "ves")
+    expect_equal(nav_cache.skipped, 1, "ves run after the touched stat was stored (skipped)")
+
+    # A NavCache kept across builds (--watch, the conversion server) counts each build on its own
+    get_default_store().clear()
+    sidebar_frontmatter.cache_all_html_sidebar_maps(html_root, nav_cache)
+    expect_equal((nav_cache.hits, nav_cache.misses, nav_cache.skipped), (4, 0, 0), "rebuild with the same NavCache")
+
+
+# --- Front-matter patching ---
+PATCH_FIXTURE = """# Managed by the sidebar tools
+title: 'Has category: "quoted"'
+sidebar_label: Old label
+sidebar_position: 3
+customProps:
+  prefix: "├─ "
+  note: keep   # trailing comment
+tags: [a, b]
+"""
+
+
+def _patched(updated_values, managed_keys, key_order=(), removed=()):
+    original = load_front_matter(PATCH_FIXTURE)
+    updated = dict(original, **updated_values)
+    for key in removed: del updated[key]
+    patched = patch_front_matter(PATCH_FIXTURE, original, updated, managed_keys, key_order)
+    if patched is not None:
+        expect_equal(load_front_matter(patched), updated, "patched front matter loaded back")
+    return patched
+
+
+def _fixture_with(old_line, new_line):
+    expect(PATCH_FIXTURE.count(old_line) == 1, f"fixture line {old_line!r}")
+    return PATCH_FIXTURE.replace(old_line, new_line)
+
+
+@register_check("patch_front_matter", "patch_front_matter rewrites only managed entries, or asks for a full dump")
+def check_patch_front_matter(work_dir):
+    expect_equal(_patched({}, ["sidebar_label"]), PATCH_FIXTURE, "nothing changed")
+    expect_equal(_patched({"sidebar_position": 4}, ["sidebar_position"]),
+                 _fixture_with("sidebar_position: 3\n", "sidebar_position: 4\n"), "managed value changed")
+    expect_equal(_patched({"sidebar_level": 2}, ["sidebar_level"],
+                          ["sidebar_label", "sidebar_level", "sidebar_position"]),
+                 _fixture_with("sidebar_position: 3\n", "sidebar_level: 2\nsidebar_position: 3\n"),
+                 "managed key added after the nearest preceding key in key_order")
+    expect_equal(_patched({}, ["sidebar_label"], removed=["sidebar_label"]),
+                 _fixture_with("sidebar_label: Old label\n", ""), "managed key removed")
+    custom_props = dict(load_front_matter(PATCH_FIXTURE)["customProps"], prefix="└─ ")
+    expect_equal(_patched({"customProps": custom_props}, ["customProps.prefix"]),
+                 _fixture_with('  prefix: "├─ "\n', "  prefix: '└─ '\n"),
+                 "managed nested value changed, its siblings (and their comments) kept")
+    expect_equal(_patched({"title": "New"}, ["sidebar_label"]), None, "unmanaged value changed")
+    expect_equal(_patched({"customProps": dict(custom_props, note="changed")}, ["customProps.prefix"]), None,
+                 "unmanaged nested value changed")
+    for text in ("{a: 1}\n", "'quoted key': 1\nsidebar_position: 1\n", "sidebar_position: 1"):
+        original = load_front_matter(text)
+        expect_equal(patch_front_matter(text, original, dict(original, sidebar_position=2), ["sidebar_position"]),
+                     None, f"front matter the line scanner does not handle ({text!r})")
+
+
+# --- Sequence diff ---
+def _lcs_length(a, b):
+    """Textbook O(len(a) * len(b)) dynamic programme, the reference matching_blocks() is checked against."""
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b): current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def _edited(rng, tokens, edits):
+    """tokens with random deletions, insertions and substitutions, like a converter dropping or adding text."""
+    edited = list(tokens)
+    for _ in range(edits):
+        operation, index = rng.random(), rng.randrange(len(edited) + 1)
+        if operation < 0.4 and index < len(edited): del edited[index]
+        elif operation < 0.8: edited.insert(index, f"new{rng.randrange(50)}")
+        elif index < len(edited): edited[index] = "the"
+    return edited
+
+
+def _check_diff(a, b, what):
+    blocks = matching_blocks(a, b)
+    expect_equal(blocks[-1], (len(a), len(b), 0), f"{what}: final block")
+    i_end = j_end = 0
+    for i, j, size in blocks[:-1]:
+        expect(size > 0 and i >= i_end and j >= j_end and a[i:i + size] == b[j:j + size],
+               f"{what}: block {(i, j, size)} does not match in order")
+        i_end, j_end = i + size, j + size
+    expect_equal(sum(size for _, _, size in blocks), _lcs_length(a, b), f"{what}: matched elements (LCS length)")
+    rebuilt, i_end, j_end = [], 0, 0
+    for tag, i1, i2, j1, j2 in diff_opcodes(a, b):
+        expect((i1, j1) == (i_end, j_end), f"{what}: opcodes are not contiguous at {(tag, i1, i2, j1, j2)}")
+        rebuilt.extend(a[i1:i2] if tag == "equal" else b[j1:j2])
+        i_end, j_end = i2, j2
+    expect(rebuilt == b and (i_end, j_end) == (len(a), len(b)), f"{what}: opcodes do not turn a into b")
+
+
+@register_check("sequence_diff", "matching_blocks finds a longest common subsequence; diff_opcodes turns a into b")
+def check_sequence_diff(work_dir):
+    rng = random.Random(1025)
+    for a, b in (([], []), ([], list("ab")), (list("abc"), []), (list("abc"), list("abc")), (list("abc"), list("xyz"))):
+        _check_diff(a, b, f"{a!r} -> {b!r}")
+    for case in range(200):  # Short sequences over a small alphabet: many repeats, pure Myers
+        a = [rng.choice("abcd") for _ in range(rng.randrange(40))]
+        b = [rng.choice("abcd") for _ in range(rng.randrange(40))] if case % 2 else _edited(rng, a, rng.randrange(1, 8))
+        _check_diff(a, b, f"short case {case}")
+    for case in range(6):  # Token streams long enough to be split at unique anchors first
+        a = [rng.choice(("the", "of", "a", "and")) if rng.random() < 0.4 else f"word{rng.randrange(2000)}"
+             for _ in range(rng.randrange(ANCHOR_MIN_LENGTH // 2 + 50, ANCHOR_MIN_LENGTH + 200))]
+        _check_diff(a, _edited(rng, a, rng.randrange(1, 40)), f"long case {case}")
+    for case in range(200):
+        a = [rng.choice("abc") for _ in range(rng.randrange(8))]
+        b = [rng.choice("abc") for _ in range(rng.randrange(12))]
+        expect_equal(is_subsequence(a, b), _lcs_length(a, b) == len(a), f"is_subsequence({a!r}, {b!r})")
+
+
+# --- Rendered MDX text ---
+# (MDX source, the text a reader sees on the built page with whitespace runs collapsed)
+MDX_TEXT_CASES = [
+    ("# Heading {#h1}\n\nSome *emphasis*, __strong__ and ~~struck~~ text.\n",
+     "Heading Some emphasis, strong and struck text."),
+    ("snake_case_word and 2*3*4\n", "snake_case_word and 234"),
+    ('A [link](/docs/x "title"), ![image](a.png) and `code_span` here.\n', "A link, and code_span here."),
+    ("- item one\n- item **two**\n\n1. first\n> quoted\n\n***\nafter break\n",
+     "item one item two first quoted after break"),
+    ("| A | B |\n|---|:-:|\n| 1 | 2 |\n", "A B 1 2"),
+    ("```js\nconst a = <b>;\n```\nAfter &amp; &#169; \\* escaped.\n", "const a = <b>; After & © * escaped."),
+    ('<div className="guid">word<br/>next</div>{/* comment */}{value}\n', "word next"),
+    ('Text with <InLink href="/docs/a">inline link</InLink>, and <OutLink href="https://x">outside</OutLink>.\n',
+     "Text with inline link, and outside."),
+    ('<Mandatory /> label<Unique /><SeeAlso><InLink href="/docs/a">target</InLink></SeeAlso>\n',
+     "✽ label1 See also: target"),
+    ('<Figure src="/img/x.png" caption="A caption" />\n<ExampleTable entries={[{a: "hidden"}]} />\nAfter\n',
+     "A caption After"),
+    ("import InLink from '@site/src/components/global/InLink';\nimport X from 'y';\n\n"
+     "export const meta = {\n  a: 1,\n};\n\nBody mentions import here\nimport inside a paragraph\n",
+     "Body mentions import here import inside a paragraph"),
+    ("---\nid: '1025'\nRDF:\n  definition: Relates a manifestation to its extent.\n  domain: Manifestation\n"
+     "  type: DatatypeProperty\n---\n<ElementReference frontMatter={frontMatter} />\n\n## Stipulations\n",
+     "Definition Relates a manifestation to its extent. Scope note Domain Manifestation Range URI "
+     "Type DatatypeProperty Stipulations"),
+    ("---\nid: '1025'\ndeprecated: true\nRDF:\n  definition: Old.\n  type: Class\n---\n"
+     "<ElementReference frontMatter={frontMatter} />\n",
+     "DEPRECATED. Definition Old. Scope note Domain Range URI https://www.iflastandards.info/ISBDM/elements/C1025 "
+     "Type Class Status Published Deprecated Yes"),
+]
+
+
+@register_check("mdx_text", "MdxTextScanner renders the text a reader sees for the converter's MDX vocabulary")
+def check_mdx_text(work_dir):
+    for source, expected in MDX_TEXT_CASES:
+        expect_equal(" ".join(render_mdx_text(source).split()), expected, f"rendered text of {source!r}")
+
+
+# --- Link index ---
+DOCS_FIXTURE = {
+    "attributes/1022.mdx": "---\nid: '1022'\n---\n## Local heading {#stip}\n",
+    "relationships/nomens/1260.mdx": "---\nid: '1260'\nslug: /relationships/1260\n---\nText\n",
+    "relationships/agents/index.mdx": "---\nid: index\n---\n# Related agent entities\n",
+    "ses/Nomen/ISBDMSES1117.mdx": "---\nid: 1117\nslug: /ves/ISBDMSES1117\n---\nText\n",
+    "ses/Display/order.mdx": "---\nslug: ISBDMOrder\n---\nText\n",
+    "about/index.mdx": "---\nid: index\n---\nimport X from 'y';\n\n## Application {#abApp}\n\n## Status {#abStat}\n",
+    "intro/_i001.mdx": "## Entities related to manifestation\n",
+    "notes/broken.mdx": "---\nslug: [unclosed\n---\nText\n",
+}
+
+
+@register_check("link_index", "LinkIndex knows MDX docs by path, slug, id, index directory and merged pages")
+def check_link_index(work_dir):
+    for rel_path, text in DOCS_FIXTURE.items():
+        path = os.path.join(work_dir, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_text_atomic(path, text)
+    link_index = LinkIndex().add_docs_under(work_dir, [".mdx"])
+    resolved = ["attributes/1022", "relationships/1260", "relationships/nomens/1260", "relationships/agents",
+                "ves/ISBDMSES1117", "ses/Nomen/1117", "ses/Display/ISBDMOrder", "about", "about/abApp",
+                "about/abStat", "intro/i001", "notes/broken"]
+    unresolved = ["attributes/stip", "about/y", "ves/1285", "relationships/1261", "intro/i002"]
+    expect_equal([doc_id for doc_id in resolved if doc_id not in link_index.doc_ids], [], "docs not known")
+    expect_equal([doc_id for doc_id in unresolved if doc_id in link_index.doc_ids], [], "nonexistent docs known")
+    expect_equal(link_index.check("ves/index.html", resolved + unresolved), len(unresolved), "unresolved links")
+    expect_equal(sorted(link_index.unresolved), sorted(unresolved), "unresolved link targets")
+
+
+def run_checks(names):
+    """{name: None, or the failure message} for the named checks, in registration order."""
+    failures = {}
+    for name in CHECKS:
+        if name not in names: continue
+        description, check = CHECKS[name]
+        with tempfile.TemporaryDirectory(prefix="isbdm_check_") as work_dir:
+            try:
+                check(work_dir)
+            except CheckFailed as e:
+                failures[name] = str(e)
+            except Exception:
+                failures[name] = traceback.format_exc().rstrip()
+            else:
+                failures[name] = None
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the regression checks of the shared tooling modules (sidebar graph, front-matter "
+                    "patching, sequence diff, MDX text scanner, link index, ...) over small fixtures.")
+    parser.add_argument("--checks", nargs="+", choices=list(CHECKS), default=list(CHECKS),
+                        help="Checks to run, in registration order (default: all).")
+    parser.add_argument("--list", action="store_true", help="List the checks and exit.")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (description, _) in CHECKS.items(): print(f"{name}: {description}")
+        return
+    logging.basicConfig(level=logging.ERROR, format='%(levelname)s: %(message)s')  # The modules log per file
+    results = run_checks(args.checks)
+    for name, failure in results.items():
+        print(f"ok    {name}" if failure is None else f"FAIL  {name}: {failure}")
+    failed = [name for name, failure in results.items() if failure is not None]
+    print(f"\n{len(results) - len(failed)} passed, {len(failed)} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
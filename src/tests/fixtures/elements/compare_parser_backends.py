@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import argparse
+import difflib
+import logging
+
+import scripts_path  # noqa: F401
+from html_document_store import DEFAULT_PARSER, HtmlDocumentStore, available_parsers
+
+from html_to_mdx_v2 import _CollectingHandler, convert_html_to_mdx, get_output_paths
+
+DEFAULT_SOURCE_DIR = "ISBDM/docs"
+
+
+def find_html_files(source_dir):
+    html_files = []
+    for root, _, files in os.walk(source_dir):
+        for filename in files:
+            if filename.lower().endswith(".html"): html_files.append(os.path.join(root, filename))
+    return sorted(html_files)
+
+
+def convert_corpus(html_files, abs_source_dir, parser):
+    """
+    Converts every page in memory with one tree builder.
+    Returns ({path: (mdx_output, log_records)}, elapsed seconds).
+    """
+    store = HtmlDocumentStore(parser)
+    collector = _CollectingHandler()
+    logger = logging.getLogger(f"{__name__}.{parser}")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.handlers = [collector]
+    results = {}
+    started = time.perf_counter()
+    for html_file_path in html_files:
+        collector.records = []
+        html_subdirectory, _ = get_output_paths(html_file_path, abs_source_dir, "")
+        document = store.get(html_file_path)
+        try:
+            mdx_output = convert_html_to_mdx(document.html, os.path.basename(html_file_path), logger,
+                                             html_subdirectory, document=document)
+        except Exception as e:
+            mdx_output = f"<conversion failed: {e!r}>"
+        document.release_tree()
+        results[html_file_path] = (mdx_output, collector.records)
+    return results, time.perf_counter() - started
+
+
+def report_difference(html_file_path, reference_parser, reference, candidate_parser, candidate, context_lines):
+    print(f"\nDIFFERS: {html_file_path}")
+    if reference[0] != candidate[0]:
+        diff = difflib.unified_diff(reference[0].splitlines(), candidate[0].splitlines(), reference_parser,
+                                    candidate_parser, n=context_lines, lineterm="")
+        for line in diff: print(f"  {line[:300]}")
+    if reference[1] != candidate[1]:
+        print(f"  Log records differ: {len(reference[1])} with {reference_parser}, {len(candidate[1])} with {candidate_parser}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert every HTML page with each parser backend and check that the MDX output "
+                    "(and the warnings logged) are byte-identical to the html.parser reference.")
+    parser.add_argument("source_dir", nargs="?", default=DEFAULT_SOURCE_DIR, help="Directory of ISBDM HTML pages.")
+    parser.add_argument("--parsers", nargs="+", default=None, choices=available_parsers(),
+                        help="Backends to compare against html.parser (default: every installed one).")
+    parser.add_argument("--context", type=int, default=1, help="Context lines in the reported diffs.")
+    args = parser.parse_args()
+
+    abs_source_dir = os.path.abspath(args.source_dir)
+    if not os.path.isdir(abs_source_dir):
+        print(f"Error: source directory not found: {abs_source_dir}")
+        sys.exit(2)
+    html_files = find_html_files(abs_source_dir)
+    candidates = [p for p in (args.parsers or available_parsers()) if p != DEFAULT_PARSER]
+    if not candidates:
+        print("No alternative parser backend is installed; nothing to compare.")
+        return
+
+    reference, reference_seconds = convert_corpus(html_files, abs_source_dir, DEFAULT_PARSER)
+    print(f"{DEFAULT_PARSER}: converted {len(html_files)} pages in {reference_seconds:.2f}s (reference)")
+
+    all_identical = True
+    for candidate_parser in candidates:
+        results, seconds = convert_corpus(html_files, abs_source_dir, candidate_parser)
+        differing = [p for p in html_files if results[p] != reference[p]]
+        for html_file_path in differing:
+            report_difference(html_file_path, DEFAULT_PARSER, reference[html_file_path], candidate_parser,
+                              results[html_file_path], args.context)
+        print(f"\n{candidate_parser}: converted {len(html_files)} pages in {seconds:.2f}s "
+              f"({reference_seconds / seconds if seconds else 0:.2f}x); "
+              f"{len(html_files) - len(differing)} identical, {len(differing)} differ")
+        all_identical = all_identical and not differing
+
+    print("\nAll backends produce byte-identical output." if all_identical
+          else "\nNot identical: keep html.parser for production conversions.")
+    sys.exit(0 if all_identical else 1)
+
+
+if __name__ == "__main__":
+    main()
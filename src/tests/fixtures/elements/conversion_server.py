@@ -0,0 +1,306 @@
+"""
+Resident conversion server speaking JSON lines.
+
+Every run of the converter, the front-matter tools or the verifier pays interpreter startup, the bs4/yaml/
+soupsieve imports and a nav-map rebuild before it does any work. This server pays that once and then answers
+one request per line, so the JS tooling and the Docusaurus dev server can call the tools per file:
+
+    {"id": 1, "op": "convert", "path": "ISBDM/docs/attributes/1022.html"}
+    {"id": 1, "ok": true, "result": {"mdx_file_path": "...", "records": [...], ...}, "ms": 31.2}
+
+Operations (paths as the CLIs take them, absolute or relative to the working directory):
+- convert {path, force?}: converts one HTML page under --source_dir into --dest_dir, skipping it when the
+  incremental manifest says its output is current (unless force), and reports unresolved links.
+- frontmatter {path, dry_run?}: runs the front-matter pipeline transforms over one MDX/Markdown file under
+  --target_mdx_root. The nav map is rebuilt first when a nav source page changed since it was built.
+- verify {path, mdx_path?, strict?}: verifies one HTML page against its MDX (by default the converter's
+  output path), as verify_mdx_conversion.py --batch does.
+- ping, stats, reload (rebuild the nav map and link index), shutdown.
+
+Errors come back as {"id": ..., "ok": false, "error": "..."}. Requests are handled one at a time; with --socket,
+connections are served one after another. Logging goes to --log_file or stderr, never to the protocol stream.
+"""
+import os
+import sys
+import json
+import time
+import socketserver
+import argparse
+import logging
+
+import scripts_path  # noqa: F401
+import html_to_mdx_v2 as converter
+import verify_mdx_conversion as verifier
+import frontmatter_pipeline as pipeline
+import generate_sidebar_frontmatter as sidebar_frontmatter
+from html_document_store import DEFAULT_PARSER, available_parsers, get_default_store
+from link_index import doc_id_for_path, get_default_link_index
+
+DEFAULT_SOURCE_DIR = "ISBDM/docs"
+DEFAULT_DEST_DIR = "docs"
+
+logger = logging.getLogger("conversion_server")
+
+
+class ServerError(Exception):
+    """A request the server understood but cannot carry out; reported to the client as is."""
+
+
+class _RecordingHandler(logging.Handler):
+    """Collects the log records emitted while one request is handled."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(format_record(record.levelno, record.getMessage()))
+
+
+def format_record(level, message):
+    return {"level": logging.getLevelName(level), "message": message}
+
+
+def _under(path, root):
+    return path == root or path.startswith(root + os.sep)
+
+
+class ConversionServer:
+    """The warm state (document store, link index, nav map, manifest) and the operations over it."""
+
+    def __init__(self, source_dir, dest_dir, target_mdx_root, parser=DEFAULT_PARSER, nav_cache_path=None,
+                 use_nav_cache=True, transforms=None, patch=False):
+        self.source_dir = os.path.abspath(source_dir)
+        self.dest_dir = os.path.abspath(dest_dir)
+        self.target_mdx_root = os.path.abspath(target_mdx_root)
+        self.parser = parser
+        self.patch = patch
+        self.transform_names = transforms or list(pipeline.TRANSFORM_FACTORIES)
+        self.started = time.time()
+        self.counts = {}
+        self.store = get_default_store(parser)
+        self.link_index = get_default_link_index()
+        self.manifest = converter.ConversionManifest(os.path.join(self.dest_dir, converter.DEFAULT_MANIFEST_FILENAME),
+                                                     converter.get_converter_fingerprint(parser))
+        self.nav_cache = None
+        if use_nav_cache:
+            self.nav_cache = sidebar_frontmatter.NavCache(
+                nav_cache_path or os.path.join(self.target_mdx_root, sidebar_frontmatter.DEFAULT_NAV_CACHE_FILENAME))
+        self.transforms = []
+        self.master_nav_item_map = None
+        self.nav_signatures = {}
+        self.shutdown_requested = False
+        self.operations = {"convert": self.convert, "frontmatter": self.frontmatter, "verify": self.verify,
+                           "ping": self.ping, "stats": self.stats, "reload": self.reload, "shutdown": self.shutdown}
+        self.manifest.load(logger)
+        if self.nav_cache is not None: self.nav_cache.load()
+        self.reload({})
+
+    # --- Warm state ---
+    def _nav_source_signatures(self):
+        signatures = {}
+        for source in sidebar_frontmatter.iter_nav_sources(self.source_dir):
+            try:
+                stat = os.stat(source.html_file_path)
+            except OSError:
+                continue
+            signatures[source.html_file_path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def _build_transforms(self):
+        context = pipeline.PipelineContext(self.source_dir, self.target_mdx_root, self.nav_cache)
+        self.transforms = [factory(context) for name, factory in pipeline.TRANSFORM_FACTORIES.items()
+                           if name in self.transform_names]
+        if self.nav_cache is not None and context.master_nav_item_map is not None: self.nav_cache.save()
+        self.nav_signatures = self._nav_source_signatures()
+        self.master_nav_item_map = context.master_nav_item_map
+
+    def _refresh_nav(self):
+        """Rebuilds the nav map if a nav source page changed; the nav cache re-parses only the changed ones."""
+        if self._nav_source_signatures() != self.nav_signatures:
+            logger.info("Nav sources changed; rebuilding the nav map")
+            self._build_transforms()
+
+    def reload(self, request):
+        self.link_index.doc_ids.clear()
+        self.link_index.add_docs_under(self.source_dir, [".html"])
+        self._build_transforms()
+        return {"nav_items": len(self.master_nav_item_map or {}), "doc_ids": len(self.link_index.doc_ids)}
+
+    # --- Operations ---
+    @staticmethod
+    def _path(request, key="path"):
+        path = request.get(key)
+        if not isinstance(path, str) or not path: raise ServerError(f"'{key}' must be a non-empty string")
+        return os.path.abspath(path)
+
+    def _html_path(self, request):
+        html_file_path = self._path(request)
+        if not _under(html_file_path, self.source_dir) or not html_file_path.lower().endswith(".html"):
+            raise ServerError(f"Not an HTML file under {self.source_dir}: {html_file_path}")
+        if not os.path.isfile(html_file_path): raise ServerError(f"HTML file not found: {html_file_path}")
+        return html_file_path
+
+    def convert(self, request):
+        html_file_path = self._html_path(request)
+        rel_html_path = os.path.relpath(html_file_path, self.source_dir).replace(os.sep, '/')
+        _, mdx_file_path = converter.get_output_paths(html_file_path, self.source_dir, self.dest_dir)
+        entry = None if request.get("force") else self.manifest.lookup(rel_html_path, html_file_path, mdx_file_path)
+        if entry:
+            result = {"html_file_path": html_file_path, "mdx_file_path": mdx_file_path, "error": None, "cached": True,
+                      "records": entry.get("records", []), "links": entry.get("links", [])}
+        else:
+            self.link_index.doc_ids.add(doc_id_for_path(html_file_path, self.source_dir))
+            # Parses the page once for both: the converter reuses this tree, and a following verify reuses the
+            # memoized div text after the converter has released the tree
+            self.store.get(html_file_path).select_text(verifier.DEFAULT_SELECTOR)
+            result = converter.convert_file((html_file_path, self.source_dir, self.dest_dir, self.parser, False))
+        converted = converter.report_conversion_result(logger, result, rel_html_path, self.manifest)
+        if converted and not entry: self.manifest.save()
+        if result["error"]: raise ServerError(f"Failed to convert {html_file_path}:\n{result['error']}")
+        return {"mdx_file_path": mdx_file_path, "cached": bool(entry),
+                "records": [format_record(level, message) for level, message in result["records"]],
+                "unresolved_links": [doc_id for doc_id in result["links"] if doc_id not in self.link_index.doc_ids]}
+
+    def frontmatter(self, request):
+        mdx_file_path = self._path(request)
+        if not _under(mdx_file_path, self.target_mdx_root) or not mdx_file_path.endswith(pipeline.DOC_SUFFIXES):
+            raise ServerError(f"Not an MDX/Markdown file under {self.target_mdx_root}: {mdx_file_path}")
+        if not os.path.isfile(mdx_file_path): raise ServerError(f"File not found: {mdx_file_path}")
+        self._refresh_nav()
+        recorder = _RecordingHandler()
+        root_logger = logging.getLogger()
+        root_logger.addHandler(recorder)
+        try:
+            status = pipeline.process_document(mdx_file_path, self.transforms, bool(request.get("dry_run")), None,
+                                               self.target_mdx_root, self.patch)
+        finally:
+            root_logger.removeHandler(recorder)
+        return {"status": status, "records": recorder.records}
+
+    def verify(self, request):
+        html_file_path = self._html_path(request)
+        if request.get("mdx_path"):
+            mdx_file_path = self._path(request, "mdx_path")
+        else:
+            _, mdx_file_path = converter.get_output_paths(html_file_path, self.source_dir, self.dest_dir)
+        return verifier.verify_file((html_file_path, mdx_file_path, 'selector', verifier.DEFAULT_SELECTOR,
+                                     bool(request.get("strict"))))
+
+    def ping(self, request):
+        return {"pid": os.getpid(), "uptime": round(time.time() - self.started, 3)}
+
+    def stats(self, request):
+        return {"requests": dict(self.counts), "documents": len(self.store),
+                "nav_items": len(self.master_nav_item_map or {}), "doc_ids": len(self.link_index.doc_ids),
+                "manifest_entries": len(self.manifest.entries)}
+
+    def shutdown(self, request):
+        self.shutdown_requested = True
+        return {}
+
+    # --- Protocol ---
+    def handle_line(self, line):
+        """One JSON request line in, one JSON response line out (without the newline)."""
+        started = time.perf_counter()
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict): raise ServerError("A request must be a JSON object")
+            request_id = request.get("id")
+            op = request.get("op")
+            operation = self.operations.get(op)
+            if operation is None: raise ServerError(f"Unknown op {op!r}; expected one of {', '.join(self.operations)}")
+            self.counts[op] = self.counts.get(op, 0) + 1
+            response = {"id": request_id, "ok": True, "result": operation(request)}
+        except ServerError as e:
+            response = {"id": request_id, "ok": False, "error": str(e)}
+        except ValueError as e:
+            response = {"id": request_id, "ok": False, "error": f"Invalid JSON: {e}"}
+        except Exception as e:
+            logger.error(f"Unhandled error for request {line.strip()[:200]}", exc_info=True)
+            response = {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        response["ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return json.dumps(response, ensure_ascii=False)
+
+    def serve_stream(self, reader, writer):
+        """Answers request lines from reader until EOF or a shutdown request."""
+        for line in reader:
+            if not line.strip(): continue
+            writer.write(self.handle_line(line) + "\n")
+            writer.flush()
+            if self.shutdown_requested: return
+
+
+def serve_socket(server, socket_path):
+    """Serves the protocol on a Unix socket, one connection at a time, until a shutdown request."""
+    if os.path.exists(socket_path): os.remove(socket_path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            reader = (line.decode('utf-8') for line in self.rfile)
+            writer = _SocketWriter(self.wfile)
+            server.serve_stream(reader, writer)
+
+    with socketserver.UnixStreamServer(socket_path, Handler) as unix_server:
+        logger.info(f"Listening on {socket_path}")
+        try:
+            while not server.shutdown_requested: unix_server.handle_request()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+class _SocketWriter:
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        self.wfile.write(text.encode('utf-8'))
+
+    def flush(self):
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Keep the converter, front-matter pipeline and verifier loaded and answer JSON-lines requests "
+                    "on stdin/stdout or a Unix socket.")
+    parser.add_argument("--source_dir", default=DEFAULT_SOURCE_DIR, help="HTML source directory (the converter's source_dir).")
+    parser.add_argument("--dest_dir", default=DEFAULT_DEST_DIR, help="MDX output directory (the converter's dest_dir).")
+    parser.add_argument("--target_mdx_root", help="MDX tree the front-matter transforms run on (default: --dest_dir).")
+    parser.add_argument("--parser", default=DEFAULT_PARSER, choices=available_parsers(),
+                        help="Tree builder for the pages (see html_to_mdx_v2.py --parser).")
+    parser.add_argument("--transforms", nargs="+", choices=list(pipeline.TRANSFORM_FACTORIES),
+                        default=list(pipeline.TRANSFORM_FACTORIES), help="Front-matter transforms to run. Default: all.")
+    parser.add_argument("--nav_cache",
+                        help=f"NavItem cache path (default: <target_mdx_root>/{sidebar_frontmatter.DEFAULT_NAV_CACHE_FILENAME}).")
+    parser.add_argument("--no_nav_cache", action="store_true", help="Parse every nav source HTML; neither read nor write the cache.")
+    parser.add_argument("--patch_front_matter", action="store_true",
+                        help="Rewrite only the lines of the keys the transforms manage (see frontmatter_pipeline.py).")
+    parser.add_argument("--socket", help="Serve on this Unix socket path instead of stdin/stdout.")
+    parser.add_argument("--log_file", help="Log file (default: stderr).")
+    parser.add_argument("--log_level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
+    args = parser.parse_args()
+    log_handler = logging.FileHandler(args.log_file, encoding='utf-8') if args.log_file else logging.StreamHandler(sys.stderr)
+    logging.basicConfig(level=getattr(logging, args.log_level), format="%(asctime)s [%(levelname)s] %(message)s",
+                        handlers=[log_handler])
+
+    started = time.perf_counter()
+    server = ConversionServer(args.source_dir, args.dest_dir, args.target_mdx_root or args.dest_dir, args.parser,
+                              os.path.abspath(args.nav_cache) if args.nav_cache else None, not args.no_nav_cache,
+                              args.transforms, args.patch_front_matter)
+    logger.info(f"Ready in {(time.perf_counter() - started) * 1000:.0f} ms: {len(server.master_nav_item_map or {})} "
+                f"NavItems, {len(server.link_index.doc_ids)} known documents")
+    if args.socket:
+        serve_socket(server, args.socket)
+    else:
+        try:
+            server.serve_stream(sys.stdin, sys.stdout)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
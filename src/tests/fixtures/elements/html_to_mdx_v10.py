@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 import os
 import re
+import sys
 import yaml # PyYAML
-from bs4 import BeautifulSoup
 import argparse
 import logging
 from collections import defaultdict # Not strictly used in this version, but good for complex grouping
 import shutil
 
+import scripts_path  # noqa: F401
+from html_document_store import get_default_store
+from nav_tree import build_nav_tree
+
 # --- Configuration Constants ---
 DEFAULT_SOURCE_HTML_ROOT = "ISBDM/docs/"
 DEFAULT_TARGET_MDX_ROOT = "docs/"
@@ -174,26 +178,20 @@ def parse_html_sidebar_nav(html_file_path,
                            children_absolute_base_level): # The absolute level for 0-indent items in this HTML
     nav_items = []
     try:
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f.read(), 'html.parser')
+        nav_blocks = get_default_store().get(html_file_path).nav_blocks
     except FileNotFoundError:
         logging.error(f"HTML file not found: {html_file_path}")
         return nav_items
 
-    nav_container_candidates = soup.select('div.col-md-5 nav.navISBDMSection, div.col-md-6 nav.navISBDMSection, div.col-md-12 nav.navISBDMSection, nav.navISBDMSection')
-    
     item_position_counter = 0
-    for nav_container in nav_container_candidates:
-        link_divs = nav_container.find_all('div', class_='d-flex', recursive=False)
-        for div in link_divs:
-            link_tag = div.find('a', href=True)
-            if link_tag:
+    for nav_rows in nav_blocks:
+        for nav_row in nav_rows:
+            if nav_row.href is not None:
                 item_position_counter += 1
-                href = link_tag.get('href', '').strip()
-                label = normalize_text(link_tag.get_text())
+                href = nav_row.href
+                label = normalize_text(nav_row.label)
                 
-                indent_icons = div.find_all('i', class_='bi-arrow-return-right')
-                local_indent_depth = len(indent_icons) # 0 for no icons, 1 for one icon...
+                local_indent_depth = nav_row.indent_depth # 0 for no icons, 1 for one icon...
                 
                 # Absolute level combines base for this HTML's children + local indent
                 absolute_level = children_absolute_base_level + local_indent_depth
@@ -215,21 +213,17 @@ def parse_html_sidebar_nav(html_file_path,
     return nav_items
 
 def determine_hierarchy_properties(section_nav_items: list[NavItem]):
-    # ... (This function remains largely the same as in the previous complete Python script)
     # It operates on the .html_level which is now absolute.
-    if not section_nav_items: return
-
-    # Pass 1: Determine is_last_sibling for all items
-    for i, current_item in enumerate(section_nav_items):
-        current_item.is_last_sibling = True 
-        for j in range(i + 1, len(section_nav_items)):
-            next_item = section_nav_items[j]
-            if next_item.html_level == current_item.html_level:
-                current_item.is_last_sibling = False; break
-            if next_item.html_level < current_item.html_level:
-                break
+    # Returns the section's parent/children NavTree (see scripts/nav_tree.py), or None for an empty section.
+    if not section_nav_items: return None
+
+    # Pass 1: is_last_sibling and has_children_in_html, from a single-pass parent/children tree
+    nav_tree = build_nav_tree(section_nav_items, lambda item: item.html_level)
+    for node in nav_tree.nodes:
+        node.item.is_last_sibling = node.is_last_sibling
+        node.item.has_children_in_html = node.has_children
     
-    # Pass 2: Determine ancestor_is_last_flags and has_children_in_html
+    # Pass 2: Determine ancestor_is_last_flags (level-slot stack, one pass)
     parent_is_last_at_level_stack = [] 
     for i, item in enumerate(section_nav_items):
         while len(parent_is_last_at_level_stack) >= item.html_level:
@@ -239,10 +233,7 @@ def determine_hierarchy_properties(section_nav_items: list[NavItem]):
              parent_is_last_at_level_stack.append(item.is_last_sibling)
         else: 
              parent_is_last_at_level_stack[item.html_level -1] = item.is_last_sibling
-        
-        # Determine if item has children in this HTML structure
-        if i + 1 < len(section_nav_items) and section_nav_items[i+1].html_level > item.html_level:
-            item.has_children_in_html = True
+    return nav_tree
 
 def generate_sidebar_prefix(nav_item: NavItem):
     # ... (This function remains the same, uses absolute nav_item.html_level)
@@ -315,51 +306,44 @@ def cache_all_html_sidebar_structures(source_html_root_abs):
 
     return cached_structures
 
-def get_mdx_nav_item_from_cache(mdx_file_path_abs, target_mdx_root_abs, cached_structures):
-    # ... (same as before, but ensure mdx_key_full correctly identifies section for lookup)
+def build_nav_item_index(cached_structures):
+    """
+    Flattens cached_structures into a single normalized_key -> NavItem dict so MDX lookups are O(1)
+    and do not depend on guessing the section from the MDX path.
+    A key listed by more than one section is a conflict: the item from the section named by the key's
+    first path segment wins (e.g. "ves/1240" resolves to the "ves" section), otherwise the first section
+    in SECTION_CONFIG order. Returns (index, conflicts), conflicts mapping key -> list of section keys.
+    """
+    nav_item_index = {}
+    owner_section_by_key = {}
+    conflicts = {}
+    for section_key, nav_items in cached_structures.items():
+        for nav_item in nav_items:
+            key = nav_item.normalized_key
+            owner_section = owner_section_by_key.get(key)
+            if owner_section is None:
+                nav_item_index[key] = nav_item
+                owner_section_by_key[key] = section_key
+                continue
+            conflicts.setdefault(key, [owner_section]).append(section_key)
+            home_section = key.split('/')[0]
+            if section_key == home_section and owner_section != home_section:
+                nav_item_index[key] = nav_item
+                owner_section_by_key[key] = section_key
+    for key, section_keys in conflicts.items():
+        logging.warning(f"Nav key conflict: '{key}' is listed by sections {section_keys}; "
+                        f"using the item from '{owner_section_by_key[key]}'.")
+    logging.info(f"Indexed {len(nav_item_index)} NavItems ({len(conflicts)} conflicting key(s)).")
+    return nav_item_index, conflicts
+
+def get_mdx_nav_item_from_cache(mdx_file_path_abs, target_mdx_root_abs, nav_item_index):
     mdx_key_full = normalize_mdx_path_to_key(mdx_file_path_abs, target_mdx_root_abs)
-    parts = mdx_key_full.split('/')
-    
-    # Determine section_key from mdx_key_full
-    # If mdx_key_full is "elements/statements/index", section_key should be "statements"
-    # If mdx_key_full is "elements/index", section_key should be "elements"
-    # If mdx_key_full is "intro/index", section_key should be "intro"
-    # If mdx_key_full is "index", section_key should be "root_index" (as defined in SECTION_CONFIG)
-
-    section_key_from_mdx = ""
-    if mdx_key_full == "index":
-        section_key_from_mdx = "root_index"
-    elif len(parts) == 1: # e.g. "somefile" (if docs/somefile.mdx exists, unlikely for sections)
-        section_key_from_mdx = parts[0] # This would need its own SECTION_CONFIG entry
-    elif len(parts) > 1:
-        # Is docs/elements/index.mdx (key "elements/index") part of "elements" section NavItems
-        # or is docs/elements/statements/index.mdx (key "elements/statements/index") part of "statements"?
-        # The NavItems are cached under their final MDX section key.
-        # So, if MDX is docs/attributes/1022.mdx -> key "attributes/1022" -> lookup in cached_structures["attributes"]
-        # If MDX is docs/ses/index.mdx -> key "ses/index" -> lookup in cached_structures["ses"]
-        section_key_from_mdx = parts[0] # General assumption, might need refinement if sub-sub-sections exist as keys
-        if section_key_from_mdx in cached_structures:
-            pass # Good
-        elif len(parts) > 1 and "/".join(parts[:2]) in cached_structures: # e.g. "elements/statements"
-            section_key_from_mdx = "/".join(parts[:2])
-        # This needs to be robust: map MDX path to the key used in SECTION_CONFIG and thus cached_structures.
-        # For now, assume simple top-level directory name matches section_key
-        if section_key_from_mdx == "docs": # should not happen with relpath
-             section_key_from_mdx = "root_index"
-
-
-    nav_item_list = cached_structures.get(section_key_from_mdx)
-    if not nav_item_list:
-        logging.debug(f"No cached HTML structure for inferred section key '{section_key_from_mdx}' (from MDX: {mdx_file_path_abs}). Keys available: {list(cached_structures.keys())}")
+    nav_item = nav_item_index.get(mdx_key_full)
+    if nav_item is None:
+        logging.debug(f"No NavItem for MDX key '{mdx_key_full}' in the nav item index.")
         return None
-
-    for nav_item in nav_item_list:
-        if nav_item.normalized_key == mdx_key_full:
-            nav_item.mdx_path = mdx_file_path_abs 
-            return nav_item
-            
-    logging.debug(f"No NavItem for MDX key '{mdx_key_full}' in section '{section_key_from_mdx}' structure after checking {len(nav_item_list)} items.")
-    return None
+    nav_item.mdx_path = mdx_file_path_abs
+    return nav_item
 
 # --- Front Matter Read/Write (same as before) ---
 def read_front_matter(mdx_file_path): # ... (same)
@@ -391,10 +375,10 @@ def write_front_matter(mdx_file_path, front_matter_dict, body_content, dry_run=F
     except Exception as e: logging.error(f"Error writing FM to {mdx_file_path}: {e}")
 
 
-def process_single_mdx_file(mdx_file_path_abs, target_mdx_root_abs, main_category_files_abs_normalized, cached_structures, dry_run, dry_run_output_dir):
+def process_single_mdx_file(mdx_file_path_abs, target_mdx_root_abs, main_category_files_abs_normalized, nav_item_index, dry_run, dry_run_output_dir):
     # ... (main logic as before, but use absolute levels from NavItem.html_level for decisions)
     logging.info(f"Processing MDX: {mdx_file_path_abs}")
-    nav_item = get_mdx_nav_item_from_cache(mdx_file_path_abs, target_mdx_root_abs, cached_structures)
+    nav_item = get_mdx_nav_item_from_cache(mdx_file_path_abs, target_mdx_root_abs, nav_item_index)
     existing_fm, body_content = read_front_matter(mdx_file_path_abs)
     
     updated_fm = dict(existing_fm) # Start with existing FM
@@ -490,6 +474,7 @@ def main():
 
     # Pass abs_source_html_root to cache_all_html_sidebar_structures for its internal path joining
     cached_sidebar_data = cache_all_html_sidebar_structures(abs_source_html_root)
+    nav_item_index, _ = build_nav_item_index(cached_sidebar_data)
     # ... (rest of main loop processing MDX files, same as before, passing target_mdx_root_abs to write_front_matter for dry_run) ...
     num_processed, num_skipped = 0, 0
     paths_to_walk = []
@@ -518,7 +503,7 @@ def main():
                         num_processed +=1
                         continue
                     try:
-                        if process_single_mdx_file(mdx_file_path, abs_target_mdx_root, main_category_files_abs_normalized, cached_sidebar_data, args.dry_run, dry_run_output_abs):
+                        if process_single_mdx_file(mdx_file_path, abs_target_mdx_root, main_category_files_abs_normalized, nav_item_index, args.dry_run, dry_run_output_abs):
                             num_processed += 1
                     except Exception as e:
                         logging.error(f"Unhandled error processing {mdx_file_path}: {e}", exc_info=True)
@@ -1,8 +1,122 @@
 import os
 import re
+import sys
 import argparse
+import hashlib
+import json
 import logging
+import time
+import traceback
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.element import PreformattedString
+
+import scripts_path  # noqa: F401
+from file_utils import write_text_atomic
+from fs_watch import PollingWatcher
+from html_document_store import DEFAULT_PARSER, available_parsers, extract_nav_blocks, get_default_store
+from link_index import doc_id_for_path, get_default_link_index
+
+# Bump when a change to the conversion rules should invalidate every cached output.
+# The source of every module in CONVERTER_MODULES is hashed in as well, so edits to them also invalidate the cache.
+CONVERTER_VERSION = "2"
+# Modules whose code shapes the MDX output: this one, link_index for InLink/RDF url rewriting and
+# html_document_store for parsing and the nav rows behind sidebar_position/sidebar_level
+CONVERTER_MODULES = (__name__, "link_index", "html_document_store")
+DEFAULT_MANIFEST_FILENAME = ".html_to_mdx_manifest.json"
+DEFAULT_PROFILE_TOP = 10
+# Tree queries counted while profiling; calls they make to each other are not counted again
+PROFILED_TREE_QUERIES = ("find", "find_all", "findChild", "find_next_sibling", "find_parent", "select", "select_one")
+
+
+# --- Profiling (--profile) ---
+class ConversionProfile:
+    """
+    Wall and CPU time per conversion stage plus event counters, for one file. Stages nest: the handler:* stages
+    run inside block_handlers, and example_tables inside handler:div.stip.
+    """
+
+    def __init__(self):
+        self.stages = {}  # {stage name: [calls, wall seconds, cpu seconds]}
+        self.counters = {}
+
+    def add_stage(self, name, started):
+        entry = self.stages.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += time.perf_counter() - started[0]
+        entry[2] += time.process_time() - started[1]
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self, html_file_path, started):
+        """The file's JSONL record; started is the _stage_begin() of the whole conversion."""
+        return {"type": "file", "html_file_path": html_file_path,
+                "wall_ms": round((time.perf_counter() - started[0]) * 1000, 3),
+                "cpu_ms": round((time.process_time() - started[1]) * 1000, 3),
+                "stages": {name: {"calls": calls, "wall_ms": round(wall * 1000, 3), "cpu_ms": round(cpu * 1000, 3)}
+                           for name, (calls, wall, cpu) in self.stages.items()},
+                "counters": dict(sorted(self.counters.items()))}
+
+
+_active_profile = None
+
+
+def _stage_begin():
+    return (time.perf_counter(), time.process_time()) if _active_profile is not None else None
+
+
+def _stage_end(name, started):
+    if started is not None: _active_profile.add_stage(name, started)
+
+
+def _stage_lap(name, started):
+    """Records the stage begun at started and begins the next one."""
+    if started is None: return None
+    _active_profile.add_stage(name, started)
+    return _stage_begin()
+
+
+def _count(name):
+    if _active_profile is not None: _active_profile.count(name)
+
+
+@contextmanager
+def profiling(profile):
+    """
+    Makes profile the one the conversion stages report to, and counts the PROFILED_TREE_QUERIES made on any tree
+    meanwhile (by wrapping the bs4 Tag methods until the block exits). Does nothing when profile is None.
+    """
+    global _active_profile
+    if profile is None:
+        yield
+        return
+    originals = {name: getattr(Tag, name) for name in PROFILED_TREE_QUERIES}
+    depth = [0]
+
+    def counting(name, method):
+        counter = f"{name}_calls"
+
+        def wrapper(self, *args, **kwargs):
+            if depth[0]: return method(self, *args, **kwargs)
+            profile.count(counter)
+            depth[0] += 1
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                depth[0] -= 1
+
+        return wrapper
+
+    for name, method in originals.items(): setattr(Tag, name, counting(name, method))
+    previous, _active_profile = _active_profile, profile
+    try:
+        yield
+    finally:
+        _active_profile = previous
+        for name, method in originals.items(): setattr(Tag, name, method)
 
 
 # --- Helper Functions ---
@@ -26,16 +140,23 @@ def get_decode_contents_or_empty(element):
     return element.decode_contents() if element and hasattr(element, 'decode_contents') else ""
 
 
-def process_html_fragment_for_mdx(html_fragment_str, logger, html_filename, is_for_seealso_context=False):
-    if not html_fragment_str or not html_fragment_str.strip(): return ""
-    frag_soup = BeautifulSoup(f"<body>{html_fragment_str}</body>", 'html.parser').body
-    if not frag_soup:
-        logger.warning(
-            f"{html_filename}: Failed to parse HTML fragment for internal processing: {html_fragment_str[:100]}")
-        return normalize_text(html_fragment_str)
+def _is_blank_string(node):
+    # Comments, CDATA and the like serialize with their delimiters, so they are never blank.
+    return isinstance(node, NavigableString) and not isinstance(node, PreformattedString) and not node.strip()
+
+
+def render_inline_mdx(element, logger, html_filename, is_for_seealso_context=False):
+    """
+    Renders the children of an already parsed element as MDX inline markup (<InLink>, **bold**, *italic*).
+    Gives the same result as process_html_fragment_for_mdx(element.decode_contents(), ...) without
+    serializing the subtree and parsing it again at every nesting level.
+    """
+    if not element or not hasattr(element, 'contents'): return ""
+    if all(_is_blank_string(item) for item in element.contents): return ""
+    _count("inline_renders")
 
     new_parts = []
-    for item in frag_soup.contents:
+    for item in element.contents:
         if isinstance(item, NavigableString):
             new_parts.append(str(item))
         elif isinstance(item, Tag):
@@ -43,15 +164,12 @@ def process_html_fragment_for_mdx(html_fragment_str, logger, html_filename, is_f
                     ('linkInline' in item.get('class', []) or \
                      (is_for_seealso_context and 'linkMenuElement' in item.get('class', []))):
                 link_text = get_text_or_empty(item)
-                link_href_raw = item.get('href', '').replace('/ISBDM/docs/', '/docs/', 1).replace('.html', '')
-                link_href_for_inlink = link_href_raw[1:] if link_href_raw.startswith('/docs/') else link_href_raw
+                link_href_for_inlink = get_default_link_index().inline_href(item.get('href', ''))
                 new_parts.append(f'<InLink href="{link_href_for_inlink}">{normalize_text(link_text)}</InLink>')
             elif item.name == 'span' and ('bolded' in item.get('class', []) or 'bolder' in item.get('class', [])):
                 new_parts.append(f"**{normalize_text(get_text_or_empty(item))}**")
             elif item.name == 'i' or item.name == 'em':
-                inner_italic_content = item.decode_contents() if item else ""
-                processed_inner_italic = process_html_fragment_for_mdx(inner_italic_content, logger, html_filename,
-                                                                       is_for_seealso_context)
+                processed_inner_italic = render_inline_mdx(item, logger, html_filename, is_for_seealso_context)
                 new_parts.append(
                     f"*{processed_inner_italic}*")  # Normalization of processed_inner_italic happens when its final string is normalized
             elif item.name == 'br':
@@ -68,6 +186,18 @@ def process_html_fragment_for_mdx(html_fragment_str, logger, html_filename, is_f
     return processed_string
 
 
+def process_html_fragment_for_mdx(html_fragment_str, logger, html_filename, is_for_seealso_context=False):
+    """String entry point to render_inline_mdx(), for callers holding serialized HTML rather than a parsed tree."""
+    if not html_fragment_str or not html_fragment_str.strip(): return ""
+    _count("fragments_reparsed")
+    frag_soup = BeautifulSoup(f"<body>{html_fragment_str}</body>", 'html.parser').body
+    if not frag_soup:
+        logger.warning(
+            f"{html_filename}: Failed to parse HTML fragment for internal processing: {html_fragment_str[:100]}")
+        return normalize_text(html_fragment_str)
+    return render_inline_mdx(frag_soup, logger, html_filename, is_for_seealso_context)
+
+
 def format_rdf_sub_elements(element_divs, base_url_prefix):
     sub_elements = []
     if element_divs:
@@ -76,14 +206,7 @@ def format_rdf_sub_elements(element_divs, base_url_prefix):
             links = element_divs.find('div', class_='navISBDMRef').find_all('a', class_='linkMenuElement')
         for a_tag in links:
             label = normalize_text(get_text_or_empty(a_tag))
-            raw_href = a_tag.get('href', '');
-            url = raw_href
-            if raw_href.startswith('/ISBDM/docs/'):
-                url = raw_href.replace('/ISBDM/docs/', '/docs/', 1).replace(".html", "")
-            elif base_url_prefix and raw_href.startswith(base_url_prefix):
-                url = raw_href.replace(base_url_prefix, "/docs", 1).replace(".html", "")
-            elif ".html" in raw_href:
-                url = raw_href.replace(".html", "")
+            url = get_default_link_index().rdf_url(a_tag.get('href', ''), base_url_prefix)
             uri_base = "http://iflastandards.info/ns/isbdm/elements/";
             element_id_from_url = url.split('/')[-1]
             uri_prefix = "P" if element_id_from_url.isdigit() else "C";
@@ -93,6 +216,7 @@ def format_rdf_sub_elements(element_divs, base_url_prefix):
 
 
 def process_example_content_row(ex_part_row_tag, current_table_header_needed_state, logger, html_filename):
+    _count("example_rows")
     lines_to_add = [];
     new_table_header_needed_state = current_table_header_needed_state
     unrecognized_elements_found = False
@@ -113,8 +237,7 @@ def process_example_content_row(ex_part_row_tag, current_table_header_needed_sta
             elif isinstance(c_item, Tag):
                 if c_item.name == 'a' and 'linkInline' in c_item.get('class', []):
                     lc_text = get_text_or_empty(c_item);
-                    lc_href_raw = c_item.get('href', '').replace('/ISBDM/docs/', '/docs/', 1).replace('.html', '')
-                    lc_href_for_inlink = lc_href_raw[1:] if lc_href_raw.startswith('/docs/') else lc_href_raw
+                    lc_href_for_inlink = get_default_link_index().inline_href(c_item.get('href', ''))
                     comment_text_parts.append(f'<InLink href="{lc_href_for_inlink}">{normalize_text(lc_text)}</InLink>')
                 elif c_item.name == 'span' and (
                         'bolded' in c_item.get('class', []) or 'bolder' in c_item.get('class', [])):
@@ -140,33 +263,357 @@ def process_example_content_row(ex_part_row_tag, current_table_header_needed_sta
     return lines_to_add, new_table_header_needed_state, unrecognized_elements_found
 
 
-def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=None):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    mdx_parts = [];
-    unrecognized_elements_log = []
+# --- Main-content Block Handlers ---
+BlockHandler = namedtuple("BlockHandler", ["priority", "name", "handle", "guard"])
+
+
+class ConversionContext:
+    """Per-page state shared by the block handlers: the MDX lines produced so far and the warnings to log."""
+
+    def __init__(self, html_filename, logger, handler_stats=None):
+        self.html_filename = html_filename
+        self.logger = logger
+        self.mdx_parts = []
+        self.unrecognized_elements_log = []
+        self.is_last_element = False  # Set by the caller for the last element of the page's content
+        self.handler_stats = handler_stats  # {handler name: [dispatches, seconds]}, or None to skip timing
+
+
+class BlockHandlerRegistry:
+    """
+    Handlers for the block elements of the main content, keyed by tag name and CSS class.
+
+    Among the handlers registered for an element's tag or for one of its classes, the first one registered whose
+    guard (if any) accepts the element handles it, so registration order is the precedence order. The candidate
+    list is cached per (tag, classes) combination, which makes resolving an element one dictionary lookup.
+    """
+
+    def __init__(self):
+        self._handlers = []
+        self._by_tag = {}
+        self._by_class = {}
+        self._candidates = {}
+
+    def register(self, tag=None, css_class=None, guard=None, name=None):
+        """Decorator registering handle(element, ctx) for elements with the given tag name or CSS class."""
+        if (tag is None) == (css_class is None):
+            raise ValueError("A block handler is registered for exactly one of tag or css_class.")
+
+        def decorator(handle):
+            handler = BlockHandler(len(self._handlers), name or handle.__name__, handle, guard)
+            self._handlers.append(handler)
+            index = self._by_tag if tag is not None else self._by_class
+            index.setdefault(tag if tag is not None else css_class, []).append(handler)
+            self._candidates.clear()
+            return handle
+
+        return decorator
+
+    def candidates(self, element):
+        classes = tuple(element.get('class', []))
+        key = (element.name, classes)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            found = {h.priority: h for h in self._by_tag.get(element.name, [])}
+            for css_class in classes: found.update((h.priority, h) for h in self._by_class.get(css_class, []))
+            candidates = self._candidates[key] = [found[priority] for priority in sorted(found)]
+        return candidates
+
+    def dispatch(self, element, ctx):
+        """Runs the matching handler and returns True, or returns False if no handler takes the element."""
+        for handler in self.candidates(element):
+            if handler.guard is not None and not handler.guard(element): continue
+            profile_started = _stage_begin()
+            if ctx.handler_stats is None:
+                handler.handle(element, ctx)
+                _stage_end(f"handler:{handler.name}", profile_started)
+                return True
+            started = time.perf_counter()
+            handler.handle(element, ctx)
+            _stage_end(f"handler:{handler.name}", profile_started)
+            stats = ctx.handler_stats.setdefault(handler.name, [0, 0.0])
+            stats[0] += 1
+            stats[1] += time.perf_counter() - started
+            return True
+        return False
+
+
+BLOCK_HANDLERS = BlockHandlerRegistry()
+
+
+def merge_handler_stats(total, stats):
+    for name, (count, seconds) in stats.items():
+        entry = total.setdefault(name, [0, 0.0])
+        entry[0] += count
+        entry[1] += seconds
+
+
+def format_handler_stats(stats):
+    """Summary lines, most expensive handler first."""
+    total_seconds = sum(seconds for _, seconds in stats.values()) or 1.0
+    lines = [f"{'handler':<14} {'dispatches':>10} {'total ms':>10} {'ms/call':>8} {'share':>6}"]
+    for name, (count, seconds) in sorted(stats.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{name:<14} {count:>10} {seconds * 1000:>10.1f} {seconds * 1000 / count:>8.3f} "
+                     f"{100.0 * seconds / total_seconds:>5.1f}%")
+    return lines
+
+
+def _is_plain_paragraph(element):
+    # <p> directly inside guid/seeAlso blocks is rendered by those blocks' handlers, not as a paragraph
+    parent_classes = element.parent.get('class', []) if element.parent and element.parent.has_attr('class') else []
+    return not ('guid' in parent_classes or 'seeAlsoAdd' in parent_classes or 'seeAlso' in parent_classes)
+
+
+@BLOCK_HANDLERS.register(tag='h4', name='h4')
+def handle_heading(element, ctx):
+    ctx.mdx_parts.append(f"## {normalize_text(get_text_or_empty(element))}");
+    if ctx.mdx_parts[-1].strip(): ctx.mdx_parts.append("")
+
+
+@BLOCK_HANDLERS.register(tag='p', guard=_is_plain_paragraph, name='p')
+def handle_paragraph(element, ctx):
+    processed_p_text = render_inline_mdx(element, ctx.logger, ctx.html_filename)
+    normalized_p_text = normalize_text(processed_p_text)
+    if normalized_p_text: ctx.mdx_parts.append(normalized_p_text)
+    if ctx.mdx_parts and ctx.mdx_parts[-1].strip(): ctx.mdx_parts.append("")
+
+
+@BLOCK_HANDLERS.register(css_class='guid', name='div.guid')
+def handle_guid(element, ctx):
+    p_tag_guid = element.find('p');
+    content_source_guid = p_tag_guid if p_tag_guid else element
+    processed_guid_content = render_inline_mdx(content_source_guid, ctx.logger, ctx.html_filename)
+    normalized_content = normalize_text(processed_guid_content)
+    ctx.mdx_parts.append(f'<div className="guid">{normalized_content}</div>');
+    if ctx.mdx_parts[-1].strip(): ctx.mdx_parts.append("")
+
+
+@BLOCK_HANDLERS.register(css_class='seeAlsoAdd', name='div.seeAlsoAdd')
+def handle_see_also_add(element, ctx):
+    p_tag_seealsoadd = element.find('p')
+    if p_tag_seealsoadd:
+        processed_seealsoadd_content = render_inline_mdx(p_tag_seealsoadd, ctx.logger, ctx.html_filename,
+                                                         is_for_seealso_context=True)
+        final_text = normalize_text(processed_seealsoadd_content)
+        if final_text: ctx.mdx_parts.append(f"<SeeAlso>{final_text}</SeeAlso>")
+    else:
+        ctx.unrecognized_elements_log.append(
+            f"{ctx.html_filename}: Warning: div.seeAlsoAdd '{str(element)[:50]}' found without a <p> tag.")
+    if ctx.mdx_parts and ctx.mdx_parts[-1].strip(): ctx.mdx_parts.append("")
+
+
+@BLOCK_HANDLERS.register(css_class='seeAlso', name='div.seeAlso')  # seeAlsoAdd, registered first, takes precedence
+def handle_see_also(element, ctx):
+    all_see_also_p_tags = element.find_all('p')
+    if all_see_also_p_tags:
+        if ctx.mdx_parts and ctx.mdx_parts[-1].strip() != "": ctx.mdx_parts.append("")
+        for idx_sa, p_sa in enumerate(all_see_also_p_tags):
+            processed_sa_content = render_inline_mdx(p_sa, ctx.logger, ctx.html_filename,
+                                                     is_for_seealso_context=True)
+            final_text = normalize_text(processed_sa_content)
+            if final_text: ctx.mdx_parts.append(f"<SeeAlso>{final_text}</SeeAlso>")
+            if idx_sa < len(all_see_also_p_tags) - 1 and final_text and ctx.mdx_parts and ctx.mdx_parts[
+                -1].strip() != "": ctx.mdx_parts.append("")
+        if ctx.mdx_parts and ctx.mdx_parts[-1].strip() != "": ctx.mdx_parts.append("")
+    else:
+        ctx.unrecognized_elements_log.append(
+            f"{ctx.html_filename}: Warning: div.seeAlso '{str(element)[:50]}' found without any <p> tags.")
+
+
+@BLOCK_HANDLERS.register(tag='hr', name='hr')
+def handle_rule(element, ctx):
+    ctx.mdx_parts.append("---"); ctx.mdx_parts.append("")
+
+
+@BLOCK_HANDLERS.register(css_class='stip', name='div.stip')
+def handle_stip(element, ctx):
+    mdx_parts, unrecognized_elements_log = ctx.mdx_parts, ctx.unrecognized_elements_log
+    logger, html_filename = ctx.logger, ctx.html_filename
+    mdx_stip_lines = [];
+    if element.find('div', class_='mandatory'): mdx_stip_lines.append(
+        "<Mandatory />"); mdx_stip_lines.append("")
+    last_block_type_in_stip = None;
+    stip_children_tags = [child for child in element.children if isinstance(child, (NavigableString, Tag))]
+    for idx_stip_child, stip_child in enumerate(stip_children_tags):
+        current_block_type_in_stip = None;
+        if mdx_stip_lines and mdx_stip_lines[-1].strip() != "":
+            is_new_block_type = False;
+            if isinstance(stip_child, Tag):
+                if stip_child.name == 'p' and last_block_type_in_stip not in [None, 'p']:
+                    is_new_block_type = True
+                elif stip_child.name in ['ol', 'ul'] and last_block_type_in_stip != 'list':
+                    is_new_block_type = True
+                elif stip_child.has_attr('class') and 'xampleBlockStip' in stip_child.get('class', []):
+                    is_new_block_type = True
+                elif stip_child.has_attr('class') and 'seeAlso' in stip_child.get('class', []):
+                    is_new_block_type = True
+            elif isinstance(stip_child,
+                            NavigableString) and stip_child.strip() and last_block_type_in_stip not in [
+                None, 'p']:
+                is_new_block_type = True
+            if is_new_block_type: mdx_stip_lines.append("")
+        processed_stip_child_flag = False
+        if isinstance(stip_child, NavigableString):
+            text = normalize_text(str(stip_child))  # Process it
+            if text:  # Check if there's any text left after normalization
+                mdx_stip_lines.append(text)
+                current_block_type_in_stip = 'p'  # Assuming any significant floating text starts a paragraph block
+                processed_stip_child_flag = True
+        elif isinstance(stip_child, Tag):
+            if stip_child.name == 'p':
+                current_block_type_in_stip = 'p'; processed_p_content = render_inline_mdx(
+                    stip_child, logger, html_filename); mdx_stip_lines.append(
+                    normalize_text(processed_p_content)); processed_stip_child_flag = True
+            elif stip_child.name in ['ol', 'ul']:
+                current_block_type_in_stip = 'list';
+                for i, li in enumerate(stip_child.find_all('li', recursive=False),
+                                       1): prefix = f"  {i}." if stip_child.name == 'ol' else "  -"; mdx_stip_lines.append(
+                    f"{prefix} {normalize_text(get_text_or_empty(li))}"); processed_stip_child_flag = True
+            elif stip_child.has_attr('class') and 'seeAlso' in stip_child.get('class',
+                                                                              []) and 'seeAlsoAdd' not in stip_child.get(
+                    'class', []):  # FIX: div.seeAlso in stip
+                current_block_type_in_stip = 'seeAlso_in_stip'
+                all_see_also_p_tags_stip = stip_child.find_all('p')
+                if all_see_also_p_tags_stip:
+                    for idx_sa_stip, p_sa_stip in enumerate(all_see_also_p_tags_stip):
+                        processed_sa_stip_content = render_inline_mdx(p_sa_stip, logger, html_filename,
+                                                                      is_for_seealso_context=True)
+                        mdx_stip_lines.append(f"<SeeAlso>{normalize_text(processed_sa_stip_content)}</SeeAlso>")
+                        if idx_sa_stip < len(all_see_also_p_tags_stip) - 1 and mdx_stip_lines[
+                            -1].strip() != "": mdx_stip_lines.append("")
+                else:
+                    unrecognized_elements_log.append(
+                        f"{html_filename}: Warning: div.seeAlso in stip '{str(stip_child)[:50]}' found no <p> tags.")
+                processed_stip_child_flag = True
+            elif stip_child.has_attr('class') and 'xampleBlockStip' in stip_child.get('class', []):  # <details>
+                examples_started = _stage_begin()
+                current_block_type_in_stip = 'details';
+                mdx_stip_lines.append("<details>");
+                mdx_stip_lines.append("  <summary>Examples</summary>");
+                mdx_stip_lines.append("  ")
+                examples_div = stip_child.find('div', class_='xamples')
+                if examples_div:
+                    details_content_lines = [];
+                    example_elements = [node for node in examples_div.children if isinstance(node, Tag)];
+                    table_header_needed = True
+                    for element_node_idx, element_node in enumerate(example_elements):
+                        is_direct_content_row_block = element_node.name == 'div' and 'row' in element_node.get('class',
+                                                                                                               []) and 'px-2' in element_node.get(
+                            'class', [])
+                        if element_node.name == 'hr':
+                            details_content_lines.append("    <hr />"); table_header_needed = True
+                            if element_node_idx < len(example_elements) - 1 and example_elements[
+                                element_node_idx + 1].name != 'hr': details_content_lines.append("    ")
+                        elif element_node.name == 'div':
+                            rows_to_process_this_pass = [element_node] if is_direct_content_row_block else \
+                                [r for r in element_node.find_all('div', class_='row', recursive=True) if
+                                 r.find_parent('div', class_='xamples') == examples_div]
+                            if not rows_to_process_this_pass: continue
+                            if any(r.find(class_='xampleLabel') for r in rows_to_process_this_pass) and table_header_needed:
+                                if details_content_lines and details_content_lines[-1].strip() != "" and not \
+                                details_content_lines[-1].strip().endswith(
+                                    "|:---------|:------|"): details_content_lines.append("    ")
+                                details_content_lines.append("    | Property | Value |");
+                                details_content_lines.append("    |:---------|:------|");
+                                table_header_needed = False
+                            for ex_part_row in rows_to_process_this_pass:
+                                is_comment_row = bool(ex_part_row.find(class_='editComment'))
+                                is_full_example_comment = False
+                                if is_comment_row:
+                                    comment_text_check = ex_part_row.find(class_='editComment').get_text(strip=True)
+                                    if "[Full example:" in comment_text_check: is_full_example_comment = True
+
+                                if is_comment_row and is_full_example_comment and details_content_lines and \
+                                        details_content_lines[-1].strip().endswith("|"):
+                                    details_content_lines.append(
+                                        "    ")  # Add blank line before Full Example comment if after table
+
+                                new_lines, table_header_needed, unrec_ex = process_example_content_row(ex_part_row,
+                                                                                                       table_header_needed,
+                                                                                                       logger, html_filename)
+                                if unrec_ex: unrecognized_elements_log.append(
+                                    f"{html_filename}: Warning: Unrecognized structure in example row.")
+                                details_content_lines.extend(new_lines)
+                            if details_content_lines and details_content_lines[-1].strip() != "":
+                                if element_node_idx < len(example_elements) - 1 and example_elements[
+                                    element_node_idx + 1].name != 'hr':
+                                    details_content_lines.append("    ")
+                                elif element_node_idx == len(example_elements) - 1:
+                                    details_content_lines.append("    ")
+                        else:
+                            unrecognized_elements_log.append(
+                                f"{html_filename}: Warning: Unrecognized tag '{element_node.name}' directly inside div.xamples: {str(element_node)[:100]}")
+                    mdx_stip_lines.extend(details_content_lines)
+                mdx_stip_lines.append("</details>");
+                processed_stip_child_flag = True
+                _stage_end("example_tables", examples_started)
+            elif stip_child.name == 'div' and 'd-flex' in stip_child.get('class', []) and 'flexrow' in stip_child.get('class',
+                                                                                                                      []):
+                if stip_child.find('div', class_='mandatory'): processed_stip_child_flag = True
+
+
+        if not processed_stip_child_flag: unrecognized_elements_log.append(
+            f"{html_filename}: Warning: Unrecognized tag '{stip_child.name}' inside div.stip: {str(stip_child)[:100]}")
+        if current_block_type_in_stip: last_block_type_in_stip = current_block_type_in_stip
+        if idx_stip_child < len(stip_children_tags) - 1 and current_block_type_in_stip:
+            if mdx_stip_lines and mdx_stip_lines[-1].strip() != "": mdx_stip_lines.append("")
+    clean_stip_lines = [];
+    if mdx_stip_lines:  # ... (stip body assembly) ...
+        first_line_idx = 0
+        while first_line_idx < len(mdx_stip_lines) and mdx_stip_lines[first_line_idx].strip() == "": first_line_idx += 1
+        if first_line_idx < len(mdx_stip_lines): clean_stip_lines.append(mdx_stip_lines[first_line_idx])
+        for i_line in range(first_line_idx + 1, len(mdx_stip_lines)):
+            if not (mdx_stip_lines[i_line].strip() == "" and clean_stip_lines and clean_stip_lines[-1].strip() == ""):
+                clean_stip_lines.append(mdx_stip_lines[i_line])
+            elif mdx_stip_lines[i_line].strip() == "" and clean_stip_lines and clean_stip_lines[-1].strip() != "":
+                clean_stip_lines.append(mdx_stip_lines[i_line])
+    stip_body_parts = []
+    for line_idx, line_content in enumerate(clean_stip_lines):
+        if line_content.startswith("  ") or line_content.startswith("<details>") or line_content.startswith(
+            "</details>") or line_content.startswith("<Mandatory />") or line_content.strip().startswith(
+            "|") or line_content.strip().startswith("*") or line_content.startswith("<SeeAlso"):
+            stip_body_parts.append(line_content)
+        elif line_content == "":
+            stip_body_parts.append("")
+        else:
+            stip_body_parts.append(line_content)
+    stip_body = "\n  ".join(stip_body_parts).rstrip()
+    mdx_parts.append(f'<div className="stip">\n  {stip_body}\n</div>');
+    if not ctx.is_last_element and mdx_parts[-1].strip() != "": mdx_parts.append("")
+
+
+def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=None, document=None,
+                        parser=DEFAULT_PARSER, handler_stats=None):
+    # A shared HtmlDocument (see scripts/html_document_store.py) supplies an already parsed tree and nav.
+    # parser picks the page's tree builder; inline markup is rendered from that same tree.
+    # handler_stats, if given, accumulates {block handler name: [dispatches, seconds]} (see BLOCK_HANDLERS).
+    # Under profiling() the stages below are timed one after the other (see ConversionProfile).
+    stage_started = _stage_begin()
+    soup = document.soup if document is not None else BeautifulSoup(html_content, parser)
+    stage_started = _stage_lap("parse", stage_started)
+    nav_blocks = document.nav_blocks if document is not None else extract_nav_blocks(soup)
+    ctx = ConversionContext(html_filename, logger, handler_stats)
+    mdx_parts = ctx.mdx_parts;
+    unrecognized_elements_log = ctx.unrecognized_elements_log
 
     if html_subdirectory and html_subdirectory != '.':
         target_href_in_html = f"/ISBDM/docs/{html_subdirectory}/{html_filename}"
     else:
         target_href_in_html = f"/ISBDM/docs/{html_filename}"
 
-    sidebar_nav = soup.find('nav', class_='navISBDMSection')
     calculated_sidebar_position = 1;
     calculated_sidebar_level = 1
-    if sidebar_nav:
-        sidebar_items = sidebar_nav.find_all('div', class_='d-flex', recursive=False);
+    if nav_blocks:  # First nav.navISBDMSection; NavRow hrefs are already stripped
         item_found_in_sidebar = False
-        for idx, item_row in enumerate(sidebar_items):
-            link_tag = item_row.find('a', href=True)
-            if link_tag and link_tag.get('href',
-                                         '').strip() == target_href_in_html.strip():  # Ensure comparison is stripped
+        for idx, nav_row in enumerate(nav_blocks[0]):
+            if nav_row.href is not None and nav_row.href == target_href_in_html.strip():
                 calculated_sidebar_position = idx + 1;
-                arrow_icons_count = len(item_row.find_all('i', class_='bi-arrow-return-right'))
-                calculated_sidebar_level = arrow_icons_count + 1;
+                calculated_sidebar_level = nav_row.indent_depth + 1;
                 item_found_in_sidebar = True;
                 break
         if not item_found_in_sidebar: unrecognized_elements_log.append(
             f"Warning: Active link '{target_href_in_html}' for {html_filename} not found in sidebar.")
+    stage_started = _stage_lap("nav_lookup", stage_started)
 
     element_ref_section_h4 = soup.select_one('div.col-md-7 h4:-soup-contains("Element reference")')
     has_element_reference = bool(element_ref_section_h4)
@@ -175,6 +622,7 @@ def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=N
     if not main_title_tag: main_title_tag = soup.select_one('main.container h1, div.col-md-7 h1')
     main_page_title = normalize_text(
         get_text_or_empty(main_title_tag if main_title_tag else soup.find('title', recursive=False)))
+    stage_started = _stage_lap("page_lookup", stage_started)
 
     if has_element_reference:  # (Frontmatter population and serialization)
         file_id_match = re.search(r'(\d+)\.html$', html_filename);
@@ -214,6 +662,7 @@ def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=N
         elif element_ref_section_h4:
             unrecognized_elements_log.append(
                 f"{html_filename}: Warning: 'Element reference' h4 found, but not its 'div.px-4' container.")
+        stage_started = _stage_lap("element_reference", stage_started)
         mdx_parts.extend(
             ["---", "# Docusaurus-specific fields", f"id: {frontmatter['id']}", f"title: {frontmatter['title']}",
              f"sidebar_position: {frontmatter['sidebar_position']}  # ...",
@@ -238,6 +687,7 @@ def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=N
                                                                        f"deprecatedInVersion: \"\" # ...",
                                                                        f"willBeRemovedInVersion: \"\" # ...", "---",
                                                                        ""])
+        stage_started = _stage_lap("frontmatter_serialization", stage_started)
 
     mdx_parts.append(f"# {main_page_title}");
     if mdx_parts[-1].strip(): mdx_parts.append("")  # Ensure blank line after title
@@ -285,6 +735,7 @@ def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=N
                 main_title_tag.find_next_siblings(Tag))):  # Check if it was truly an empty page after title
         unrecognized_elements_log.append(
             f"{html_filename}: Warning: No top-level content blocks identified for iteration.")
+    stage_started = _stage_lap("content_collection", stage_started)
 
     for content_block_node_idx, content_block_node in enumerate(content_nodes_to_iterate):
         elements_to_process_this_block = []
@@ -305,258 +756,313 @@ def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=N
                 f"{html_filename}: Info: Direct content block node '{content_block_node.name}' was empty.")
 
         for element_idx, element in enumerate(elements_to_process_this_block):
-            processed_element_in_section = False
             # Skip main title h3 if it's part of the elements_to_process_this_block
             if element == main_title_tag and main_page_title == normalize_text(get_text_or_empty(element)):
-                processed_element_in_section = True;
                 continue
 
-            if element.name == 'h4':
-                mdx_parts.append(f"## {normalize_text(get_text_or_empty(element))}");
-                if mdx_parts[-1].strip(): mdx_parts.append("")
-                processed_element_in_section = True
-            elif element.name == 'p' and not (element.parent and element.parent.has_attr('class') and \
-                                              ('guid' in element.parent.get('class', []) or \
-                                               'seeAlsoAdd' in element.parent.get('class', []) or \
-                                               'seeAlso' in element.parent.get('class',
-                                                                               []))):  # Handle direct <p> not in specific divs
-                raw_p_content = element.decode_contents() if element else ""
-                processed_p_text = process_html_fragment_for_mdx(raw_p_content, logger, html_filename)
-                normalized_p_text = normalize_text(processed_p_text)
-                if normalized_p_text: mdx_parts.append(normalized_p_text)
-                if mdx_parts and mdx_parts[-1].strip(): mdx_parts.append("")
-                processed_element_in_section = True
-            elif element.has_attr('class') and 'guid' in element.get('class', []):
-                p_tag_guid = element.find('p');
-                content_source_guid = p_tag_guid if p_tag_guid else element
-                raw_html_guid = get_decode_contents_or_empty(content_source_guid) if content_source_guid else ""
-                if p_tag_guid and content_source_guid == p_tag_guid:
-                    raw_html_guid = p_tag_guid.decode_contents() if p_tag_guid else ""
-                else:
-                    raw_html_guid = element.decode_contents() if element else ""
-                processed_guid_content = process_html_fragment_for_mdx(raw_html_guid, logger, html_filename)
-                normalized_content = normalize_text(processed_guid_content)
-                mdx_parts.append(f'<div className="guid">{normalized_content}</div>');
-                if mdx_parts[-1].strip(): mdx_parts.append("")
-                processed_element_in_section = True
-            elif element.has_attr('class') and 'seeAlsoAdd' in element.get('class', []):
-                p_tag_seealsoadd = element.find('p')
-                if p_tag_seealsoadd:
-                    raw_seealsoadd_content = p_tag_seealsoadd.decode_contents() if p_tag_seealsoadd else ""
-                    processed_seealsoadd_content = process_html_fragment_for_mdx(raw_seealsoadd_content, logger,
-                                                                                 html_filename,
-                                                                                 is_for_seealso_context=True)
-                    final_text = normalize_text(processed_seealsoadd_content)
-                    if final_text: mdx_parts.append(f"<SeeAlso>{final_text}</SeeAlso>")
-                else:
-                    unrecognized_elements_log.append(
-                        f"{html_filename}: Warning: div.seeAlsoAdd '{str(element)[:50]}' found without a <p> tag.")
-                if mdx_parts and mdx_parts[-1].strip(): mdx_parts.append("")
-                processed_element_in_section = True
-            elif element.has_attr('class') and 'seeAlso' in element.get('class',
-                                                                        []) and 'seeAlsoAdd' not in element.get('class',
-                                                                                                                []):
-                all_see_also_p_tags = element.find_all('p')
-                if all_see_also_p_tags:
-                    if mdx_parts and mdx_parts[-1].strip() != "": mdx_parts.append("")
-                    for idx_sa, p_sa in enumerate(all_see_also_p_tags):
-                        raw_sa_content = p_sa.decode_contents() if p_sa else ""
-                        processed_sa_content = process_html_fragment_for_mdx(raw_sa_content, logger, html_filename,
-                                                                             is_for_seealso_context=True)
-                        final_text = normalize_text(processed_sa_content)
-                        if final_text: mdx_parts.append(f"<SeeAlso>{final_text}</SeeAlso>")
-                        if idx_sa < len(all_see_also_p_tags) - 1 and final_text and mdx_parts and mdx_parts[
-                            -1].strip() != "": mdx_parts.append("")
-                    if mdx_parts and mdx_parts[-1].strip() != "": mdx_parts.append("")
-                else:
-                    unrecognized_elements_log.append(
-                        f"{html_filename}: Warning: div.seeAlso '{str(element)[:50]}' found without any <p> tags.")
-                processed_element_in_section = True
-            elif element.name == 'hr':
-                mdx_parts.append("---"); mdx_parts.append(""); processed_element_in_section = True
-            elif element.has_attr('class') and 'stip' in element.get('class', []):  # div.stip
-                mdx_stip_lines = [];
-                if element.find('div', class_='mandatory'): mdx_stip_lines.append(
-                    "<Mandatory />"); mdx_stip_lines.append("")
-                last_block_type_in_stip = None;
-                stip_children_tags = [child for child in element.children if isinstance(child, (NavigableString, Tag))]
-                for idx_stip_child, stip_child in enumerate(stip_children_tags):
-                    current_block_type_in_stip = None;
-                    if mdx_stip_lines and mdx_stip_lines[-1].strip() != "":
-                        is_new_block_type = False;
-                        if isinstance(stip_child, Tag):
-                            if stip_child.name == 'p' and last_block_type_in_stip not in [None, 'p']:
-                                is_new_block_type = True
-                            elif stip_child.name in ['ol', 'ul'] and last_block_type_in_stip != 'list':
-                                is_new_block_type = True
-                            elif stip_child.has_attr('class') and 'xampleBlockStip' in stip_child.get('class', []):
-                                is_new_block_type = True
-                            elif stip_child.has_attr('class') and 'seeAlso' in stip_child.get('class', []):
-                                is_new_block_type = True
-                        elif isinstance(stip_child,
-                                        NavigableString) and stip_child.strip() and last_block_type_in_stip not in [
-                            None, 'p']:
-                            is_new_block_type = True
-                        if is_new_block_type: mdx_stip_lines.append("")
-                    processed_stip_child_flag = False
-                    if isinstance(stip_child, NavigableString):
-                        text = normalize_text(str(stip_child))  # Process it
-                        if text:  # Check if there's any text left after normalization
-                            mdx_stip_lines.append(text)
-                            current_block_type_in_stip = 'p'  # Assuming any significant floating text starts a paragraph block
-                            processed_stip_child_flag = True
-                    elif isinstance(stip_child, Tag):
-                if stip_child.name == 'p':
-                    current_block_type_in_stip = 'p'; raw_p_html_content = stip_child.decode_contents() if stip_child else ""; processed_p_content = process_html_fragment_for_mdx(
-                        raw_p_html_content, logger, html_filename); mdx_stip_lines.append(
-                        normalize_text(processed_p_content)); processed_stip_child_flag = True
-                elif stip_child.name in ['ol', 'ul']:
-                    current_block_type_in_stip = 'list';
-                for i, li in enumerate(stip_child.find_all('li', recursive=False),
-                                       1): prefix = f"  {i}." if stip_child.name == 'ol' else "  -"; mdx_stip_lines.append(
-                    f"{prefix} {normalize_text(get_text_or_empty(li))}"); processed_stip_child_flag = True
-            elif stip_child.has_attr('class') and 'seeAlso' in stip_child.get('class',
-                                                                              []) and 'seeAlsoAdd' not in stip_child.get(
-                    'class', []):  # FIX: div.seeAlso in stip
-                current_block_type_in_stip = 'seeAlso_in_stip'
-                all_see_also_p_tags_stip = stip_child.find_all('p')
-                if all_see_also_p_tags_stip:
-                    for idx_sa_stip, p_sa_stip in enumerate(all_see_also_p_tags_stip):
-                        raw_sa_stip_content = p_sa_stip.decode_contents() if p_sa_stip else ""
-                        processed_sa_stip_content = process_html_fragment_for_mdx(raw_sa_stip_content, logger,
-                                                                                  html_filename,
-                                                                                  is_for_seealso_context=True)
-                        mdx_stip_lines.append(f"<SeeAlso>{normalize_text(processed_sa_stip_content)}</SeeAlso>")
-                        if idx_sa_stip < len(all_see_also_p_tags_stip) - 1 and mdx_stip_lines[
-                            -1].strip() != "": mdx_stip_lines.append("")
-                else:
-                    unrecognized_elements_log.append(
-                        f"{html_filename}: Warning: div.seeAlso in stip '{str(stip_child)[:50]}' found no <p> tags.")
-                processed_stip_child_flag = True
-            elif stip_child.has_attr('class') and 'xampleBlockStip' in stip_child.get('class', []):  # <details>
-                current_block_type_in_stip = 'details';
-                mdx_stip_lines.append("<details>");
-                mdx_stip_lines.append("  <summary>Examples</summary>");
-                mdx_stip_lines.append("  ")
-                examples_div = stip_child.find('div', class_='xamples')
-                if examples_div:
-                    details_content_lines = [];
-                    example_elements = [node for node in examples_div.children if isinstance(node, Tag)];
-                    table_header_needed = True
-                    for element_node_idx, element_node in enumerate(example_elements):
-                        is_direct_content_row_block = element_node.name == 'div' and 'row' in element_node.get('class',
-                                                                                                               []) and 'px-2' in element_node.get(
-                            'class', [])
-                        if element_node.name == 'hr': details_content_lines.append(
-                            "    <hr />"); table_header_needed = True
-                        if element_node_idx < len(example_elements) - 1 and example_elements[
-                            element_node_idx + 1].name != 'hr': details_content_lines.append("    ")
-                    elif element_node.name == 'div':
-                    rows_to_process_this_pass = [element_node] if is_direct_content_row_block else \
-                        [r for r in element_node.find_all('div', class_='row', recursive=True) if
-                         r.find_parent('div', class_='xamples') == examples_div]
-                    if not rows_to_process_this_pass: continue
-                    if any(r.find(class_='xampleLabel') for r in rows_to_process_this_pass) and table_header_needed:
-                        if details_content_lines and details_content_lines[-1].strip() != "" and not \
-                        details_content_lines[-1].strip().endswith(
-                            "|:---------|:------|"): details_content_lines.append("    ")
-                        details_content_lines.append("    | Property | Value |");
-                        details_content_lines.append("    |:---------|:------|");
-                        table_header_needed = False
-                    for ex_part_row in rows_to_process_this_pass:
-                        is_comment_row = bool(ex_part_row.find(class_='editComment'))
-                        is_full_example_comment = False
-                        if is_comment_row:
-                            comment_text_check = ex_part_row.find(class_='editComment').get_text(strip=True)
-                            if "[Full example:" in comment_text_check: is_full_example_comment = True
-
-                        if is_comment_row and is_full_example_comment and details_content_lines and \
-                                details_content_lines[-1].strip().endswith("|"):
-                            details_content_lines.append(
-                                "    ")  # Add blank line before Full Example comment if after table
-
-                        new_lines, table_header_needed, unrec_ex = process_example_content_row(ex_part_row,
-                                                                                               table_header_needed,
-                                                                                               logger, html_filename)
-                        if unrec_ex: unrecognized_elements_log.append(
-                            f"{html_filename}: Warning: Unrecognized structure in example row.")
-                        details_content_lines.extend(new_lines)
-                    if details_content_lines and details_content_lines[-1].strip() != "":
-                        if element_node_idx < len(example_elements) - 1 and example_elements[
-                            element_node_idx + 1].name != 'hr':
-                            details_content_lines.append("    ")
-                        elif element_node_idx == len(example_elements) - 1:
-                            details_content_lines.append("    ")
-                else:
-                    unrecognized_elements_log.append(
-                        f"{html_filename}: Warning: Unrecognized tag '{element_node.name}' directly inside div.xamples: {str(element_node)[:100]}")
-            mdx_stip_lines.extend(details_content_lines)
-        mdx_stip_lines.append("</details>");
-        processed_stip_child_flag = True
-    elif stip_child.name == 'div' and 'd-flex' in stip_child.get('class', []) and 'flexrow' in stip_child.get('class',
-                                                                                                              []):
-    if stip_child.find('div', class_='mandatory'): processed_stip_child_flag = True
-
-
-if not processed_stip_child_flag: unrecognized_elements_log.append(
-    f"{html_filename}: Warning: Unrecognized tag '{stip_child.name}' inside div.stip: {str(stip_child)[:100]}")
-if current_block_type_in_stip: last_block_type_in_stip = current_block_type_in_stip
-if idx_stip_child < len(stip_children_tags) - 1 and current_block_type_in_stip:
-    if mdx_stip_lines and mdx_stip_lines[-1].strip() != "": mdx_stip_lines.append("")
-clean_stip_lines = [];
-if mdx_stip_lines:  # ... (stip body assembly) ...
-    first_line_idx = 0
-    while first_line_idx < len(mdx_stip_lines) and mdx_stip_lines[first_line_idx].strip() == "": first_line_idx += 1
-    if first_line_idx < len(mdx_stip_lines): clean_stip_lines.append(mdx_stip_lines[first_line_idx])
-    for i_line in range(first_line_idx + 1, len(mdx_stip_lines)):
-        if not (mdx_stip_lines[i_line].strip() == "" and clean_stip_lines and clean_stip_lines[-1].strip() == ""):
-            clean_stip_lines.append(mdx_stip_lines[i_line])
-        elif mdx_stip_lines[i_line].strip() == "" and clean_stip_lines and clean_stip_lines[-1].strip() != "":
-            clean_stip_lines.append(mdx_stip_lines[i_line])
-stip_body_parts = []
-for line_idx, line_content in enumerate(clean_stip_lines):
-    if line_content.startswith("  ") or line_content.startswith("<details>") or line_content.startswith(
-        "</details>") or line_content.startswith("<Mandatory />") or line_content.strip().startswith(
-        "|") or line_content.strip().startswith("*") or line_content.startswith("<SeeAlso"):
-        stip_body_parts.append(line_content)
-    elif line_content == "":
-        stip_body_parts.append("")
-    else:
-        stip_body_parts.append(line_content)
-stip_body = "\n  ".join(stip_body_parts).rstrip()
-mdx_parts.append(f'<div className="stip">\n  {stip_body}\n</div>');
-if not (content_block_node_idx == len(content_nodes_to_iterate) - 1 and element_idx == len(
-    elements_to_process_this_block) - 1) and mdx_parts[-1].strip() != "": mdx_parts.append("")
-processed_element_in_section = True
-if not processed_element_in_section and isinstance(element, Tag) and element.name not in ['script', 'style', 'meta',
-                                                                                          'link', 'title', 'h3']:
-    unrecognized_elements_log.append(
-        f"{html_filename}: Warning: Unrecognized element type '{element.name}' in main content: {str(element)[:100]}")
-
-for log_msg in set(unrecognized_elements_log): logger.warning(f"{log_msg}")
-final_mdx_output_lines = []
-if mdx_parts:  # ... (final output filter) ...
-    if mdx_parts[0].strip() != "" or (len(mdx_parts) > 1 and mdx_parts[1].strip() != ""): final_mdx_output_lines.append(
-        mdx_parts[0])
-    for i in range(1, len(mdx_parts)):
-        if mdx_parts[i].strip() != "" or (
-                mdx_parts[i].strip() == "" and final_mdx_output_lines and final_mdx_output_lines[
-            -1].strip() != ""): final_mdx_output_lines.append(mdx_parts[i])
-# Remove multiple trailing blank lines, but keep one if content ends with an intentional blank
-while len(final_mdx_output_lines) > 1 and final_mdx_output_lines[-1].strip() == "" and final_mdx_output_lines[
-    -2].strip() == "": final_mdx_output_lines.pop()
-if not final_mdx_output_lines or (len(final_mdx_output_lines) == 1 and final_mdx_output_lines[
-    0].strip() == ""): return ""  # Return empty string for empty/whitespace-only output
-return "\n".join(final_mdx_output_lines) + "\n"
+            ctx.is_last_element = content_block_node_idx == len(content_nodes_to_iterate) - 1 and \
+                                  element_idx == len(elements_to_process_this_block) - 1
+            if not BLOCK_HANDLERS.dispatch(element, ctx) and \
+                    element.name not in ['script', 'style', 'meta', 'link', 'title', 'h3']:
+                unrecognized_elements_log.append(
+                    f"{html_filename}: Warning: Unrecognized element type '{element.name}' in main content: {str(element)[:100]}")
+
+    stage_started = _stage_lap("block_handlers", stage_started)
+    for log_msg in dict.fromkeys(unrecognized_elements_log): logger.warning(f"{log_msg}")  # de-duplicated, first-seen order
+    final_mdx_output_lines = []
+    if mdx_parts:  # ... (final output filter) ...
+        if mdx_parts[0].strip() != "" or (len(mdx_parts) > 1 and mdx_parts[1].strip() != ""): final_mdx_output_lines.append(
+            mdx_parts[0])
+        for i in range(1, len(mdx_parts)):
+            if mdx_parts[i].strip() != "" or (
+                    mdx_parts[i].strip() == "" and final_mdx_output_lines and final_mdx_output_lines[
+                -1].strip() != ""): final_mdx_output_lines.append(mdx_parts[i])
+    # Remove multiple trailing blank lines, but keep one if content ends with an intentional blank
+    while len(final_mdx_output_lines) > 1 and final_mdx_output_lines[-1].strip() == "" and final_mdx_output_lines[
+        -2].strip() == "": final_mdx_output_lines.pop()
+    _stage_end("output_assembly", stage_started)
+    if not final_mdx_output_lines or (len(final_mdx_output_lines) == 1 and final_mdx_output_lines[
+        0].strip() == ""): return ""  # Return empty string for empty/whitespace-only output
+    return "\n".join(final_mdx_output_lines) + "\n"
+
+
+
+
+# --- File-level Conversion (shared by serial and --jobs modes) ---
+class _CollectingHandler(logging.Handler):
+    """Buffers log records so a worker's messages can be replayed by the parent logger in file order."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+def get_output_paths(html_file_path, abs_source_dir, dest_dir):
+    abs_html_file_dir = os.path.abspath(os.path.dirname(html_file_path))
+    html_subdirectory = ""
+    # Ensure relpath is calculated from the true root of the docs content passed in source_dir
+    if abs_html_file_dir.startswith(abs_source_dir) and abs_html_file_dir != abs_source_dir:
+        html_subdirectory = os.path.relpath(abs_html_file_dir, abs_source_dir)
+        if html_subdirectory == '.': html_subdirectory = ""
+        html_subdirectory = html_subdirectory.replace(os.sep, '/')
+
+    relative_path_for_output = os.path.relpath(html_file_path, abs_source_dir)
+    mdx_filename_part = os.path.splitext(relative_path_for_output)[0] + ".mdx"
+    return html_subdirectory, os.path.join(dest_dir, mdx_filename_part)
+
+
+def convert_file(task):
+    """
+    Converts one HTML file and writes its MDX output atomically.
+    Runs in the main process or in a pool worker; log records are collected and returned, never emitted here.
+    With profile set, result["profile"] is the file's ConversionProfile record.
+    """
+    html_file_path, abs_source_dir, dest_dir, parser, profile = task
+    collector = _CollectingHandler()
+    file_logger = logging.getLogger(f"{__name__}.file")
+    file_logger.propagate = False
+    file_logger.setLevel(logging.DEBUG)
+    file_logger.handlers = [collector]
+    result = {"html_file_path": html_file_path, "mdx_file_path": None, "records": collector.records, "error": None,
+              "source_sha256": None, "output_sha256": None, "handler_stats": {}, "links": [], "profile": None}
+    conversion_profile = ConversionProfile() if profile else None
+    with profiling(conversion_profile):
+        conversion_started = _stage_begin()
+        try:
+            html_subdirectory, mdx_file_path = get_output_paths(html_file_path, abs_source_dir, dest_dir)
+            result["mdx_file_path"] = mdx_file_path
+            os.makedirs(os.path.dirname(mdx_file_path), exist_ok=True)
+            document = get_default_store(parser).get(html_file_path)
+            stage_started = _stage_begin()
+            result["source_sha256"] = hashlib.sha256(document.data).hexdigest()
+            _stage_end("read", stage_started)
+            with get_default_link_index().collecting_links() as links:
+                mdx_output = convert_html_to_mdx(document.html, os.path.basename(html_file_path), file_logger,
+                                                 html_subdirectory, document=document, handler_stats=result["handler_stats"])
+            result["links"] = list(dict.fromkeys(links))
+            document.release_tree()  # Keep only the compact nav extract for later consumers in this process
+            stage_started = _stage_begin()
+            write_text_atomic(mdx_file_path, mdx_output)
+            _stage_end("write", stage_started)
+            result["output_sha256"] = hashlib.sha256(mdx_output.encode('utf-8')).hexdigest()
+        except Exception:
+            result["error"] = traceback.format_exc()
+        finally:
+            file_logger.handlers = []
+        if conversion_profile is not None: result["profile"] = conversion_profile.to_dict(html_file_path, conversion_started)
+    return result
+
+
+def iter_conversion_results(tasks, jobs):
+    """Yields convert_file() results in task order, fanning the work out over a process pool when jobs > 1."""
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks: yield convert_file(task)
+        return
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(convert_file, tasks, chunksize=chunksize)
+
+
+def summarize_profiles(profiles, top=DEFAULT_PROFILE_TOP):
+    """The JSONL summary record: stage and counter totals over every profiled file, and the top slowest files."""
+    stages, counters = {}, {}
+    for profile in profiles:
+        for name, stage in profile["stages"].items():
+            total = stages.setdefault(name, {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0})
+            for key in total: total[key] += stage[key]
+        for name, amount in profile["counters"].items(): counters[name] = counters.get(name, 0) + amount
+    slowest = sorted(profiles, key=lambda profile: -profile["wall_ms"])[:top]
+    return {"type": "summary", "files": len(profiles),
+            "wall_ms": round(sum(profile["wall_ms"] for profile in profiles), 3),
+            "cpu_ms": round(sum(profile["cpu_ms"] for profile in profiles), 3),
+            "stages": {name: {key: round(value, 3) for key, value in stage.items()}
+                       for name, stage in sorted(stages.items(), key=lambda item: -item[1]["wall_ms"])},
+            "counters": dict(sorted(counters.items())),
+            "slowest": [{key: profile[key] for key in ("html_file_path", "wall_ms", "cpu_ms")} for profile in slowest]}
+
+
+def format_profile_summary(summary):
+    """Summary lines, most expensive stage first."""
+    total_ms = summary["wall_ms"] or 1.0
+    lines = [f"{summary['files']} file(s) profiled: {summary['wall_ms']:.1f} ms wall, {summary['cpu_ms']:.1f} ms CPU",
+             f"{'stage':<26} {'calls':>7} {'wall ms':>10} {'cpu ms':>10} {'share':>6}"]
+    for name, stage in summary["stages"].items():
+        lines.append(f"{name:<26} {stage['calls']:>7} {stage['wall_ms']:>10.1f} {stage['cpu_ms']:>10.1f} "
+                     f"{100.0 * stage['wall_ms'] / total_ms:>5.1f}%")
+    lines.append("Counters: " + ", ".join(f"{name}={amount}" for name, amount in summary["counters"].items()))
+    lines.append(f"Slowest {len(summary['slowest'])} file(s):")
+    for profile in summary["slowest"]:
+        lines.append(f"  {profile['wall_ms']:>8.1f} ms  {profile['html_file_path']}")
+    return lines
+
+
+def write_profile(profile_path, profiles, summary):
+    """One JSON line per profiled file, then the summary line."""
+    lines = [json.dumps(profile, ensure_ascii=False) for profile in profiles]
+    lines.append(json.dumps(summary, ensure_ascii=False))
+    write_text_atomic(profile_path, "\n".join(lines) + "\n")
+
+
+# --- Incremental Build Manifest ---
+def file_sha256(file_path):
+    try:
+        with open(file_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def get_converter_fingerprint(parser=DEFAULT_PARSER):
+    """CONVERTER_VERSION plus a hash of the CONVERTER_MODULES sources (and the parser, if not the default)."""
+    digest = hashlib.sha256()
+    for module_name in CONVERTER_MODULES:
+        with open(sys.modules[module_name].__file__, 'rb') as f: digest.update(f.read())
+    fingerprint = f"{CONVERTER_VERSION}:{digest.hexdigest()[:16]}"
+    return fingerprint if parser == DEFAULT_PARSER else f"{fingerprint}:{parser}"
+
+
+class ConversionManifest:
+    """
+    Persistent record of the last conversion of each HTML file, keyed by its path relative to the source dir.
+    Each entry stores the source HTML hash, the converter fingerprint, the output MDX hash, the warnings
+    logged for the file and the doc ids it links to, so an unchanged file can be skipped, its warnings
+    replayed and its links still checked.
+    """
+
+    def __init__(self, manifest_path, converter_fingerprint):
+        self.manifest_path = manifest_path
+        self.converter_fingerprint = converter_fingerprint
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, logger):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get("files", {})
+        except FileNotFoundError:
+            self.entries = {}
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.manifest_path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        data = {"converter": self.converter_fingerprint, "files": dict(sorted(self.entries.items()))}
+        write_text_atomic(self.manifest_path, json.dumps(data, indent=1, ensure_ascii=False) + "\n")
+
+    def lookup(self, rel_html_path, html_file_path, mdx_file_path):
+        """Returns the cached entry if the HTML, the converter and the existing MDX output are all unchanged."""
+        entry = self.entries.get(rel_html_path)
+        if not entry or entry.get("converter") != self.converter_fingerprint: return None
+        if entry.get("source_sha256") != file_sha256(html_file_path): return None
+        if entry.get("output_sha256") != file_sha256(mdx_file_path): return None
+        return entry
+
+    def record(self, rel_html_path, result):
+        self.entries[rel_html_path] = {"converter": self.converter_fingerprint,
+                                       "source_sha256": result["source_sha256"],
+                                       "output_sha256": result["output_sha256"],
+                                       "records": [list(r) for r in result["records"]],
+                                       "links": result.get("links", [])}
+
+    def prune(self, rel_html_paths_seen):
+        for rel_html_path in set(self.entries) - set(rel_html_paths_seen): del self.entries[rel_html_path]
+
+    def check_links(self, link_index, logger):
+        """Reports links from any recorded file to a document that is not in link_index."""
+        link_index.unresolved.clear()
+        for rel_html_path, entry in sorted(self.entries.items()): link_index.check(rel_html_path, entry.get("links", []))
+        link_index.report_unresolved(logger)
+
+    def summary(self):
+        total = self.hits + self.misses
+        ratio = (100.0 * self.hits / total) if total else 0.0
+        return f"Cache: {self.hits} hit(s), {self.misses} miss(es) ({ratio:.1f}% hit ratio)"
 
 
 # --- Main Execution Logic ---
+def report_conversion_result(logger, result, rel_html_path, manifest):
+    """Replays a result's log records, updates the manifest and returns True if the file converted (or was cached)."""
+    html_file_path = result["html_file_path"]
+    logger.info(f"Processing: {html_file_path}")
+    for level, message in result["records"]: logger.log(level, message)
+    if result["error"]:
+        logger.error(f"Failed to convert {html_file_path}:\n{result['error']}")
+        manifest.entries.pop(rel_html_path, None)
+        return False
+    if result.get("cached"):
+        logger.info(f"Unchanged, skipped: {html_file_path} -> {result['mdx_file_path']}")
+    else:
+        manifest.record(rel_html_path, result)
+        logger.info(f"Successfully converted: {html_file_path} -> {result['mdx_file_path']}")
+    return True
+
+
+def watch_and_convert(abs_source_dir, dest_dir, recursive, manifest, logger, parser=DEFAULT_PARSER):
+    """
+    Reconverts HTML files under abs_source_dir as they are saved, until interrupted. Only the touched files are
+    converted; the document store keeps every other page's parse, and pages whose content did not actually
+    change (per the manifest) are skipped. Links are rechecked after every batch.
+    """
+    watcher = PollingWatcher([abs_source_dir], [".html"], recursive=recursive)
+    store = get_default_store(parser)
+    link_index = get_default_link_index()
+    logger.info(f"Watching '{abs_source_dir}' for changes (Ctrl+C to stop)")
+    try:
+        for changes in watcher.batches():
+            started = time.perf_counter()
+            for html_file_path in changes.removed:
+                store.discard(html_file_path)
+                link_index.doc_ids.discard(doc_id_for_path(html_file_path, abs_source_dir))
+                manifest.entries.pop(os.path.relpath(html_file_path, abs_source_dir).replace(os.sep, '/'), None)
+                logger.info(f"Removed: {html_file_path} (its MDX output is left in place)")
+            converted_count = 0
+            for html_file_path in changes.changed:
+                link_index.doc_ids.add(doc_id_for_path(html_file_path, abs_source_dir))
+                rel_html_path = os.path.relpath(html_file_path, abs_source_dir).replace(os.sep, '/')
+                _, mdx_file_path = get_output_paths(html_file_path, abs_source_dir, dest_dir)
+                if manifest.lookup(rel_html_path, html_file_path, mdx_file_path):
+                    logger.debug(f"Content unchanged, not reconverting: {html_file_path}")
+                    continue
+                report_conversion_result(logger, convert_file((html_file_path, abs_source_dir, dest_dir, parser, False)),
+                                         rel_html_path, manifest)
+                converted_count += 1
+            manifest.save()
+            manifest.check_links(link_index, logger)
+            logger.info(f"Watch: {converted_count} file(s) reconverted, {len(changes.removed)} removed "
+                        f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        logger.info("Watch mode stopped.")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Convert HTML files from ISBDM structure to Docusaurus MDX.")
     parser.add_argument("source_dir", help="Source directory containing HTML files.")
     parser.add_argument("dest_dir", help="Destination directory for converted MDX files.")
     parser.add_argument("--log_file", default="conversion_log.txt", help="File to store conversion logs.")
     parser.add_argument("--recursive", action="store_true", help="Process HTML files in subdirectories recursively.")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of worker processes (0 = one per CPU). Logs are still emitted in file order.")
+    parser.add_argument("--manifest",
+                        help=f"Incremental build manifest path (default: <dest_dir>/{DEFAULT_MANIFEST_FILENAME}).")
+    parser.add_argument("--force", action="store_true", help="Reconvert every file, ignoring the manifest.")
+    parser.add_argument("--watch", action="store_true",
+                        help="After the initial run, keep watching source_dir and reconvert HTML files as they change.")
+    parser.add_argument("--parser", default=DEFAULT_PARSER, choices=available_parsers(),
+                        help="Tree builder for the pages. Only html.parser is the reference; check another one with "
+                             "compare_parser_backends.py before relying on it.")
+    parser.add_argument("--handler_stats", action="store_true",
+                        help="Log dispatch counts and time per main-content block handler (converted files only; "
+                             "combine with --force to cover every file).")
+    parser.add_argument("--profile", metavar="JSONL_FILE",
+                        help="Record wall/CPU time per conversion stage and counters (tree queries, inline renders, "
+                             "fragment re-parses, ...) for every converted file, write them to this JSONL file with a "
+                             "summary line, and log the stage totals and slowest files. Combine with --force to cover every file.")
+    parser.add_argument("--profile_top", type=int, default=DEFAULT_PROFILE_TOP,
+                        help=f"Number of slowest files in the --profile summary (default: {DEFAULT_PROFILE_TOP}).")
     args = parser.parse_args()
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
                         handlers=[logging.FileHandler(args.log_file, mode='w', encoding='utf-8'),
@@ -567,8 +1073,11 @@ def main():
     os.makedirs(args.dest_dir, exist_ok=True)
     files_processed_count = 0;
     conversion_errors = 0
+    handler_stats = {}
+    profiles = []
     items_to_scan = []
     abs_source_dir_for_main = os.path.abspath(args.source_dir)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
     if args.recursive:
         for root, _, files in os.walk(abs_source_dir_for_main):
@@ -579,37 +1088,57 @@ def main():
             if filename.lower().endswith(".html"):
                 html_file_path = os.path.join(abs_source_dir_for_main, filename)
                 if os.path.isfile(html_file_path): items_to_scan.append(html_file_path)
+    items_to_scan.sort()
 
+    manifest = ConversionManifest(args.manifest or os.path.join(args.dest_dir, DEFAULT_MANIFEST_FILENAME),
+                                  get_converter_fingerprint(args.parser))
+    if not args.force: manifest.load(logger)
+    rel_paths = {p: os.path.relpath(p, abs_source_dir_for_main).replace(os.sep, '/') for p in items_to_scan}
+
+    # Cached entries are resolved up front so only misses are dispatched; the results are then merged
+    # back into file order before logging.
+    results_by_path = {}
+    tasks = []
     for html_file_path in items_to_scan:
-        try:
-            logger.info(f"Processing: {html_file_path}")
-            abs_html_file_dir = os.path.abspath(os.path.dirname(html_file_path))
-            html_subdirectory = ""
-            # Ensure relpath is calculated from the true root of the docs content passed in source_dir
-            if abs_html_file_dir.startswith(abs_source_dir_for_main) and abs_html_file_dir != abs_source_dir_for_main:
-                html_subdirectory = os.path.relpath(abs_html_file_dir, abs_source_dir_for_main)
-                if html_subdirectory == '.': html_subdirectory = ""
-                html_subdirectory = html_subdirectory.replace(os.sep, '/')
-
-            relative_path_for_output = os.path.relpath(html_file_path, abs_source_dir_for_main)
-            mdx_filename_part = os.path.splitext(relative_path_for_output)[0] + ".mdx"
-            mdx_file_path = os.path.join(args.dest_dir, mdx_filename_part)
-            mdx_file_dir = os.path.dirname(mdx_file_path)
-            if not os.path.exists(mdx_file_dir): os.makedirs(mdx_file_dir, exist_ok=True)
-            with open(html_file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            mdx_output = convert_html_to_mdx(html_content, os.path.basename(html_file_path), logger, html_subdirectory)
-            with open(mdx_file_path, 'w', encoding='utf-8') as f:
-                f.write(mdx_output)
-            logger.info(f"Successfully converted: {html_file_path} -> {mdx_file_path}")
+        _, mdx_file_path = get_output_paths(html_file_path, abs_source_dir_for_main, args.dest_dir)
+        entry = None if args.force else manifest.lookup(rel_paths[html_file_path], html_file_path, mdx_file_path)
+        if entry:
+            manifest.hits += 1
+            results_by_path[html_file_path] = {"html_file_path": html_file_path, "mdx_file_path": mdx_file_path,
+                                               "records": entry.get("records", []), "links": entry.get("links", []),
+                                               "error": None, "cached": True}
+        else:
+            manifest.misses += 1
+            tasks.append((html_file_path, abs_source_dir_for_main, args.dest_dir, args.parser, bool(args.profile)))
+    if jobs > 1 and tasks: logger.info(f"Converting {len(tasks)} file(s) with {jobs} worker processes")
+    converted = iter_conversion_results(tasks, jobs)
+
+    for html_file_path in items_to_scan:
+        result = results_by_path.pop(html_file_path, None) or next(converted)
+        merge_handler_stats(handler_stats, result.get("handler_stats", {}))
+        if result.get("profile"): profiles.append(result["profile"])
+        if report_conversion_result(logger, result, rel_paths[html_file_path], manifest):
             files_processed_count += 1
-        except Exception as e:
-            logger.error(f"Failed to convert {html_file_path}: {e}", exc_info=True)
+        else:
             conversion_errors += 1
+    if args.recursive: manifest.prune(rel_paths.values())
+    manifest.save()
+    # Links are resolved against every page under source_dir, which is the docs root the hrefs are relative to
+    manifest.check_links(get_default_link_index().add_docs_under(abs_source_dir_for_main, [".html"]), logger)
 
     logger.info(f"Conversion process finished. {files_processed_count} file(s) processed.")
+    logger.info(manifest.summary())
+    if args.handler_stats:
+        logger.info("Block handler dispatch statistics:" if handler_stats else "Block handler statistics: no file converted.")
+        for line in format_handler_stats(handler_stats) if handler_stats else []: logger.info(line)
+    if args.profile:
+        profile_summary = summarize_profiles(profiles, args.profile_top)
+        write_profile(args.profile, profiles, profile_summary)
+        logger.info(f"Profile written to {os.path.abspath(args.profile)}")
+        for line in format_profile_summary(profile_summary): logger.info(line)
     if conversion_errors > 0: logger.warning(f"{conversion_errors} file(s) encountered errors during conversion.")
+    if args.watch: watch_and_convert(abs_source_dir_for_main, args.dest_dir, args.recursive, manifest, logger, args.parser)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,9 @@
+"""
+Puts the repository's scripts/ directory on sys.path. The shared tooling modules (document store, link index,
+front-matter I/O, ...) live there, so each tool in this directory imports this module before any of them.
+"""
+import os
+import sys
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "scripts"))
+if SCRIPTS_DIR not in sys.path: sys.path.insert(0, SCRIPTS_DIR)
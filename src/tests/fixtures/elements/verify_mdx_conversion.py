@@ -1,167 +1,316 @@
 import os
 import re
-from bs4 import BeautifulSoup
-import difflib # For showing differences
-
-def normalize_text_flattened(text):
+import sys
+import json
+import time
+import hashlib
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+import scripts_path  # noqa: F401
+from file_utils import write_text_atomic
+from html_document_store import get_default_store
+from mdx_text import read_mdx_text
+from sequence_diff import diff_opcodes, is_subsequence
+
+DEFAULT_HTML_DIR = "ISBDM/docs"
+DEFAULT_MDX_DIR = "docs"
+DEFAULT_SELECTOR = "div.col-md-7.border.rounded"  # The main content column the converter reads
+
+STATUS_OK = "ok"
+STATUS_MISMATCH = "mismatch"
+STATUS_MISSING_MDX = "missing_mdx"
+STATUS_ERROR = "error"
+
+# Comparison stages, cheapest first; a file is settled by the first that can decide it
+STAGE_FINGERPRINT = "fingerprint"  # Identical normalized text
+STAGE_SUBSEQUENCE = "subsequence"  # Every HTML token is in the MDX, in order (the MDX only adds text)
+STAGE_DIFF = "diff"  # Token diff locating the HTML spans missing from the MDX
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")  # Words and single punctuation characters; whitespace separates only
+SPAN_TEXT_LIMIT = 300
+MDX_CONTEXT_CHARS = 60
+
+def tokenize_text(text):
     """
-    Converts text to lowercase and removes ALL whitespace.
+    Lowercased word and punctuation tokens of text, plus the (start, end) offset of each in text. Joined, the
+    tokens are the text lowercased with all whitespace removed, so whitespace and line breaks never count as
+    differences, while a word split by markup (`**term**`) still matches.
     """
-    if text is None:
-        return ""
-    text = text.lower()
-    text = re.sub(r'\s+', '', text) # Remove all whitespace characters
-    return text
+    tokens, offsets = [], []
+    for match in TOKEN_PATTERN.finditer(text or ""):
+        tokens.append(match.group().lower())
+        offsets.append(match.span())
+    return tokens, offsets
+
+
+def text_fingerprint(tokens):
+    """Length and hash of the normalized text, cheap to compare and to keep in reports."""
+    flattened = "".join(tokens).encode('utf-8')
+    return f"{len(flattened)}:{hashlib.blake2b(flattened, digest_size=8).hexdigest()}"
 
-def get_text_from_div(html_file_path, div_identifier_type, div_identifier_value):
+
+def extract_div_text(html_file_path, div_identifier_type, div_identifier_value):
     """
-    Parses an HTML file and extracts flattened, normalized text from a specified div.
+    Text of the specified div, or None if the page has no such div.
+    Raises ValueError for an unknown identifier type and OSError if the page cannot be read.
+    The parsed page comes from the shared document store, so pages already parsed by the
+    converter or sidebar tools in this process are not parsed again.
     """
-    try:
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f, 'lxml') # or 'html.parser'
-
-        target_div = None
-        if div_identifier_type == 'id':
-            target_div = soup.find('div', id=div_identifier_value)
-        elif div_identifier_type == 'class':
-            # Finds the first div with this class. If multiple, adjust as needed.
-            target_div = soup.find('div', class_=div_identifier_value)
-        elif div_identifier_type == 'selector':
-            target_div = soup.select_one(div_identifier_value)
-        else:
-            print(f"Error: Invalid div_identifier_type '{div_identifier_type}' in {html_file_path}")
-            return None
+    document = get_default_store().get(html_file_path)
+    if div_identifier_type == 'id':
+        target_div = document.soup.find('div', id=div_identifier_value)
+        return target_div.get_text() if target_div else None
+    elif div_identifier_type == 'class':
+        # Finds the first div with this class. If multiple, adjust as needed.
+        target_div = document.soup.find('div', class_=div_identifier_value)
+        return target_div.get_text() if target_div else None
+    elif div_identifier_type == 'selector':
+        return document.select_text(div_identifier_value)
+    raise ValueError(f"Invalid div_identifier_type '{div_identifier_type}'")
+
+
+def extract_mdx_text(mdx_file_path):
+    """
+    Rendered text of an MDX file: what the built page shows, without front matter, JSX tags or Markdown syntax,
+    and with the text the converter's components render (see mdx_text). Raises OSError if it cannot be read.
+    """
+    return read_mdx_text(mdx_file_path)
 
-        if target_div:
-            # Get text, then normalize by flattening
-            return normalize_text_flattened(target_div.get_text())
-        else:
-            print(f"Warning: Div '{div_identifier_value}' not found in {html_file_path}")
-            return "" # Return empty string if div not found, to allow comparison
-    except FileNotFoundError:
-        print(f"Error: HTML file not found at {html_file_path}")
-        return None
-    except Exception as e:
-        print(f"Error processing HTML file {html_file_path}: {e}")
-        return None
 
-def get_text_from_mdx(mdx_file_path):
+def _collapse(text, limit):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _span(text, offsets, start, end, limit):
+    """The original text covered by tokens start..end-1, whitespace collapsed."""
+    if start >= end: return ""
+    return _collapse(text[offsets[start][0]:offsets[end - 1][1]], limit)
+
+
+def _context(text, offsets, position):
+    """Some MDX text around token position, to find where a missing span belonged."""
+    if not offsets: return ""
+    at = offsets[position][0] if position < len(offsets) else len(text)
+    return _collapse(text[max(0, at - MDX_CONTEXT_CHARS):at + MDX_CONTEXT_CHARS], 2 * MDX_CONTEXT_CHARS)
+
+
+def compare_texts(html_text, mdx_text, strict=False):
+    """
+    Compares the HTML div text with the MDX text in stages, cheapest first:
+    1. equal fingerprints (lengths and hashes of the normalized texts) settle identical files;
+    2. a linear in-order scan settles files whose MDX has every HTML token, plus text of its own (not when strict);
+    3. the rest get a linear-space token diff (sequence_diff), reporting every HTML span the MDX misses
+       and, when strict, every span the MDX adds.
+    The core requirement is that the MDX is not missing anything present in the HTML; with strict, the
+    normalized texts must be identical.
     """
-    Reads and returns flattened, normalized text content from an MDX file.
+    html_tokens, html_offsets = tokenize_text(html_text)
+    mdx_tokens, mdx_offsets = tokenize_text(mdx_text)
+    comparison = {"stage": STAGE_FINGERPRINT, "identical": False, "html_fingerprint": text_fingerprint(html_tokens),
+                  "mdx_fingerprint": text_fingerprint(mdx_tokens), "html_tokens": len(html_tokens),
+                  "mdx_tokens": len(mdx_tokens), "missing_tokens": 0, "extra_tokens": 0,
+                  "missing_spans": [], "extra_spans": []}
+    if comparison["html_fingerprint"] == comparison["mdx_fingerprint"] and html_tokens == mdx_tokens:
+        comparison["identical"] = True
+        return comparison
+    if not strict:
+        comparison["stage"] = STAGE_SUBSEQUENCE
+        if is_subsequence(html_tokens, mdx_tokens):
+            comparison["extra_tokens"] = len(mdx_tokens) - len(html_tokens)
+            return comparison
+
+    comparison["stage"] = STAGE_DIFF
+    for tag, i1, i2, j1, j2 in diff_opcodes(html_tokens, mdx_tokens):
+        if tag in ("delete", "replace"):
+            comparison["missing_tokens"] += i2 - i1
+            comparison["missing_spans"].append({"html_token": i1, "tokens": i2 - i1,
+                                                "text": _span(html_text, html_offsets, i1, i2, SPAN_TEXT_LIMIT),
+                                                "mdx_context": _context(mdx_text, mdx_offsets, j1)})
+        if tag in ("insert", "replace"):
+            comparison["extra_tokens"] += j2 - j1
+            if strict:
+                comparison["extra_spans"].append({"mdx_token": j1, "tokens": j2 - j1,
+                                                  "text": _span(mdx_text, mdx_offsets, j1, j2, SPAN_TEXT_LIMIT)})
+    return comparison
+
+
+# --- Batch Mode ---
+def find_html_mdx_pairs(html_root, mdx_root, recursive=True):
+    """(html_file_path, mdx_file_path) for every HTML page, mirroring the converter's output layout, in path order."""
+    pairs = []
+    for dirpath, dirnames, filenames in os.walk(html_root):
+        if not recursive: dirnames[:] = []
+        for filename in filenames:
+            if filename.lower().endswith(('.html', '.htm')):
+                html_file_path = os.path.join(dirpath, filename)
+                rel_path_no_ext = os.path.splitext(os.path.relpath(html_file_path, html_root))[0]
+                pairs.append((html_file_path, os.path.join(mdx_root, rel_path_no_ext + ".mdx")))
+    return sorted(pairs)
+
+
+def verify_file(task):
     """
+    Verifies one HTML/MDX pair without printing; runs in the main process or in a pool worker.
+    Returns a JSON-serializable result whose status is one of the STATUS_* values.
+    """
+    html_file_path, mdx_file_path, div_identifier_type, div_identifier_value, strict = task
+    started = time.perf_counter()
+    result = {"html_file_path": html_file_path, "mdx_file_path": mdx_file_path, "status": STATUS_OK, "message": "",
+              "comparison": None, "seconds": 0.0}
+    if not os.path.exists(mdx_file_path):
+        result["status"] = STATUS_MISSING_MDX
+        result["message"] = f"Corresponding MDX file not found: {mdx_file_path}"
+        return result
     try:
-        with open(mdx_file_path, 'r', encoding='utf-8') as f:
-            # For MDX, we might want to be careful about frontmatter or JSX elements
-            # if they shouldn't be part of the textual comparison.
-            # A simple approach is to read all and normalize.
-            # If MDX has non-content elements that HTML doesn't, this might need refinement.
-            # For now, assume all text in MDX (after stripping JSX/frontmatter if any) is relevant.
-            # This naive version reads everything.
-            content = f.read()
-
-            # Basic attempt to strip common frontmatter (--- ... ---)
-            if content.startswith("---"):
-                end_frontmatter = content.find("---", 3)
-                if end_frontmatter != -1:
-                    content = content[end_frontmatter + 3:]
-
-            # Basic attempt to strip JSX tags (this is very naive and might break valid text)
-            # A more robust solution would involve a proper MDX parser or more sophisticated regex.
-            # For example, <Component>text</Component> -> text
-            # content = re.sub(r'<[^>]+>', '', content) # This is too aggressive as it removes HTML-like text
-
-            return normalize_text_flattened(content)
-    except FileNotFoundError:
-        # This will be handled by the main loop, but good to have a local print for debugging
-        # print(f"Error: MDX file not found at {mdx_file_path}")
-        return None
+        html_text = extract_div_text(html_file_path, div_identifier_type, div_identifier_value)
+        if html_text is None:
+            result["message"] = f"Div '{div_identifier_value}' not found in {html_file_path}"
+            html_text = ""
+        mdx_text = extract_mdx_text(mdx_file_path)
     except Exception as e:
-        print(f"Error reading MDX file {mdx_file_path}: {e}")
-        return None
+        result["status"] = STATUS_ERROR
+        result["message"] = f"{type(e).__name__}: {e}"
+    else:
+        comparison = result["comparison"] = compare_texts(html_text, mdx_text, strict)
+        if comparison["missing_spans"] or comparison["extra_spans"]: result["status"] = STATUS_MISMATCH
+    result["seconds"] = time.perf_counter() - started
+    return result
 
-def compare_and_report(html_text_normalized, mdx_text_normalized, html_filename, mdx_filename):
-    """
-    Compares the normalized HTML div text with normalized MDX text.
-    Reports if the MDX is missing any characters from the HTML.
-    """
-    if html_text_normalized is None or mdx_text_normalized is None:
-        # Errors would have been printed by the functions fetching the text
-        return
 
-    # The core requirement: "The mdx shouldn't be missing any characters present in the html."
-    # This means if we iterate through characters of html_text_normalized,
-    # they should effectively be found in mdx_text_normalized in the same order.
-    # If both are identical after normalization, then MDX is not missing anything.
-    # If MDX has *extra* characters, that's "ok" by the stated rule,
-    # but if the goal is a faithful conversion, they should be identical.
+def _verify_file_in_worker(task):
+    """verify_file() in a pool worker, which verifies each page once: drops the parse to keep worker memory flat."""
+    try:
+        return verify_file(task)
+    finally:
+        get_default_store().discard(task[0])
 
-    # Let's assume "shouldn't be missing any characters" implies that after normalization,
-    # the MDX content should be EQUAL to the HTML content. If MDX can have additional
-    # characters (e.g. MDX specific syntax not rendered as text), then a simple
-    # string equality after normalization is the most direct test.
 
-    if html_text_normalized == mdx_text_normalized:
-        print(f"OK: Content matches for {html_filename} and {mdx_filename}")
+def iter_verification_results(tasks, jobs):
+    """Yields verify_file() results in task order, fanning the work out over a process pool when jobs > 1."""
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks: yield verify_file(task)
+        return
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(_verify_file_in_worker, tasks, chunksize=chunksize)
+
+
+def summarize_results(results):
+    summary = {STATUS_OK: 0, STATUS_MISMATCH: 0, STATUS_MISSING_MDX: 0, STATUS_ERROR: 0}
+    stages = {STAGE_FINGERPRINT: 0, STAGE_SUBSEQUENCE: 0, STAGE_DIFF: 0}
+    for result in results:
+        summary[result["status"]] += 1
+        if result["comparison"]: stages[result["comparison"]["stage"]] += 1
+    summary["total"] = len(results)
+    summary["settled_by_stage"] = stages
+    return summary
+
+
+def write_json_report(report_path, results, summary, settings, seconds):
+    report = {"settings": settings, "summary": summary, "seconds": round(seconds, 3), "files": results}
+    write_text_atomic(report_path, json.dumps(report, indent=1, ensure_ascii=False) + "\n")
+
+
+def write_junit_report(report_path, results, summary, html_root, seconds):
+    """One testcase per HTML page (classname = its directory): mismatches fail, errors error, missing MDX is skipped."""
+    suite = ET.Element("testsuite", name="verify_mdx_conversion", tests=str(summary["total"]),
+                       failures=str(summary[STATUS_MISMATCH]), errors=str(summary[STATUS_ERROR]),
+                       skipped=str(summary[STATUS_MISSING_MDX]), time=f"{seconds:.3f}")
+    for result in results:
+        rel_path = os.path.relpath(result["html_file_path"], html_root).replace(os.sep, '/')
+        classname, _, name = rel_path.rpartition('/')
+        case = ET.SubElement(suite, "testcase", classname=classname or ".", name=name, time=f"{result['seconds']:.3f}")
+        if result["status"] == STATUS_MISMATCH:
+            failure = ET.SubElement(case, "failure", message=mismatch_summary(result["comparison"]))
+            failure.text = "\n".join(format_spans(result["comparison"]))
+        elif result["status"] == STATUS_ERROR:
+            ET.SubElement(case, "error", message=result["message"])
+        elif result["status"] == STATUS_MISSING_MDX:
+            ET.SubElement(case, "skipped", message=result["message"])
+    write_text_atomic(report_path, ET.tostring(suite, encoding="unicode", xml_declaration=True) + "\n")
+
+
+def mismatch_summary(comparison):
+    summary = f"{len(comparison['missing_spans'])} HTML span(s) ({comparison['missing_tokens']} tokens) missing from the MDX"
+    if comparison["extra_spans"]:
+        summary += f", {len(comparison['extra_spans'])} MDX span(s) ({comparison['extra_tokens']} tokens) not in the HTML"
+    return summary
+
+
+def format_spans(comparison):
+    lines = []
+    for span in comparison["missing_spans"]:
+        lines.append(f"MISSING at HTML token {span['html_token']}: {span['text']}")
+        lines.append(f"  MDX near there: ...{span['mdx_context']}...")
+    for span in comparison["extra_spans"]:
+        lines.append(f"EXTRA at MDX token {span['mdx_token']}: {span['text']}")
+    return lines
+
+
+def print_result(result):
+    if result["status"] == STATUS_MISMATCH:
+        print(f"MISMATCH: {result['html_file_path']} vs {result['mdx_file_path']}: {mismatch_summary(result['comparison'])}")
+        for line in format_spans(result["comparison"]): print(f"  {line}")
+    elif result["status"] == STATUS_ERROR:
+        print(f"ERROR: {result['html_file_path']}: {result['message']}")
+    elif result["status"] == STATUS_MISSING_MDX:
+        print(f"Warning: {result['message']}")
     else:
-        print(f"\n--- MISMATCH detected between {html_filename} and {mdx_filename} ---")
-        print("The normalized MDX content is NOT identical to the normalized HTML div content.")
-        print("This means either MDX is missing content from HTML, or has extra/different content.")
-
-        # Using difflib to show differences
-        # This can be verbose for very long strings, so we might show snippets or a summary.
-        # `ndiff` produces a line-by-line delta. Since we flattened, it's char-by-char.
-        # For long strings, this might be too much. Consider context_diff or unified_diff.
-
-        # To make diff more readable for long flattened strings, we can split them into chunks
-        # or compare segments. For now, let's show a snippet of where they first differ.
-
-        # Find first differing character
-        len_html = len(html_text_normalized)
-        len_mdx = len(mdx_text_normalized)
-        min_len = min(len_html, len_mdx)
-        diff_index = -1
-        for i in range(min_len):
-            if html_text_normalized[i] != mdx_text_normalized[i]:
-                diff_index = i
-                break
-
-        if diff_index == -1 and len_html != len_mdx:
-            # One is a prefix of the other
-            diff_index = min_len
-            print(f"One text is a prefix of the other. Different lengths: HTML={len_html}, MDX={len_mdx}")
-
-        if diff_index != -1:
-            context = 20  # Number of characters around the difference
-            start = max(0, diff_index - context)
-            end_html = min(len_html, diff_index + context)
-            end_mdx = min(len_mdx, diff_index + context)
-
-            print(f"First difference around character {diff_index}:")
-            print(f"  HTML: ...{html_text_normalized[start:diff_index]}[{html_text_normalized[diff_index:end_html]}]...")
-            print(f"  MDX:  ...{mdx_text_normalized[start:diff_index]}[{mdx_text_normalized[diff_index:end_mdx]}]...")
-
-        # For a more detailed diff:
-        # d = difflib.Differ()
-        # diff = list(d.compare(html_text_normalized.splitlines(), mdx_text_normalized.splitlines())) # splitlines won't work well for flattened
-        # For character by character (can be very long output):
-        # diff = list(difflib.ndiff(html_text_normalized, mdx_text_normalized))
-        # print("\nDetailed Character Diff (lines starting with '-' are from HTML only, '+' from MDX only, ' ' are common):")
-        # for line in diff:
-        #     if line.startswith('- ') or line.startswith('+ '): # Only show actual differences
-        #         print(line)
-        #     elif not line.startswith('? ') and not line.startswith('  '): # Handle other diff outputs if necessary
-        #          # This part might need adjustment depending on what difflib.ndiff actually outputs for changes
-        #          print(line) # if there's a change within a 'common' part it uses '?'
-
-        # A simple check if HTML content is "in" MDX (less strict)
-        # if html_text_normalized not in mdx_text_normalized:
-        # print("  Specifically, some content from the HTML div seems to be entirely missing in the MDX.")
-        # else:
-        # print("  MDX content contains HTML content, but they are not identical (could be extra chars in MDX or different chars).")
-
+        if result["message"]: print(f"Warning: {result['message']}")
+        comparison = result["comparison"]
+        if comparison["identical"]:
+            print(f"OK: Content matches for {result['html_file_path']} and {result['mdx_file_path']}")
+        else:
+            print(f"OK: All HTML content present in {result['mdx_file_path']} "
+                  f"({comparison['extra_tokens']} extra MDX tokens, settled by the {comparison['stage']} stage)")
+
+
+def batch_main(args):
+    """Verifies every page under html_dir against the MDX tree; exits non-zero on mismatches or errors."""
+    html_root = os.path.abspath(args.html_dir)
+    mdx_root = os.path.abspath(args.mdx_dir)
+    for label, directory in (("HTML", html_root), ("MDX", mdx_root)):
+        if not os.path.isdir(directory):
+            print(f"Error: {label} directory not found at {directory}")
+            sys.exit(2)
+    div_identifier_type, div_identifier_value = args.identifier_type, args.identifier
+    if div_identifier_type not in ('id', 'class', 'selector'):
+        print(f"Error: Invalid div identifier type '{div_identifier_type}'")
+        sys.exit(2)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    started = time.perf_counter()
+    tasks = [(html_file_path, mdx_file_path, div_identifier_type, div_identifier_value, args.strict)
+             for html_file_path, mdx_file_path in find_html_mdx_pairs(html_root, mdx_root, not args.no_recursive)]
+    results = []
+    for result in iter_verification_results(tasks, jobs):
+        results.append(result)
+        if result["status"] != STATUS_OK or args.verbose: print_result(result)
+    seconds = time.perf_counter() - started
+    summary = summarize_results(results)
 
-def main():
+    print("\n--- Summary ---")
+    print(f"Verified {summary['total']} HTML files under '{html_root}' against '{mdx_root}' "
+          f"in {seconds:.2f}s ({jobs} process{'es' if jobs > 1 else ''}).")
+    print(f"OK: {summary[STATUS_OK]}, mismatched: {summary[STATUS_MISMATCH]}, "
+          f"missing MDX: {summary[STATUS_MISSING_MDX]}, errors: {summary[STATUS_ERROR]}")
+    print("Settled by stage: " + ", ".join(f"{stage} {count}" for stage, count in summary["settled_by_stage"].items()))
+    settings = {"html_dir": html_root, "mdx_dir": mdx_root, "identifier_type": div_identifier_type,
+                "identifier": div_identifier_value, "recursive": not args.no_recursive, "strict": args.strict,
+                "jobs": jobs}
+    if args.json_report:
+        write_json_report(args.json_report, results, summary, settings, seconds)
+        print(f"JSON report written to {args.json_report}")
+    if args.junit_report:
+        write_junit_report(args.junit_report, results, summary, html_root, seconds)
+        print(f"JUnit report written to {args.junit_report}")
+    sys.exit(1 if summary[STATUS_MISMATCH] or summary[STATUS_ERROR] else 0)
+
+
+def interactive_main():
     html_directory = input("Enter the path to the directory containing HTML files: ").strip()
     mdx_directory = input("Enter the path to the directory containing corresponding MDX files: ").strip()
     div_identifier_type = input("Enter HTML div identifier type ('id', 'class', or 'selector'): ").lower().strip()
@@ -194,32 +343,46 @@ def main():
             print(f"Found MDX:     {mdx_file_path}")
             processed_pairs +=1
 
-            html_div_text_normalized = get_text_from_div(html_file_path, div_identifier_type, div_identifier_value)
-            mdx_content_normalized = get_text_from_mdx(mdx_file_path)
-
-            if html_div_text_normalized is None:
-                print(f"Skipping comparison for {html_filename_full} due to error reading/parsing HTML.")
-                continue
-            if mdx_content_normalized is None:
-                print(f"Skipping comparison for {html_filename_full} due to error reading/parsing MDX.")
+            result = verify_file((html_file_path, mdx_file_path, div_identifier_type, div_identifier_value, False))
+            if result["status"] == STATUS_ERROR:
+                print(f"Skipping comparison for {html_filename_full}: {result['message']}")
                 continue
-
-            # print(f"Norm HTML (len {len(html_div_text_normalized)}): '{html_div_text_normalized[:100]}...'")
-            # print(f"Norm MDX  (len {len(mdx_content_normalized)}): '{mdx_content_normalized[:100]}...'")
-
-
-            if html_div_text_normalized != mdx_content_normalized:
+            if result["status"] == STATUS_MISMATCH:
                 mismatched_files +=1
-            compare_and_report(html_div_text_normalized, mdx_content_normalized, html_filename_full, mdx_filename_full)
+            print_result(result)
 
 
     print("\n--- Summary ---")
     print(f"Found {found_html_files} HTML files in '{html_directory}'.")
     print(f"Processed {processed_pairs} HTML/MDX file pairs.")
-    print(f"{mismatched_files} pairs had content mismatches after normalization.")
+    print(f"{mismatched_files} pairs had HTML content missing from the MDX.")
     if found_html_files > processed_pairs:
         print(f"{found_html_files - processed_pairs} HTML files did not have a corresponding MDX file in '{mdx_directory}'.")
 
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that converted MDX files keep all text of their HTML pages. Without arguments the "
+                    "directories and div are asked for interactively; with any option every page under html_dir "
+                    "is verified non-interactively.")
+    parser.add_argument("--batch", action="store_true", help="Run non-interactively with the defaults below.")
+    parser.add_argument("--html_dir", default=DEFAULT_HTML_DIR, help="Root of the HTML pages.")
+    parser.add_argument("--mdx_dir", default=DEFAULT_MDX_DIR, help="Root of the MDX files (same layout as html_dir).")
+    parser.add_argument("--identifier_type", default="selector", choices=["id", "class", "selector"],
+                        help="How --identifier picks the content div in each page.")
+    parser.add_argument("--identifier", default=DEFAULT_SELECTOR, help="Div id, class or CSS selector of the content.")
+    parser.add_argument("--no_recursive", action="store_true", help="Only verify pages directly in html_dir.")
+    parser.add_argument("--strict", action="store_true",
+                        help="Require identical normalized text: MDX content not in the HTML is a mismatch too.")
+    parser.add_argument("--jobs", type=int, default=0, help="Number of worker processes (0 = one per CPU).")
+    parser.add_argument("--json_report", help="Write every result and the summary to this JSON file.")
+    parser.add_argument("--junit_report", help="Write a JUnit XML report (one testcase per page) to this file.")
+    parser.add_argument("--verbose", action="store_true", help="Also print the pages that match.")
+    if len(sys.argv) == 1:
+        interactive_main()
+    else:
+        batch_main(parser.parse_args())
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file